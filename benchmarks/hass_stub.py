@@ -0,0 +1,410 @@
+"""Minimal in-process stand-in for the parts of Home Assistant the integration uses.
+
+Only meant for the benchmarks: ``install()`` registers fake ``homeassistant.*``
+modules in ``sys.modules`` so ``custom_components.meal_planner`` can be
+imported and driven without a Home Assistant install. Services, websocket
+commands, entities and the event bus are plain in-memory registries; executor
+jobs run inline, so a measured call includes its file writes.
+
+Requires ``voluptuous`` and ``aiohttp`` (both Home Assistant dependencies).
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import enum
+import functools
+import importlib
+import json
+import sys
+import types
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+INTEGRATION_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "meal_planner"
+
+
+def _module(name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def callback(func):
+    return func
+
+
+class SupportsResponse(enum.Enum):
+    NONE = "none"
+    OPTIONAL = "optional"
+    ONLY = "only"
+
+
+class ServiceCall:
+    def __init__(self, domain: str, service: str, data: dict) -> None:
+        self.domain = domain
+        self.service = service
+        self.data = data
+
+
+class ServiceRegistry:
+    def __init__(self) -> None:
+        self._handlers: dict[tuple[str, str], object] = {}
+
+    def async_register(self, domain, service, handler, schema=None, supports_response=None):
+        self._handlers[(domain, service)] = handler
+
+    def has_service(self, domain, service) -> bool:
+        return (domain, service) in self._handlers
+
+    def async_remove(self, domain, service) -> None:
+        self._handlers.pop((domain, service), None)
+
+    def async_services(self) -> dict:
+        services: dict[str, dict] = {}
+        for domain, service in self._handlers:
+            services.setdefault(domain, {})[service] = None
+        return services
+
+    async def async_call(self, domain, service, data=None, blocking=False, return_response=False):
+        result = self._handlers[(domain, service)](ServiceCall(domain, service, dict(data or {})))
+        if not asyncio.iscoroutine(result):
+            return result if return_response else None
+        if not blocking:
+            # Like Home Assistant: the service runs in its own task and the caller goes on
+            asyncio.get_running_loop().create_task(result)
+            return None
+        result = await result
+        return result if return_response else None
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self.fired = 0
+
+    def async_fire(self, event_type, event_data=None) -> None:
+        self.fired += 1
+
+    def async_listen(self, event_type, listener):
+        return lambda: None
+
+
+class State:
+    def __init__(self, state, attributes) -> None:
+        self.state = state
+        self.attributes = attributes
+
+
+class StateMachine:
+    def __init__(self) -> None:
+        self.states: dict[str, State] = {}
+
+    def get(self, entity_id):
+        return self.states.get(entity_id)
+
+
+class Http:
+    def __init__(self) -> None:
+        self.views = []
+
+    def register_view(self, view) -> None:
+        self.views.append(view)
+
+
+class Config:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def path(self, *parts) -> str:
+        return str(self.root.joinpath(*parts))
+
+
+class ConfigEntry:
+    def __init__(self, entry_id="bench", data=None, options=None, title="Basic Meal Planner") -> None:
+        self.entry_id = entry_id
+        self.data = data or {}
+        self.options = options or {}
+        self.title = title
+        self._on_unload = []
+
+    def add_update_listener(self, listener):
+        return lambda: None
+
+    def async_on_unload(self, func) -> None:
+        self._on_unload.append(func)
+
+
+class ConfigEntries:
+    def __init__(self, hass: "HomeAssistant") -> None:
+        self.hass = hass
+        self.entities: dict[str, list] = {}
+
+    async def async_forward_entry_setups(self, entry, platforms) -> None:
+        for platform in platforms:
+            module = importlib.import_module(f"custom_components.meal_planner.{platform}")
+            added = []
+            await module.async_setup_entry(self.hass, entry, lambda entities, update=False: added.extend(entities))
+            for entity in added:
+                entity.hass = self.hass
+                entity.entity_id = f"{platform}.{entity._attr_suggested_object_id}"
+                entity.async_write_ha_state()
+            self.entities.setdefault(entry.entry_id, []).extend(added)
+
+    async def async_unload_platforms(self, entry, platforms) -> bool:
+        self.entities.pop(entry.entry_id, None)
+        for func in entry._on_unload:
+            func()
+        entry._on_unload.clear()
+        return True
+
+    async def async_reload(self, entry_id) -> bool:
+        return True
+
+
+class HomeAssistant:
+    def __init__(self, root: Path) -> None:
+        self.data: dict = {}
+        self.config = Config(root)
+        self.services = ServiceRegistry()
+        self.bus = EventBus()
+        self.states = StateMachine()
+        self.http = Http()
+        self.config_entries = ConfigEntries(self)
+        self.time_listeners: list = []
+        self.background_tasks: set = set()
+
+    async def async_add_executor_job(self, func, *args):
+        return func(*args)
+
+    def async_create_task(self, coro, name=None):
+        return asyncio.get_running_loop().create_task(coro)
+
+    def async_create_background_task(self, coro, name=None):
+        task = asyncio.get_running_loop().create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    async def async_block_till_done(self) -> None:
+        while self.background_tasks:
+            await asyncio.gather(*list(self.background_tasks))
+
+
+class Entity:
+    hass = None
+    entity_id = None
+    _attr_native_value = None
+    _attr_extra_state_attributes = None
+    _unrecorded_attributes = frozenset()
+
+    def async_write_ha_state(self) -> None:
+        self.hass.states.states[self.entity_id] = State(self._attr_native_value, self._attr_extra_state_attributes)
+
+
+class SensorEntity(Entity):
+    pass
+
+
+@dataclass
+class CalendarEvent:
+    start: dt.datetime
+    end: dt.datetime
+    summary: str
+    description: str | None = None
+    location: str | None = None
+    uid: str | None = None
+
+
+class CalendarEntity(Entity):
+    def async_write_ha_state(self) -> None:
+        event = self.event
+        self.hass.states.states[self.entity_id] = State("on" if event else "off", {})
+
+
+class HomeAssistantView:
+    requires_auth = True
+    url = None
+    name = None
+    extra_urls: list = []
+
+
+@dataclass
+class StaticPathConfig:
+    url_path: str
+    path: str
+    cache_headers: bool = True
+
+
+class _Flow:
+    def __init_subclass__(cls, domain=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+
+class Connection:
+    """Websocket connection that keeps the last result or error."""
+
+    def __init__(self) -> None:
+        self.result = None
+        self.error = None
+
+    def send_result(self, msg_id, result=None) -> None:
+        self.result = result
+
+    def send_error(self, msg_id, code, message) -> None:
+        self.error = (code, message)
+
+    def send_message(self, message) -> None:
+        if isinstance(message, (bytes, str)):
+            message = json.loads(message)
+        if message.get("success") is False:
+            self.error = (message["error"]["code"], message["error"]["message"])
+            return
+        self.result = message.get("result")
+
+
+def _websocket_command(schema):
+    def decorate(func):
+        func.ws_type = next(value for key, value in schema.items() if str(key) == "type")
+        return func
+    return decorate
+
+
+def _async_response(func):
+    """Mark a coroutine handler as run by Home Assistant (in a task); only marked ones are awaited."""
+    @functools.wraps(func)
+    def schedule(hass, connection, msg):
+        return func(hass, connection, msg)
+    schedule.async_response = True
+    return schedule
+
+
+def _register_command(hass, handler) -> None:
+    hass.data.setdefault("websocket_commands", {})[handler.ws_type] = handler
+
+
+async def ws_call(hass: HomeAssistant, msg: dict):
+    """Run a registered websocket command; returns ``(result, error)``."""
+    connection = Connection()
+    handler = hass.data["websocket_commands"][msg["type"]]
+    result = handler(hass, connection, dict(msg, id=1))
+    if asyncio.iscoroutine(result):
+        if not getattr(handler, "async_response", False):
+            # Home Assistant drops such a coroutine unawaited: the command never replies
+            result.close()
+            raise RuntimeError(f"{msg['type']} is a coroutine without @websocket_api.async_response")
+        await result
+    return connection.result, connection.error
+
+
+async def http_get(hass: HomeAssistant, url: str, query: Optional[dict] = None, headers: Optional[dict] = None):
+    """Run the GET handler of the view registered at ``url``; returns the response."""
+    view = next(view for view in hass.http.views if view.url == url)
+    request = types.SimpleNamespace(query=query or {}, headers=headers or {})
+    return await view.get(request)
+
+
+def _call_later(hass, delay, action):
+    handle = asyncio.get_running_loop().call_later(delay, action, None)
+    return handle.cancel
+
+
+def _track_time_change(hass, action, hour=None, minute=None, second=None):
+    listener = (action, hour, minute, second)
+    hass.time_listeners.append(listener)
+    return lambda: hass.time_listeners.remove(listener)
+
+
+async def _get_integration(hass, domain):
+    with open(INTEGRATION_DIR / "manifest.json", encoding="utf-8") as f:
+        return types.SimpleNamespace(version=json.load(f).get("version", "0"))
+
+
+def install() -> None:
+    """Register the stub modules. Call before importing the integration."""
+    if "homeassistant" in sys.modules:
+        return
+    for name in (
+        "homeassistant",
+        "homeassistant.const",
+        "homeassistant.core",
+        "homeassistant.config_entries",
+        "homeassistant.exceptions",
+        "homeassistant.loader",
+        "homeassistant.components",
+        "homeassistant.components.calendar",
+        "homeassistant.components.frontend",
+        "homeassistant.components.http",
+        "homeassistant.components.sensor",
+        "homeassistant.components.websocket_api",
+        "homeassistant.helpers",
+        "homeassistant.helpers.entity",
+        "homeassistant.helpers.entity_platform",
+        "homeassistant.helpers.entity_registry",
+        "homeassistant.helpers.event",
+        "homeassistant.helpers.json",
+        "homeassistant.util",
+        "homeassistant.util.dt",
+        "homeassistant.util.json",
+    ):
+        _module(name)
+
+    sys.modules["homeassistant.const"].EVENT_HOMEASSISTANT_STOP = "homeassistant_stop"
+
+    core = sys.modules["homeassistant.core"]
+    core.HomeAssistant = HomeAssistant
+    core.ServiceCall = ServiceCall
+    core.SupportsResponse = SupportsResponse
+    core.callback = callback
+
+    config_entries = sys.modules["homeassistant.config_entries"]
+    config_entries.ConfigEntry = ConfigEntry
+    config_entries.ConfigFlow = _Flow
+    config_entries.OptionsFlow = _Flow
+    config_entries.ConfigFlowResult = dict
+
+    sys.modules["homeassistant.loader"].async_get_integration = _get_integration
+    sys.modules["homeassistant.components.calendar"].CalendarEntity = CalendarEntity
+    sys.modules["homeassistant.components.calendar"].CalendarEvent = CalendarEvent
+    sys.modules["homeassistant.components.sensor"].SensorEntity = SensorEntity
+    sys.modules["homeassistant.components.http"].HomeAssistantView = HomeAssistantView
+    sys.modules["homeassistant.components.http"].StaticPathConfig = StaticPathConfig
+
+    frontend = sys.modules["homeassistant.components.frontend"]
+    frontend.async_register_built_in_panel = lambda hass, **kwargs: None
+    frontend.add_extra_js_url = lambda hass, url, es5=False: None
+    frontend.remove_extra_js_url = lambda hass, url, es5=False: None
+
+    async def async_remove_panel(hass, panel_id, *args, **kwargs):
+        return None
+
+    frontend.async_remove_panel = async_remove_panel
+
+    websocket_api = sys.modules["homeassistant.components.websocket_api"]
+    websocket_api.websocket_command = _websocket_command
+    websocket_api.async_register_command = _register_command
+    websocket_api.async_response = _async_response
+    websocket_api.result_message = lambda msg_id, result=None: {
+        "id": msg_id, "type": "result", "success": True, "result": result,
+    }
+    websocket_api.error_message = lambda msg_id, code, message: {
+        "id": msg_id, "type": "result", "success": False, "error": {"code": code, "message": message},
+    }
+    sys.modules["homeassistant.exceptions"].HomeAssistantError = type("HomeAssistantError", (Exception,), {})
+    sys.modules["homeassistant.helpers.json"].json_bytes = lambda obj: json.dumps(obj).encode()
+
+    sys.modules["homeassistant.helpers.entity"].Entity = Entity
+    sys.modules["homeassistant.helpers.entity_platform"].AddEntitiesCallback = object
+    sys.modules["homeassistant.helpers.entity_registry"].async_get = (
+        lambda hass: types.SimpleNamespace(entities={}, async_remove=lambda entity_id: None)
+    )
+    sys.modules["homeassistant.helpers.event"].async_track_time_change = _track_time_change
+    sys.modules["homeassistant.helpers.event"].async_call_later = _call_later
+
+    dt_util = sys.modules["homeassistant.util.dt"]
+    dt_util.get_default_time_zone = lambda: dt.timezone.utc
+    dt_util.now = lambda time_zone=None: dt.datetime.now(time_zone or dt.timezone.utc)
+    dt_util.as_local = lambda value: value.astimezone(dt.timezone.utc)
@@ -0,0 +1,451 @@
+"""Offline benchmarks for the Meal Planner integration.
+
+Runs ``async_setup_entry``, the services, the ``get`` websocket command and
+the sensors' ``_recalc`` against the in-process stub in ``hass_stub.py``, on
+synthetic datasets of 100 rows, 1000 rows and the ``MAX_*`` limits. For each
+benchmark it reports latency percentiles over the timed runs (after one
+untimed warm-up run), plus one traced run for memory (net new blocks and peak, via ``tracemalloc``) and the bytes
+written to storage.
+
+Usage (from the repository root)::
+
+    python benchmarks/run.py                  # run and compare to baseline.json
+    python benchmarks/run.py --save-baseline  # record a new baseline
+    python benchmarks/run.py --sizes 100 --quick --check
+
+Latencies depend on the machine, so record the baseline on the machine you
+compare on. Bytes written and memory are mostly machine independent.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import builtins
+import json
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import hass_stub  # noqa: E402
+
+hass_stub.install()
+
+import custom_components.meal_planner as mp  # noqa: E402
+from custom_components.meal_planner.const import (  # noqa: E402
+    CONF_UNDO_MEMORY_KB,
+    DOMAIN,
+    MAX_LIBRARY_SIZE,
+    MAX_RULES,
+    MAX_SCHEDULED_SIZE,
+    MAX_UNDO_MEMORY_KB,
+)
+from custom_components.meal_planner.migrations import SCHEMA_VERSION, SCHEMA_VERSION_KEY  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# name → (library rows, scheduled rows, recurring rules); "max" stays one row
+# short of each limit so that add and add_rule measure an insert rather than
+# the eviction or rejection at the cap (evicted rows are not undoable)
+SIZES = {
+    "100": (100, 100, 2),
+    "1000": (1000, 1000, 20),
+    "max": (MAX_LIBRARY_SIZE - 1, MAX_SCHEDULED_SIZE - 1, MAX_RULES - 1),
+}
+MEAL_TIMES = ("Breakfast", "Lunch", "Dinner", "Snack")
+INGREDIENTS = ("2 cups flour", "1 tsp salt", "3 eggs", "200 g cheese", "1 can tomatoes", "2 cloves garlic")
+
+# A benchmark is regressed when p50 latency grows by more than this fraction
+# or bytes written grow by more than BYTES_TOLERANCE
+DEFAULT_TOLERANCE = 0.5
+BYTES_TOLERANCE = 0.1
+
+
+# ---------- Synthetic data ----------
+
+def make_dataset(library_size: int, scheduled_size: int, rule_count: int, today: date) -> dict:
+    """Deterministic library, schedule and rules around ``today`` (inside retention)."""
+    rng = random.Random(library_size * 7919 + scheduled_size)
+    library = [
+        {
+            "id": f"lib{i:05d}",
+            "name": f"Meal {i}",
+            "recipe_url": f"https://example.com/recipes/{i}",
+            "videos": [],
+            "notes": "Family favourite" if i % 5 == 0 else "",
+            "ingredients": [{"quantity": None, "unit": "", "item": x} for x in rng.sample(INGREDIENTS, 3)],
+            "potential": i % 10 == 0,
+        }
+        for i in range(library_size)
+    ]
+    scheduled = [
+        {
+            "id": f"row{i:05d}",
+            "library_id": library[rng.randrange(library_size)]["id"],
+            "meal_time": rng.choice(MEAL_TIMES),
+            "date": (today + timedelta(days=rng.randint(-10, 30))).isoformat(),
+        }
+        for i in range(scheduled_size)
+    ]
+    rules = [
+        {
+            "id": f"rule{i:04d}",
+            "library_id": library[i % library_size]["id"],
+            "meal_time": rng.choice(MEAL_TIMES),
+            "frequency": "weekly",
+            "interval": 1 + i % 3,
+            "weekdays": [i % 7],
+            "start_date": (today - timedelta(days=60)).isoformat(),
+            "end_date": "",
+            "exceptions": [],
+        }
+        for i in range(rule_count)
+    ]
+    settings = {"week_start": "Monday", "days_after_today": 3, "days_to_keep": 14, SCHEMA_VERSION_KEY: SCHEMA_VERSION}
+    return {"library": library, "scheduled": scheduled, "rules": rules, "settings": settings}
+
+
+def write_dataset(storage: Path, dataset: dict) -> None:
+    storage.mkdir(parents=True, exist_ok=True)
+    for name, key in (
+        ("meal_library.json", "library"),
+        ("scheduled.json", "scheduled"),
+        ("settings.json", "settings"),
+        ("rules.json", "rules"),
+    ):
+        (storage / name).write_text(json.dumps(dataset[key], indent=2), encoding="utf-8")
+    (storage / "stats.json").unlink(missing_ok=True)
+
+
+# ---------- Measurement ----------
+
+class WriteCounter:
+    """Counts characters written through ``open(..., "w")`` while active."""
+
+    def __init__(self) -> None:
+        self.written = 0
+        self._open = builtins.open
+
+    def __enter__(self) -> "WriteCounter":
+        counter = self
+        real_open = self._open
+
+        def counting_open(file, mode="r", *args, **kwargs):
+            handle = real_open(file, mode, *args, **kwargs)
+            if "w" not in mode and "a" not in mode:
+                return handle
+            write = handle.write
+
+            def counted_write(data):
+                counter.written += len(data.encode("utf-8") if isinstance(data, str) else data)
+                return write(data)
+
+            handle.write = counted_write
+            return handle
+
+        builtins.open = counting_open
+        return self
+
+    def __exit__(self, *exc) -> None:
+        builtins.open = self._open
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class Result:
+    name: str
+    samples_ms: list[float] = field(default_factory=list)
+    blocks: int = 0
+    peak_kib: float = 0.0
+    written_kib: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "p50_ms": round(percentile(self.samples_ms, 50), 3),
+            "p95_ms": round(percentile(self.samples_ms, 95), 3),
+            "p99_ms": round(percentile(self.samples_ms, 99), 3),
+            "blocks": self.blocks,
+            "peak_kib": round(self.peak_kib, 1),
+            "written_kib": round(self.written_kib, 1),
+        }
+
+
+@dataclass
+class Bench:
+    """``action`` is timed; ``prepare`` and ``restore`` run around it untimed."""
+
+    name: str
+    action: Callable[[], Awaitable]
+    prepare: Optional[Callable[[], Awaitable]] = None
+    restore: Optional[Callable[[], Awaitable]] = None
+
+
+async def measure(bench: Bench, iterations: int) -> Result:
+    result = Result(bench.name)
+    for i in range(iterations + 2):
+        if bench.prepare:
+            await bench.prepare()
+        traced = i == iterations + 1
+        if i == 0:
+            # Warm-up run (not timed), so the first timed runs do not pay for
+            # filling caches and weigh on the p50 of a few --quick runs
+            await bench.action()
+        elif traced:
+            # One extra run under tracemalloc and write counting (not timed)
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            with WriteCounter() as writes:
+                await bench.action()
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            diff = after.compare_to(before, "filename")
+            result.blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+            result.peak_kib = peak / 1024
+            result.written_kib = writes.written / 1024
+        else:
+            start = time.perf_counter()
+            await bench.action()
+            result.samples_ms.append((time.perf_counter() - start) * 1000)
+        if bench.restore:
+            await bench.restore()
+    return result
+
+
+# ---------- Benchmarks ----------
+
+class Harness:
+    """One configured plan on a synthetic dataset."""
+
+    def __init__(self, root: Path, dataset: dict) -> None:
+        self.root = root
+        self.dataset = dataset
+        self.hass = None
+        self.entry = None
+
+    @property
+    def plan(self) -> dict:
+        return self.hass.data[DOMAIN][self.entry.entry_id]
+
+    async def setup(self) -> None:
+        self.hass = hass_stub.HomeAssistant(self.root)
+        self.entry = hass_stub.ConfigEntry(options={CONF_UNDO_MEMORY_KB: MAX_UNDO_MEMORY_KB})
+        await mp.async_setup_entry(self.hass, self.entry)
+        await self.hass.async_block_till_done()
+
+    async def unload(self) -> None:
+        await mp.async_unload_entry(self.hass, self.entry)
+
+    async def call(self, service: str, data: Optional[dict] = None):
+        return await self.hass.services.async_call(DOMAIN, service, data or {}, blocking=True, return_response=True)
+
+    async def undo_if_recorded(self, depth: int) -> None:
+        """Undo whatever the benchmarked call added to the history."""
+        while len(self.plan["history"]) > depth:
+            await self.call("undo")
+
+    def sensor(self, key: str):
+        return self.plan["sensors"][key]
+
+
+def service_benches(h: Harness, today: date) -> list[Bench]:
+    data = h.plan["data"]
+    rng = random.Random(1)
+    depth = {"n": 0}
+
+    def row_ids(count: int) -> list[str]:
+        return [m["id"] for m in rng.sample(data["scheduled"], min(count, len(data["scheduled"])))]
+
+    async def mark():
+        depth["n"] = len(h.plan["history"])
+
+    async def restore():
+        await h.undo_if_recorded(depth["n"])
+
+    def bench(name, action) -> Bench:
+        return Bench(name, action, prepare=mark, restore=restore)
+
+    # Library edits always hit the same entry, one with scheduled meals, so
+    # their cost does not depend on which entry the run count lands on
+    library_id = data["scheduled"][0]["library_id"]
+
+    async def undo_prepare():
+        # Always the same row, moved to another meal time, so every measured
+        # undo/redo reverts the same change whatever the run count
+        await mark()
+        row = data["scheduled"][0]
+        meal_time = MEAL_TIMES[(MEAL_TIMES.index(row["meal_time"]) + 1) % len(MEAL_TIMES)]
+        await h.call("update", {"row_id": row["id"], "meal_time": meal_time})
+
+    async def redo_prepare():
+        await undo_prepare()
+        await h.call("undo")
+
+    return [
+        bench("svc.add", lambda: h.call("add", {
+            "name": "Benchmark Stew", "meal_time": "Dinner", "date": today.isoformat(),
+            "ingredients": ["1 cup rice", "2 carrots"],
+        })),
+        bench("svc.update", lambda: h.call("update", {
+            "row_id": row_ids(1)[0], "meal_time": "Lunch", "date": (today + timedelta(days=2)).isoformat(),
+        })),
+        bench("svc.bulk_assign_date", lambda: h.call("bulk", {
+            "action": "assign_date", "ids": row_ids(10), "date": (today + timedelta(days=1)).isoformat(),
+        })),
+        bench("svc.bulk_delete", lambda: h.call("bulk", {"action": "delete", "ids": row_ids(10)})),
+        bench("svc.clear_week", lambda: h.call("clear_week")),
+        bench("svc.clear_potential", lambda: h.call("clear_potential")),
+        bench("svc.update_library", lambda: h.call("update_library", {
+            "library_id": library_id, "notes": "Updated notes", "ingredients": ["3 cups flour"],
+        })),
+        bench("svc.delete_library", lambda: h.call("delete_library", {"library_id": library_id})),
+        bench("svc.update_settings", lambda: h.call("update_settings", {"days_after_today": 3})),
+        bench("svc.add_rule", lambda: h.call("add_rule", {
+            "name": data["library"][0]["name"], "weekdays": ["fri"], "start_date": today.isoformat(),
+        })),
+        bench("svc.suggest", lambda: h.call("suggest", {"meal_times": ["Dinner", "Lunch"], "limit": 3})),
+        Bench("svc.undo", lambda: h.call("undo"), prepare=undo_prepare, restore=restore),
+        Bench("svc.redo", lambda: h.call("redo"), prepare=redo_prepare, restore=restore),
+    ]
+
+
+def read_benches(h: Harness) -> list[Bench]:
+    async def recalc(key):
+        h.sensor(key)._recalc()
+
+    conditional: dict[str, str] = {}
+
+    async def http_get(headers=None):
+        return await hass_stub.http_get(h.hass, f"/api/{DOMAIN}/plan", headers=headers)
+
+    async def remember_etag():
+        conditional["If-None-Match"] = (await http_get()).headers["ETag"]
+
+    async def http_get_not_modified():
+        if (await http_get(conditional)).status != 304:
+            raise RuntimeError("http.plan_not_modified: expected 304")
+
+    return [
+        Bench("ws.get", lambda: hass_stub.ws_call(h.hass, {"type": f"{DOMAIN}/get"})),
+        Bench("http.plan", http_get),
+        Bench("http.plan_not_modified", http_get_not_modified, prepare=remember_etag),
+        Bench("sensor.potential._recalc", lambda: recalc("potential")),
+        Bench("sensor.week._recalc", lambda: recalc("week")),
+        Bench("sensor.shopping_list._recalc", lambda: recalc("shopping")),
+    ]
+
+
+async def run_size(size: str, iterations: int, setup_iterations: int) -> dict[str, Result]:
+    library_size, scheduled_size, rule_count = SIZES[size]
+    today = date.today()
+    dataset = make_dataset(library_size, scheduled_size, rule_count, today)
+    root = Path(tempfile.mkdtemp(prefix=f"meal_planner_bench_{size}_"))
+    storage = root / "meal_planner"
+    results: dict[str, Result] = {}
+    try:
+        h = Harness(root, dataset)
+
+        async def fresh_files():
+            write_dataset(storage, dataset)
+
+        results["setup"] = await measure(
+            Bench("setup", h.setup, prepare=fresh_files, restore=h.unload), setup_iterations
+        )
+
+        write_dataset(storage, dataset)
+        await h.setup()
+        for bench in read_benches(h) + service_benches(h, today):
+            results[bench.name] = await measure(bench, iterations)
+            # Every benchmark must leave the dataset as it found it
+            data = h.plan["data"]
+            counts = (len(data["library"]), len(data["scheduled"]), len(data["rules"]))
+            if counts != (library_size, scheduled_size, rule_count):
+                raise RuntimeError(f"{bench.name} changed the dataset: {counts}")
+        await h.unload()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+# ---------- Reporting ----------
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Benchmarks whose p50 latency or bytes written regressed against ``baseline``."""
+    regressions = []
+    for key, now in current.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if now["p50_ms"] > before["p50_ms"] * (1 + tolerance) and now["p50_ms"] - before["p50_ms"] > 0.05:
+            regressions.append(f"{key}: p50 {before['p50_ms']:.3f} → {now['p50_ms']:.3f} ms")
+        if now["written_kib"] > before["written_kib"] * (1 + BYTES_TOLERANCE) + 1:
+            regressions.append(f"{key}: written {before['written_kib']:.1f} → {now['written_kib']:.1f} KiB")
+    return regressions
+
+
+def print_table(size: str, results: dict[str, Result], baseline: dict) -> None:
+    library_size, scheduled_size, rule_count = SIZES[size]
+    print(f"\n== {size}: {library_size} library, {scheduled_size} scheduled, {rule_count} rules")
+    print(f"{'benchmark':30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'blocks':>8} {'peak KiB':>9} {'written KiB':>12} {'p50 vs base':>12}")
+    for name, result in results.items():
+        row = result.as_dict()
+        before = baseline.get(f"{size}/{name}")
+        delta = f"{(row['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}%" if before and before["p50_ms"] else "-"
+        print(
+            f"{name:30} {row['p50_ms']:9.3f} {row['p95_ms']:9.3f} {row['p99_ms']:9.3f} "
+            f"{row['blocks']:8d} {row['peak_kib']:9.1f} {row['written_kib']:12.1f} {delta:>12}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--iterations", type=int, default=20, help="timed runs per benchmark")
+    parser.add_argument("--quick", action="store_true", help="5 timed runs per benchmark")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed p50 growth (0.5 = 50%%)")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    iterations = 5 if args.quick else args.iterations
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() and not args.save_baseline else {}
+
+    current = {}
+    for size in args.sizes:
+        results = asyncio.run(run_size(size, iterations, max(3, iterations // 5)))
+        print_table(size, results, baseline)
+        current.update({f"{size}/{name}": result.as_dict() for name, result in results.items()})
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(current, baseline, args.tolerance)
+    if baseline:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}")
+        for line in regressions:
+            print(f"  {line}")
+    return 1 if regressions and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import copy
+import functools
+import itertools
 import logging
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from datetime import datetime, timedelta, date
 from typing import Optional
@@ -8,17 +14,76 @@ import uuid
 
 import voluptuous as vol
 
-from homeassistant.components.http import StaticPathConfig
 from homeassistant.components.frontend import (
     async_register_built_in_panel,
     async_remove_panel,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
 from homeassistant.core import callback
-
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.json import json_bytes
+
+from .api import async_register_data_view
+from .archive import ARCHIVE_DIR, Archive
+from .assets import async_register_assets
+from .changelog import ChangeLog
+from .changes import ChangeSet, LIBRARY, RULES, SCHEDULED, TEMPLATES, VERSION
+from .recurrence import (
+    FREQUENCIES,
+    MAX_RULE_INTERVAL,
+    expand_rules,
+    is_occurrence,
+    split_occurrence_id,
+)
+from .events import updated_event_data
+from .eviction import LibraryLRU
+from .history import REDO, UNDO, UndoHistory
+from .index import DateIndex
+from .loader import load_records
+from .metrics import HTTP, SAVE, SENSOR, SERVICE, WEBSOCKET, PerfCounters
+from .migrations import SCHEMA_VERSION, SCHEMA_VERSION_KEY, migrate
+from .profiling import (
+    DEFAULT_PROFILE_SECONDS,
+    MAX_PROFILE_CALLS,
+    MAX_PROFILE_SECONDS,
+    ProfileSession,
+)
+from .shopping import MAX_INGREDIENTS, ShoppingList, parse_ingredient
+from .snapshot import Snapshot, SnapshotStore
+from .stats import MealStats
+from .storage import SaveScheduler, dump_json
+from .templates import (
+    CONFLICT_MODES,
+    OVERWRITE,
+    SKIP,
+    TEMPLATE_DAYS,
+    capture_week,
+    find_template,
+    template_placements,
+)
+from .tracing import (
+    MUTATE,
+    NOTIFY,
+    PERSIST,
+    QUERY,
+    SENSORS,
+    VALIDATE,
+    enter_stage,
+    traced,
+    traced_operation,
+)
+from .suggest import (
+    suggest,
+    DEFAULT_SUGGEST_MEAL_TIMES,
+    DEFAULT_SUGGEST_LIMIT,
+    MAX_SUGGEST_LIMIT,
+)
 from .const import (
     DOMAIN,
+    CARDS_LOADER,
     STORAGE_FILE,
     STORAGE_DIR,
     EVENT_UPDATED,
@@ -28,10 +93,40 @@ from .const import (
     MAX_LIBRARY_SIZE,
     MAX_SCHEDULED_SIZE,
     MAX_VIDEOS,
+    STATS_FILE,
+    RULES_FILE,
+    MAX_RULES,
+    TEMPLATES_FILE,
+    MAX_TEMPLATES,
+    MAX_TEMPLATE_MEALS,
+    RULE_HORIZON_DAYS,
+    MAX_HISTORY_DAYS,
+    CONF_STATS_SENSOR,
+    CONF_STORAGE_DIR,
+    CONF_SLUG,
+    CARDS_URL_KEY,
+    CONF_UNDO_DEPTH,
+    CONF_UNDO_MEMORY_KB,
+    DEFAULT_UNDO_DEPTH,
+    DEFAULT_UNDO_MEMORY_KB,
+    CONF_PURGE_HOUR,
+    DEFAULT_PURGE_HOUR,
+    CONF_SLOW_OPERATION_MS,
+    DEFAULT_SLOW_OPERATION_MS,
+    CONF_STORAGE_FORMAT,
+    STORAGE_FORMAT_JSON,
+    CONF_SAVE_DELAY_MS,
+    DEFAULT_SAVE_DELAY_MS,
+    CONF_MAX_LIBRARY_SIZE,
+    CONF_MAX_SCHEDULED_SIZE,
+    CONF_CHANGE_LOG_DEPTH,
+    DEFAULT_CHANGE_LOG_DEPTH,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["sensor", "calendar"]
+
 # ----------------------------
 # In-memory defaults / helpers
 # ----------------------------
@@ -40,9 +135,12 @@ DEFAULT_DATA = {
     "settings": {"week_start": "Sunday", "days_after_today": 3, "days_to_keep": 14},
     "scheduled": [],  # list of entries with id, name, meal_time, date, recipe_url, notes
     "library": [],    # list of {name, recipe_url, notes}
+    "rules": [],      # recurring meals, see recurrence.py
+    "templates": [],  # named week templates, see templates.py
 }
 
 MEAL_TIME_ORDER = {"Breakfast": 0, "Lunch": 1, "Dinner": 2, "Snack": 3}
+WEEKDAY_INDEX = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
 
 
 def _current_week_bounds(today: date, week_start: str) -> tuple[date, date]:
@@ -64,27 +162,184 @@ def _parse_date(s: str) -> Optional[date]:
         return None
 
 
-def _upsert_library(data: dict, name: str, recipe_url: str, notes: str):
-    key = (name or "").strip().lower()
-    if not key:
-        return
-    lib = data.setdefault("library", [])
-
-    # Enforce library size limit
-    if len(lib) >= MAX_LIBRARY_SIZE:
-        # Remove oldest entry if at limit
-        lib.pop(0)
-
-    for item in lib:
-        if (item.get("name", "").strip().lower()) == key:
-            if recipe_url:
-                item["recipe_url"] = recipe_url
-            if notes:
-                item["notes"] = notes
-            return
-    lib.append({"name": name.strip(), "recipe_url": recipe_url, "notes": notes})
+def _parse_weekdays(values) -> list:
+    """Weekday names ("Friday", "fri") or numbers (Monday = 0) → sorted indexes."""
+    days = set()
+    for v in values or []:
+        if isinstance(v, int) and 0 <= v <= 6:
+            days.add(v)
+        elif isinstance(v, str) and v.strip()[:3].lower() in WEEKDAY_INDEX:
+            days.add(WEEKDAY_INDEX[v.strip()[:3].lower()])
+    return sorted(days)
+
+
+def _find_rule(data: dict, rule_id: str) -> Optional[dict]:
+    for rule in data.get("rules", []):
+        if rule.get("id") == rule_id:
+            return rule
+    return None
+
+
+def _detach_occurrence(data: dict, row_id: str, changes: ChangeSet) -> Optional[dict]:
+    """Turn one recurring occurrence into an ordinary scheduled row.
+
+    The date is added to the rule's exceptions so the series skips it; the
+    returned row can then be edited like any other. None if ``row_id`` is not
+    a live occurrence.
+    """
+    parts = split_occurrence_id(row_id)
+    if parts is None:
+        return None
+    rule = _find_rule(data, parts[0])
+    if rule is None or not is_occurrence(rule, parts[1]):
+        return None
+    changes.touched(RULES, rule)
+    rule.setdefault("exceptions", []).append(parts[1])
+    row = {
+        "id": uuid.uuid4().hex,
+        "library_id": rule.get("library_id", ""),
+        "meal_time": rule.get("meal_time", "Dinner"),
+        "date": parts[1],
+    }
+    data["scheduled"].append(row)
+    changes.added(SCHEDULED, row)
+    return row
+
+
+def _skip_occurrence(data: dict, row_id: str, changes: ChangeSet) -> Optional[dict]:
+    """Drop one recurring occurrence from its series. Returns the rule, or None."""
+    parts = split_occurrence_id(row_id)
+    if parts is None:
+        return None
+    rule = _find_rule(data, parts[0])
+    if rule is None or not is_occurrence(rule, parts[1]):
+        return None
+    changes.touched(RULES, rule)
+    rule.setdefault("exceptions", []).append(parts[1])
+    return rule
+
+
+def _remove_rules_for(data: dict, library_ids: set, changes: ChangeSet) -> bool:
+    """Delete recurring rules that schedule any of ``library_ids``."""
+    kept = []
+    for rule in data.get("rules", []):
+        if rule.get("library_id") in library_ids:
+            changes.removed(RULES, rule)
+        else:
+            kept.append(rule)
+    removed = len(kept) != len(data.get("rules", []))
+    data["rules"] = kept
+    return removed
+
+
+def _remove_template_meals(data: dict, library_ids: set, changes: ChangeSet) -> bool:
+    """Drop the meals of any of ``library_ids`` from week templates."""
+    removed = False
+    for template in data.get("templates", []):
+        meals = [m for m in template.get("meals", []) if m.get("library_id") not in library_ids]
+        if len(meals) != len(template.get("meals", [])):
+            changes.touched(TEMPLATES, template)
+            template["meals"] = meals
+            removed = True
+    return removed
+
+
+def _parse_conflict(value) -> Optional[str]:
+    conflict = (value or SKIP).strip().lower()
+    if conflict not in CONFLICT_MODES:
+        _LOGGER.warning("Invalid conflict mode: %s (use %s)", value, ", ".join(CONFLICT_MODES))
+        return None
+    return conflict
+
+
+def _place_meals(data: dict, index: DateIndex, placements: list, conflict: str, changes: ChangeSet) -> dict:
+    """Schedule ``(date, meal_time, library_id)`` placements as one change.
+
+    A slot conflicts when it already held a scheduled meal before this call;
+    those are looked up through the date index for the placements' date span
+    only. Placements whose library entry no longer exists are skipped.
+    Returns how many meals were copied, skipped and replaced.
+    """
+    result = {"copied": 0, "skipped": 0, "replaced": 0}
+    if not placements:
+        return result
+    library_map = {lib.get("id"): lib for lib in data["library"]}
+    dates = [p[0] for p in placements]
+    occupied = {}
+    for row in index.range(date.fromisoformat(min(dates)), date.fromisoformat(max(dates))):
+        occupied.setdefault((row.get("date"), row.get("meal_time", "Dinner")), []).append(row)
+
+    replaced_ids = set()
+    for date_str, meal_time, library_id in placements:
+        library_entry = library_map.get(library_id)
+        existing = occupied.get((date_str, meal_time))
+        if library_entry is None or (existing and conflict == SKIP):
+            result["skipped"] += 1
+            continue
+        if existing and conflict == OVERWRITE:
+            for row in existing:
+                changes.removed(SCHEDULED, row)
+                replaced_ids.add(row["id"])
+            result["replaced"] += len(existing)
+            # Further meals for this slot (several in the source) are added next to it
+            occupied[(date_str, meal_time)] = []
+        if library_entry.get("potential", False):
+            changes.touched(LIBRARY, library_entry)
+            library_entry["potential"] = False
+        row = {
+            "id": uuid.uuid4().hex,
+            "library_id": library_id,
+            "meal_time": meal_time,
+            "date": date_str,
+        }
+        data["scheduled"].append(row)
+        changes.added(SCHEDULED, row)
+        result["copied"] += 1
 
+    if replaced_ids:
+        data["scheduled"] = [m for m in data["scheduled"] if m["id"] not in replaced_ids]
+    return result
 
+
+def _trim_scheduled(data: dict, changes: ChangeSet, max_size: int) -> None:
+    """Drop the oldest scheduled rows beyond ``max_size``.
+
+    Capacity trims count as purges: the meal statistics keep them and undo
+    does not bring them back.
+    """
+    if len(data["scheduled"]) > max_size:
+        for m in data["scheduled"][:-max_size]:
+            changes.removed(SCHEDULED, m, purged=True)
+        data["scheduled"] = data["scheduled"][-max_size:]
+
+
+def _make_library_room(data: dict, lru: LibraryLRU, changes: ChangeSet, max_size: int) -> bool:
+    """Evict least recently used unreferenced entries until one more fits.
+
+    Returns False when no entry can go: every remaining one is scheduled, used
+    by a recurring meal or template, or marked potential.
+    """
+    while len(data["library"]) >= max_size:
+        library_id = lru.pop_candidate()
+        if library_id is None:
+            _LOGGER.warning(
+                "Meal library is full (%d entries) and every entry is scheduled, recurring, in a template or potential",
+                max_size,
+            )
+            return False
+        evicted = lru.take(data["library"], library_id)
+        if evicted is not None:
+            changes.removed(LIBRARY, evicted)
+            _LOGGER.debug("Library full: evicted least recently used entry %s", library_id)
+    return True
+
+
+def _library_has_room(data: dict, lru: LibraryLRU, max_size: int) -> bool:
+    """Whether ``_make_library_room`` can fit one more entry. Changes nothing."""
+    return len(data["library"]) < max_size or lru.peek_candidate() is not None
+
+
+@traced(VALIDATE)
 def _validate_date(date_str: str) -> Optional[str]:
     """Validate ISO date format (YYYY-MM-DD). Returns validated string or None."""
     if not date_str or not date_str.strip():
@@ -97,6 +352,7 @@ def _validate_date(date_str: str) -> Optional[str]:
         return None
 
 
+@traced(VALIDATE)
 def _validate_url(url: str) -> str:
     """Validate and sanitize URL. Returns sanitized URL or empty string."""
     url = (url or "").strip()
@@ -113,6 +369,7 @@ def _validate_url(url: str) -> str:
     return url
 
 
+@traced(VALIDATE)
 def _validate_url_list(urls) -> list:
     """Validate and sanitize a list of URLs. Returns cleaned list, capped to MAX_VIDEOS."""
     if not isinstance(urls, list):
@@ -122,6 +379,25 @@ def _validate_url_list(urls) -> list:
     return cleaned[:MAX_VIDEOS]
 
 
+@traced(VALIDATE)
+def _validate_ingredients(values) -> list:
+    """Validate an ingredient list (dicts or "2 cups flour" lines). Returns cleaned list."""
+    if not isinstance(values, list):
+        return []
+    cleaned = []
+    for value in values:
+        ingredient = parse_ingredient(value)
+        if ingredient is None:
+            continue
+        ingredient["item"] = _sanitize_string(ingredient["item"], MAX_NAME_LENGTH, "ingredient")
+        cleaned.append(ingredient)
+    if len(cleaned) > MAX_INGREDIENTS:
+        _LOGGER.warning("Too many ingredients (%d), keeping first %d", len(cleaned), MAX_INGREDIENTS)
+        cleaned = cleaned[:MAX_INGREDIENTS]
+    return cleaned
+
+
+@traced(VALIDATE)
 def _sanitize_string(value: str, max_length: int, field_name: str = "field") -> str:
     """Sanitize and truncate string input."""
     value = (value or "").strip()
@@ -150,65 +426,814 @@ def _enforce_scheduled_limits(data: dict):
     _LOGGER.info("Scheduled meals limit reached, removed %d oldest entries", len(scheduled) - MAX_SCHEDULED_SIZE)
 
 
-def _purge_old_scheduled(data: dict) -> int:
-    """Remove scheduled entries with dates older than days_to_keep. Returns count removed."""
+def _expired_scheduled(index: DateIndex, data: dict) -> tuple[date, list]:
+    """``(cutoff, rows)`` for the scheduled rows dated before the retention cutoff.
+
+    Read from the date index, so the cost is the number of expired rows.
+    """
     days_to_keep = int(data.get("settings", {}).get("days_to_keep", 14))
+    cutoff = datetime.now().date() - timedelta(days=max(0, days_to_keep))
     if days_to_keep < 0:
-        return 0
-    cutoff = datetime.now().date() - timedelta(days=days_to_keep)
-    original = data["scheduled"]
-    kept = [
-        m for m in original
-        if not (m.get("date") or "").strip()  # keep: no date (potential meals)
-        or _parse_date(m.get("date", "")) is None  # keep: unparseable date
-        or _parse_date(m.get("date", "")) >= cutoff  # keep: recent enough
+        return cutoff, []
+    rows = [
+        m for m in index.range(date.min, cutoff - timedelta(days=1))
+        if _parse_date(m.get("date", "")) is not None  # unparseable dates are kept
     ]
-    removed = len(original) - len(kept)
-    if removed:
-        data["scheduled"] = kept
-        _LOGGER.info("Purged %d scheduled entries older than %d days (cutoff: %s)", removed, days_to_keep, cutoff)
-    return removed
+    return cutoff, rows
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    return True
 
 
-def _migrate_potential_to_library(data: dict) -> bool:
-    """Move the potential flag from scheduled entries into library entries.
+# ----------------------------------------
+# Service / websocket routing across plans
+# ----------------------------------------
+
+# Services that answer with data (``return_response``)
+RESPONSE_SERVICES = {
+    "suggest": SupportsResponse.OPTIONAL,
+    UNDO: SupportsResponse.OPTIONAL,
+    REDO: SupportsResponse.OPTIONAL,
+    "profile": SupportsResponse.OPTIONAL,
+    "copy_range": SupportsResponse.OPTIONAL,
+    "apply_template": SupportsResponse.OPTIONAL,
+    "update": SupportsResponse.OPTIONAL,
+    "update_library": SupportsResponse.OPTIONAL,
+}
 
-    - Library entries with no potential field get potential=False.
-    - Scheduled entries with potential=True OR with no date are removed from
-      scheduled; their library entry gets potential=True.
-    - Any leftover 'potential' key on normal scheduled entries is stripped.
-    Returns True if anything was modified.
-    """
-    changed = False
-    library_map = {lib.get("id"): lib for lib in data.get("library", [])}
-
-    for lib in data.get("library", []):
-        if "potential" not in lib:
-            lib["potential"] = False
-            changed = True
-
-    keep_scheduled = []
-    for m in data.get("scheduled", []):
-        is_potential = m.get("potential", False)
-        has_no_date = not (m.get("date") or "").strip()
-
-        if is_potential or has_no_date:
-            lib_entry = library_map.get(m.get("library_id"))
-            if lib_entry is not None:
-                lib_entry["potential"] = True
-            changed = True
+
+def _get_plan(hass: HomeAssistant, entry_id: Optional[str] = None) -> Optional[dict]:
+    """The plan for ``entry_id``, or the default plan when none is given."""
+    plans = hass.data.get(DOMAIN, {})
+    if entry_id:
+        return plans.get(entry_id)
+    return next((p for p in plans.values() if p["default"]), next(iter(plans.values()), None))
+
+
+@contextmanager
+def _operation(plan: dict, category: str, name: str):
+    """Time and trace one service call or websocket command; profile it while a session runs."""
+    with traced_operation(category, name, plan["slow_operation_ms"], _LOGGER) as outermost:
+        profiler = plan["profiler"] if outermost else None
+        with plan["metrics"].timed(category, name), (profiler.capture() if profiler else nullcontext()):
+            yield
+
+
+def _async_register_services(hass: HomeAssistant, names) -> None:
+    """Register the domain services once; each call runs in the plan named by ``entry_id``."""
+
+    def make_handler(name):
+        async def handler(call: ServiceCall):
+            plan = _get_plan(hass, call.data.get("entry_id"))
+            if plan is None:
+                _LOGGER.warning("No meal plan found for entry_id: %s", call.data.get("entry_id"))
+                return None
+            with _operation(plan, SERVICE, name):
+                enter_stage(MUTATE)
+                result = await plan["services"][name](call)
+                enter_stage(NOTIFY)
+                return result
+        return handler
+
+    for name in names:
+        if name in RESPONSE_SERVICES:
+            hass.services.async_register(
+                DOMAIN, name, make_handler(name), supports_response=RESPONSE_SERVICES[name]
+            )
         else:
-            if "potential" in m:
-                del m["potential"]
-                changed = True
-            keep_scheduled.append(m)
+            hass.services.async_register(DOMAIN, name, make_handler(name))
 
-    data["scheduled"] = keep_scheduled
-    return changed
 
+def _async_remove_services(hass: HomeAssistant) -> None:
+    for name in list(hass.services.async_services().get(DOMAIN, {})):
+        hass.services.async_remove(DOMAIN, name)
 
-async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    return True
+
+def _plan_for_msg(hass: HomeAssistant, connection, msg) -> Optional[dict]:
+    """The plan a websocket message addresses; sends an error when there is none."""
+    plan = _get_plan(hass, msg.get("entry_id"))
+    if plan is None:
+        connection.send_error(msg["id"], "not_found", f"Meal plan not found: {msg.get('entry_id')}")
+    return plan
+
+
+async def _call_plan_service(hass: HomeAssistant, msg, service: str, payload: dict, return_response: bool = False):
+    """Run a plan service for a websocket command and wait for it.
+
+    The call is blocking so the service runs in the command's task: its work
+    is part of the command's trace and latency, and its errors reach the
+    command handler.
+    """
+    if "entry_id" in msg:
+        payload["entry_id"] = msg["entry_id"]
+    return await hass.services.async_call(
+        DOMAIN, service, payload, blocking=True, return_response=return_response
+    )
+
+
+def _timed_ws(func):
+    """Time and trace a websocket handler as an operation of the plan it addresses."""
+    name = func.__name__.removeprefix("ws_")
+
+    def timer(hass, msg):
+        plan = _get_plan(hass, msg.get("entry_id"))
+        return _operation(plan, WEBSOCKET, name) if plan is not None else nullcontext()
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(hass, connection, msg):
+            with timer(hass, msg):
+                await func(hass, connection, msg)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(hass, connection, msg):
+        with timer(hass, msg):
+            func(hass, connection, msg)
+    return wrapper
+
+
+def _get_header(plan: dict, snapshot: Snapshot) -> dict:
+    """Plan fields sent with the ``get`` payload."""
+    return {
+        "entry_id": plan["entry_id"],
+        "title": plan["name"],
+        "history": plan["history"].status(),
+        # Pass to meal_planner/changes to receive only what changed since
+        "revision": plan["changelog"].revision(snapshot.version),
+    }
+
+
+def _meal_item(sched: dict, library_entry: Optional[dict]) -> dict:
+    """A scheduled row merged with its library entry, as the frontend shows it."""
+    item = {
+        "id": sched.get("id", ""),
+        "name": library_entry.get("name", "") if library_entry else "",
+        "date": sched.get("date", ""),
+        "meal_time": sched.get("meal_time", "Dinner"),
+        "recipe_url": library_entry.get("recipe_url", "") if library_entry else "",
+        "videos": library_entry.get("videos", []) if library_entry else [],
+        "notes": library_entry.get("notes", "") if library_entry else "",
+        "ingredients": library_entry.get("ingredients", []) if library_entry else [],
+    }
+    if "rule_id" in sched:
+        item["rule_id"] = sched["rule_id"]
+    else:
+        # Occurrences of recurring meals have no version of their own
+        item["version"] = sched.get(VERSION, 0)
+        item["library_version"] = library_entry.get(VERSION, 0) if library_entry else 0
+    return item
+
+
+def _library_item(lib: dict) -> dict:
+    """A library entry as the frontend shows it."""
+    return {
+        "id": lib.get("id", ""),
+        "name": lib.get("name", ""),
+        "recipe_url": lib.get("recipe_url", ""),
+        "videos": lib.get("videos", []),
+        "notes": lib.get("notes", ""),
+        "ingredients": lib.get("ingredients", []),
+        "potential": lib.get("potential", False),
+        "version": lib.get(VERSION, 0),
+    }
+
+
+def _parse_version(value) -> Optional[int]:
+    """An ``expected_version`` field: None when not given. Raises ValueError when invalid."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(value)
+    return int(value)
+
+
+def _stale(row: dict, expected) -> bool:
+    """Whether ``row`` changed since the client saw ``expected`` (None: not checked)."""
+    return expected is not None and row.get(VERSION, 0) != expected
+
+
+class VersionConflict(HomeAssistantError):
+    """An update expected a version the row no longer has; ``current`` is the row as it is now."""
+
+    def __init__(self, message: str, current: dict) -> None:
+        super().__init__(message)
+        self.current = current
+
+
+def _get_result(
+    snapshot: Snapshot, start: str, end: str, today: date, scheduled_ids: Optional[list] = None
+) -> dict:
+    """The ``get`` websocket payload (without plan header) built from ``snapshot``.
+
+    Reads only the immutable snapshot, so it may run in the executor. With
+    ``scheduled_ids`` (looked up on the event loop) only those scheduled rows
+    are included instead of all of them.
+    """
+    library = snapshot.library
+    settings = snapshot.settings
+
+    window_start = _parse_date(start) or today - timedelta(
+        days=max(0, int(settings.get("days_to_keep", 14)))
+    )
+    window_end = _parse_date(end) or today + timedelta(days=RULE_HORIZON_DAYS)
+    occurrences = expand_rules(snapshot.rules.values(), window_start, window_end)
+
+    if scheduled_ids is None:
+        scheduled = snapshot.scheduled.values()
+    else:
+        scheduled = (snapshot.scheduled[row_id] for row_id in scheduled_ids if row_id in snapshot.scheduled)
+
+    # Merge scheduled with library data for frontend
+    merged_scheduled = [
+        _meal_item(sched, library.get(sched.get("library_id")))
+        for sched in itertools.chain(scheduled, occurrences)
+    ]
+
+    rules = []
+    for rule in snapshot.rules.values():
+        library_entry = library.get(rule.get("library_id"))
+        rules.append({**rule, "name": library_entry.get("name", "") if library_entry else ""})
+
+    # Build library list with unique names for frontend (include id for edit/delete)
+    unique_library = []
+    seen_names = set()
+    for lib in library.values():
+        name = lib.get("name", "").lower()
+        if name and name not in seen_names:
+            seen_names.add(name)
+            unique_library.append(_library_item(lib))
+
+    return {
+        "settings": dict(settings) or {"week_start": "Sunday"},
+        "scheduled": merged_scheduled,
+        "library": unique_library,
+        "rules": rules,
+    }
+
+
+async def _async_plan_json(
+    hass: HomeAssistant, plan: dict, snapshot: Snapshot, start: str, end: str, today: date
+) -> bytes:
+    """The ``get`` payload as JSON, for the REST endpoint; built and encoded in the executor.
+
+    A ``start`` or ``end`` limits the scheduled meals to that range (read from
+    the date index, which matches ``snapshot`` between commits), not only the
+    expansion of recurring meals.
+    """
+    header = _get_header(plan, snapshot)
+    scheduled_ids = None
+    if start or end:
+        scheduled_ids = [
+            row["id"] for row in plan["index"].range(_parse_date(start) or date.min, _parse_date(end) or date.max)
+        ]
+
+    def build_and_encode():
+        return json_bytes({**header, **_get_result(snapshot, start, end, today, scheduled_ids)})
+
+    return await hass.async_add_executor_job(build_and_encode)
+
+
+def _async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands (once for all plans)."""
+    from homeassistant.components import websocket_api
+
+    def _send_conflict(connection, msg_id, err: VersionConflict) -> None:
+        """Reply with a ``conflict`` error that carries the row as it is now."""
+        message = websocket_api.error_message(msg_id, "conflict", str(err))
+        message["error"]["current"] = err.current
+        connection.send_message(message)
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/get",
+        vol.Optional("entry_id"): str,
+        vol.Optional("start"): str,
+        vol.Optional("end"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_get(hass, connection, msg):
+        """Get data - merges library + scheduled for frontend compatibility.
+
+        Recurring meals are expanded only for ``start``..``end`` (default: the
+        retention window through ``RULE_HORIZON_DAYS`` ahead). The merge and
+        the JSON encoding run in the executor, on the plan's current snapshot.
+        """
+        plan = _plan_for_msg(hass, connection, msg)
+        if plan is None:
+            return
+        enter_stage(QUERY)
+        snapshot = plan["snapshots"].current
+        header = _get_header(plan, snapshot)
+        today = datetime.now().date()
+
+        def build_and_encode():
+            result = _get_result(snapshot, msg.get("start", ""), msg.get("end", ""), today)
+            return json_bytes(websocket_api.result_message(msg["id"], {**header, **result}))
+
+        connection.send_message(await hass.async_add_executor_job(build_and_encode))
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/changes",
+        vol.Optional("entry_id"): str,
+        vol.Required("since_revision"): str,
+    })
+    @callback
+    @_timed_ws
+    def ws_changes(hass, connection, msg):
+        """Library, scheduled and rule rows changed since ``since_revision`` (delta sync).
+
+        ``reset`` is true when the revision is too old or from before a
+        restart; the client should then call ``get`` again.
+        """
+        plan = _plan_for_msg(hass, connection, msg)
+        if plan is None:
+            return
+        enter_stage(QUERY)
+        snapshot = plan["snapshots"].current
+        delta = plan["changelog"].delta(msg["since_revision"], snapshot)
+        if delta is None:
+            connection.send_result(msg["id"], {
+                "reset": True, "revision": plan["changelog"].revision(snapshot.version),
+            })
+            return
+        connection.send_result(msg["id"], {"reset": False, **delta})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/history",
+        vol.Optional("entry_id"): str,
+        vol.Required("start"): str,
+        vol.Optional("end"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_history(hass, connection, msg):
+        """Scheduled meals dated ``start``..``end`` (default today), archived ones included.
+
+        Only the archive months the range covers are decompressed, in the executor.
+        """
+        plan = _plan_for_msg(hass, connection, msg)
+        if plan is None:
+            return
+        enter_stage(QUERY)
+        start = _parse_date(msg["start"])
+        end = _parse_date(msg.get("end", "")) or datetime.now().date()
+        if start is None or end < start or (end - start).days > MAX_HISTORY_DAYS:
+            connection.send_error(msg["id"], "invalid_format", "Invalid history date range")
+            return
+        snapshot = plan["snapshots"].current
+        archive = plan["archive"]
+
+        def build():
+            start_str, end_str = start.isoformat(), end.isoformat()
+            meals = {}
+            for row in archive.read(start, end):
+                meals[row.get("id", "")] = {
+                    "id": row.get("id", ""),
+                    "date": row.get("date", ""),
+                    "meal_time": row.get("meal_time", "Dinner"),
+                    "library_id": row.get("library_id", ""),
+                    "name": row.get("name", ""),
+                    "archived": True,
+                }
+            for row in snapshot.scheduled.values():
+                if start_str <= row.get("date", "") <= end_str:
+                    library_entry = snapshot.library.get(row.get("library_id"))
+                    meals[row["id"]] = {
+                        "id": row["id"],
+                        "date": row.get("date", ""),
+                        "meal_time": row.get("meal_time", "Dinner"),
+                        "library_id": row.get("library_id", ""),
+                        "name": library_entry.get("name", "") if library_entry else "",
+                        "archived": False,
+                    }
+            return {
+                "start": start_str,
+                "end": end_str,
+                "meals": sorted(meals.values(), key=lambda m: (m["date"], m["meal_time"])),
+                "archived_months": archive.months(start, end),
+            }
+
+        connection.send_result(msg["id"], await hass.async_add_executor_job(build))
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/add",
+        vol.Optional("entry_id"): str,
+        vol.Required("name"): str,
+        vol.Optional("meal_time"): str,
+        vol.Optional("date"): str,
+        vol.Optional("recipe_url"): str,
+        vol.Optional("videos"): list,
+        vol.Optional("notes"): str,
+        vol.Optional("ingredients"): list,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_add(hass, connection, msg):
+        payload = {
+            "name": msg.get("name",""),
+            "meal_time": msg.get("meal_time","Dinner"),
+            "date": msg.get("date",""),
+            "recipe_url": msg.get("recipe_url",""),
+            "videos": msg.get("videos",[]),
+            "notes": msg.get("notes",""),
+        }
+        if "ingredients" in msg:
+            payload["ingredients"] = msg.get("ingredients")
+        await _call_plan_service(hass, msg, "add", payload)
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/update",
+        vol.Optional("entry_id"): str,
+        vol.Required("row_id"): str,
+        vol.Optional("name"): str,
+        vol.Optional("meal_time"): str,
+        vol.Optional("date"): str,
+        vol.Optional("recipe_url"): str,
+        vol.Optional("videos"): list,
+        vol.Optional("notes"): str,
+        vol.Optional("ingredients"): list,
+        vol.Optional("expected_version"): int,
+        vol.Optional("expected_library_version"): int,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_update(hass, connection, msg):
+        try:
+            payload = {"row_id": msg.get("row_id", "")}
+            for k in ("name", "meal_time", "date", "recipe_url", "videos", "notes", "ingredients",
+                      "expected_version", "expected_library_version"):
+                if k in msg:
+                    payload[k] = msg.get(k, "")
+            result = await _call_plan_service(
+                hass, msg, "update", payload, return_response=True
+            )
+            connection.send_result(msg["id"], result or {"success": False})
+        except VersionConflict as e:
+            _send_conflict(connection, msg["id"], e)
+        except Exception as e:
+            _LOGGER.error("ws_update failed: %s", e, exc_info=True)
+            connection.send_error(msg["id"], "update_failed", str(e))
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/bulk",
+        vol.Optional("entry_id"): str,
+        vol.Required("action"): str,
+        vol.Required("ids"): list,
+        vol.Optional("date"): str,
+        vol.Optional("meal_time"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_bulk(hass, connection, msg):
+        await _call_plan_service(hass, msg, "bulk", {
+            "action": msg.get("action",""),
+            "ids": msg.get("ids",[]),
+            "date": msg.get("date",""),
+            "meal_time": msg.get("meal_time",""),
+        })
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/update_settings",
+        vol.Optional("entry_id"): str,
+        vol.Optional("week_start"): str,
+        vol.Optional("days_after_today"): int,
+        vol.Optional("days_to_keep"): int,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_update_settings(hass, connection, msg):
+        settings_data = {}
+        if "week_start" in msg:
+            settings_data["week_start"] = msg.get("week_start")
+        if "days_after_today" in msg:
+            settings_data["days_after_today"] = msg.get("days_after_today")
+        if "days_to_keep" in msg:
+            settings_data["days_to_keep"] = msg.get("days_to_keep")
+
+        await _call_plan_service(hass, msg, "update_settings", settings_data)
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/update_library",
+        vol.Optional("entry_id"): str,
+        vol.Required("library_id"): str,
+        vol.Optional("name"): str,
+        vol.Optional("recipe_url"): str,
+        vol.Optional("videos"): list,
+        vol.Optional("notes"): str,
+        vol.Optional("ingredients"): list,
+        vol.Optional("potential"): bool,
+        vol.Optional("expected_version"): int,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_update_library(hass, connection, msg):
+        try:
+            payload = {"library_id": msg.get("library_id", "")}
+            for k in ("name", "recipe_url", "videos", "notes", "ingredients"):
+                if k in msg:
+                    payload[k] = msg.get(k, "")
+            for k in ("potential", "expected_version"):
+                if k in msg:
+                    payload[k] = msg.get(k)
+            result = await _call_plan_service(
+                hass, msg, "update_library", payload, return_response=True
+            )
+            connection.send_result(msg["id"], result or {"success": False})
+        except VersionConflict as e:
+            _send_conflict(connection, msg["id"], e)
+        except Exception as e:
+            _LOGGER.error("ws_update_library failed: %s", e, exc_info=True)
+            connection.send_error(msg["id"], "update_failed", str(e))
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/delete_library",
+        vol.Optional("entry_id"): str,
+        vol.Required("library_id"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_delete_library(hass, connection, msg):
+        await _call_plan_service(hass, msg, "delete_library", {
+            "library_id": msg.get("library_id", "")
+        })
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/stats",
+        vol.Optional("entry_id"): str,
+        vol.Optional("library_id"): str,
+    })
+    @callback
+    @_timed_ws
+    def ws_stats(hass, connection, msg):
+        """Meal history statistics, most frequently scheduled first."""
+        plan = _plan_for_msg(hass, connection, msg)
+        if plan is None:
+            return
+        enter_stage(QUERY)
+        stats = plan["stats"]
+        names = {lib.get("id"): lib.get("name", "") for lib in plan["data"].get("library", [])}
+        if "library_id" in msg:
+            library_id = msg["library_id"]
+            if library_id not in names:
+                connection.send_error(msg["id"], "not_found", f"Library entry not found: {library_id}")
+                return
+            connection.send_result(msg["id"], stats.summary(library_id, names[library_id]))
+            return
+
+        meals = [stats.summary(library_id, names[library_id]) for library_id, _ in stats if library_id in names]
+        meals.sort(key=lambda m: (-m["count"], m["name"].lower()))
+        connection.send_result(msg["id"], {"meals": meals})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/shopping_list",
+        vol.Optional("entry_id"): str,
+        vol.Optional("start"): str,
+        vol.Optional("end"): str,
+    })
+    @callback
+    @_timed_ws
+    def ws_shopping_list(hass, connection, msg):
+        """Ingredients summed by item and unit; defaults to today through the end of the rolling week."""
+        plan = _plan_for_msg(hass, connection, msg)
+        if plan is None:
+            return
+        enter_stage(QUERY)
+        shopping = plan["shopping"]
+        today = datetime.now().date()
+        if "start" not in msg and "end" not in msg:
+            connection.send_result(msg["id"], shopping.current(today))
+            return
+        start = _parse_date(msg.get("start", "")) or today
+        end = _parse_date(msg.get("end", "")) or start + timedelta(days=6)
+        if end < start or (end - start).days > 366:
+            connection.send_error(msg["id"], "invalid_format", "Invalid shopping list date range")
+            return
+        connection.send_result(msg["id"], shopping.query(start, end, today))
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/add_rule",
+        vol.Optional("entry_id"): str,
+        vol.Required("name"): str,
+        vol.Optional("meal_time"): str,
+        vol.Optional("frequency"): str,
+        vol.Optional("interval"): int,
+        vol.Optional("weekdays"): list,
+        vol.Optional("start_date"): str,
+        vol.Optional("end_date"): str,
+        vol.Optional("exceptions"): [str],
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_add_rule(hass, connection, msg):
+        payload = {k: v for k, v in msg.items() if k not in ("id", "type")}
+        await _call_plan_service(hass, msg, "add_rule", payload)
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/update_rule",
+        vol.Optional("entry_id"): str,
+        vol.Required("rule_id"): str,
+        vol.Optional("meal_time"): str,
+        vol.Optional("frequency"): str,
+        vol.Optional("interval"): int,
+        vol.Optional("weekdays"): list,
+        vol.Optional("start_date"): str,
+        vol.Optional("end_date"): str,
+        vol.Optional("exceptions"): [str],
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_update_rule(hass, connection, msg):
+        payload = {k: v for k, v in msg.items() if k not in ("id", "type")}
+        await _call_plan_service(hass, msg, "update_rule", payload)
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/delete_rule",
+        vol.Optional("entry_id"): str,
+        vol.Required("rule_id"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_delete_rule(hass, connection, msg):
+        await _call_plan_service(hass, msg, "delete_rule", {"rule_id": msg.get("rule_id", "")})
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/suggest",
+        vol.Optional("entry_id"): str,
+        vol.Optional("meal_times"): [str],
+        vol.Optional("limit"): int,
+        vol.Optional("fill_week"): bool,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_suggest(hass, connection, msg):
+        payload = {k: msg[k] for k in ("meal_times", "limit", "fill_week") if k in msg}
+        result = await _call_plan_service(
+            hass, msg, "suggest", payload, return_response=True
+        )
+        connection.send_result(msg["id"], result)
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/undo",
+        vol.Optional("entry_id"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_undo(hass, connection, msg):
+        result = await _call_plan_service(hass, msg, UNDO, {}, return_response=True)
+        connection.send_result(msg["id"], result)
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/redo",
+        vol.Optional("entry_id"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_redo(hass, connection, msg):
+        result = await _call_plan_service(hass, msg, REDO, {}, return_response=True)
+        connection.send_result(msg["id"], result)
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/copy_range",
+        vol.Optional("entry_id"): str,
+        vol.Required("start"): str,
+        vol.Optional("end"): str,
+        vol.Required("target_start"): str,
+        vol.Optional("conflict"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_copy_range(hass, connection, msg):
+        payload = {k: msg[k] for k in ("start", "end", "target_start", "conflict") if k in msg}
+        result = await _call_plan_service(
+            hass, msg, "copy_range", payload, return_response=True
+        )
+        connection.send_result(msg["id"], result)
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/templates",
+        vol.Optional("entry_id"): str,
+    })
+    @callback
+    @_timed_ws
+    def ws_templates(hass, connection, msg):
+        """List week templates, with the library name of each meal."""
+        plan = _plan_for_msg(hass, connection, msg)
+        if plan is None:
+            return
+        enter_stage(QUERY)
+        data = plan["data"]
+        names = {lib.get("id"): lib.get("name", "") for lib in data.get("library", [])}
+        templates = [
+            {
+                "id": template["id"],
+                "name": template.get("name", ""),
+                "meals": [
+                    {**meal, "name": names.get(meal.get("library_id"), "")}
+                    for meal in template.get("meals", [])
+                ],
+            }
+            for template in data.get("templates", [])
+        ]
+        connection.send_result(msg["id"], {"templates": templates})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/save_template",
+        vol.Optional("entry_id"): str,
+        vol.Required("name"): str,
+        vol.Optional("start"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_save_template(hass, connection, msg):
+        payload = {k: msg[k] for k in ("name", "start") if k in msg}
+        await _call_plan_service(hass, msg, "save_template", payload)
+        connection.send_result(msg["id"], {"success": True})
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/apply_template",
+        vol.Optional("entry_id"): str,
+        vol.Required("name"): str,
+        vol.Optional("start"): str,
+        vol.Optional("conflict"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_apply_template(hass, connection, msg):
+        payload = {k: msg[k] for k in ("name", "start", "conflict") if k in msg}
+        result = await _call_plan_service(
+            hass, msg, "apply_template", payload, return_response=True
+        )
+        connection.send_result(msg["id"], result)
+
+    @websocket_api.websocket_command({
+        vol.Required("type"): f"{DOMAIN}/delete_template",
+        vol.Optional("entry_id"): str,
+        vol.Required("name"): str,
+    })
+    @websocket_api.async_response
+    @_timed_ws
+    async def ws_delete_template(hass, connection, msg):
+        await _call_plan_service(hass, msg, "delete_template", {"name": msg.get("name", "")})
+        connection.send_result(msg["id"], {"success": True})
+
+    # Test command - simple ping
+    @websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/ping"})
+    @callback
+    def ws_ping(hass, connection, msg):
+        _LOGGER.debug("PING RECEIVED!")
+        connection.send_result(msg["id"], {"pong": True})
+
+    _LOGGER.info("Registering websocket commands")
+    try:
+        websocket_api.async_register_command(hass, ws_ping)
+        _LOGGER.info("Registered: ping")
+        websocket_api.async_register_command(hass, ws_get)
+        websocket_api.async_register_command(hass, ws_changes)
+        websocket_api.async_register_command(hass, ws_history)
+        _LOGGER.info("Registered: get, changes, history")
+        websocket_api.async_register_command(hass, ws_add)
+        _LOGGER.info("Registered: add")
+        websocket_api.async_register_command(hass, ws_update)
+        _LOGGER.info("Registered: update")
+        websocket_api.async_register_command(hass, ws_bulk)
+        _LOGGER.info("Registered: bulk")
+        websocket_api.async_register_command(hass, ws_update_settings)
+        _LOGGER.info("Registered: update_settings")
+        websocket_api.async_register_command(hass, ws_update_library)
+        _LOGGER.info("Registered: update_library")
+        websocket_api.async_register_command(hass, ws_delete_library)
+        _LOGGER.info("Registered: delete_library")
+        websocket_api.async_register_command(hass, ws_stats)
+        _LOGGER.info("Registered: stats")
+        websocket_api.async_register_command(hass, ws_suggest)
+        _LOGGER.info("Registered: suggest")
+        websocket_api.async_register_command(hass, ws_shopping_list)
+        _LOGGER.info("Registered: shopping_list")
+        websocket_api.async_register_command(hass, ws_add_rule)
+        websocket_api.async_register_command(hass, ws_update_rule)
+        websocket_api.async_register_command(hass, ws_delete_rule)
+        _LOGGER.info("Registered: add_rule, update_rule, delete_rule")
+        websocket_api.async_register_command(hass, ws_undo)
+        websocket_api.async_register_command(hass, ws_redo)
+        _LOGGER.info("Registered: undo, redo")
+        websocket_api.async_register_command(hass, ws_copy_range)
+        websocket_api.async_register_command(hass, ws_templates)
+        websocket_api.async_register_command(hass, ws_save_template)
+        websocket_api.async_register_command(hass, ws_apply_template)
+        websocket_api.async_register_command(hass, ws_delete_template)
+        _LOGGER.info("Registered: copy_range, templates, save_template, apply_template, delete_template")
+    except Exception as e:
+        _LOGGER.error("Failed to register websocket commands: %s", e, exc_info=True)
+    _LOGGER.info("Websocket commands registered successfully")
 
 
 # -------------------
@@ -216,6 +1241,7 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 # -------------------
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    started = time.perf_counter()
     _LOGGER.info("=" * 80)
     _LOGGER.info("MEAL PLANNER: Starting async_setup_entry")
     _LOGGER.info("=" * 80)
@@ -224,10 +1250,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     import json
     from homeassistant.util import json as hass_json
 
-    storage_base = Path(hass.config.path(STORAGE_DIR))  # config/meal_planner/
+    # The first plan keeps config/meal_planner/; further plans have their own
+    # directory (config/meal_planner_plans/<slug>/, older ones a subdirectory)
+    storage_dir = entry.data.get(CONF_STORAGE_DIR, STORAGE_DIR)
+    is_default_plan = storage_dir == STORAGE_DIR
+    storage_base = Path(hass.config.path(storage_dir))  # config/meal_planner/
     library_path = storage_base / "meal_library.json"
     scheduled_path = storage_base / "scheduled.json"
     settings_path = storage_base / "settings.json"
+    stats_path = storage_base / STATS_FILE
+    rules_path = storage_base / RULES_FILE
+    templates_path = storage_base / TEMPLATES_FILE
 
     # Old location for migration
     old_storage_base = Path(hass.config.path(".storage")) / STORAGE_DIR
@@ -235,12 +1268,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Ensure directory exists
     storage_base.mkdir(parents=True, exist_ok=True)
+    storage_format = entry.options.get(CONF_STORAGE_FORMAT, STORAGE_FORMAT_JSON)
 
     # Initialize data structure
     data = {
         "library": [],     # List of {id, name, recipe_url, notes}
         "scheduled": [],   # List of {id, library_id, date, meal_time}
-        "settings": {"week_start": "Sunday", "days_after_today": 3, "days_to_keep": 14}
+        "settings": {"week_start": "Sunday", "days_after_today": 3, "days_to_keep": 14},
+        "rules": [],       # List of recurring meal rules (recurrence.py)
+        "templates": [],   # List of named week templates (templates.py)
     }
 
     # Try loading new format first
@@ -252,10 +1288,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 with open(path, "r", encoding="utf-8") as f:
                     return json.load(f)
 
-            data["library"] = await hass.async_add_executor_job(load_json_file, library_path)
-            data["scheduled"] = await hass.async_add_executor_job(load_json_file, scheduled_path)
+            # Row files are streamed record by record (loader.py) to keep the peak low
+            data["library"] = await hass.async_add_executor_job(load_records, library_path)
+            data["scheduled"] = await hass.async_add_executor_job(load_records, scheduled_path)
             if settings_path.exists():
                 data["settings"] = await hass.async_add_executor_job(load_json_file, settings_path)
+            if rules_path.exists():
+                data["rules"] = await hass.async_add_executor_job(load_records, rules_path)
+            if templates_path.exists():
+                data["templates"] = await hass.async_add_executor_job(load_records, templates_path)
 
             _LOGGER.info("Loaded: %d library meals, %d scheduled", len(data["library"]), len(data["scheduled"]))
         except Exception as e:
@@ -264,8 +1305,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     else:
         needs_migration = True
 
-    # Migration from old format
-    if needs_migration and old_path.exists():
+    # Migration from old format (only the original plan ever had one)
+    if needs_migration and is_default_plan and old_path.exists():
         _LOGGER.info("Migrating from old meals.json format...")
         try:
             def load_old_data(path):
@@ -291,11 +1332,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                         "notes": lib_meal.get("notes", "")
                     }
 
-            # Migrate scheduled - create library entries for any unique meals
-            old_scheduled = old_data.get("scheduled", [])
-            for sched_meal in old_scheduled:
+            # Migrate scheduled in one pass - create library entries for any
+            # unique meals and convert the rows to references
+            for sched_meal in old_data.get("scheduled", []):
                 name = sched_meal.get("name", "").strip()
-                if name and name not in library_map:
+                if not name:
+                    continue
+                if name not in library_map:
                     # Create library entry from scheduled meal
                     library_map[name] = {
                         "id": uuid.uuid4().hex,
@@ -303,31 +1346,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                         "recipe_url": sched_meal.get("recipe_url", ""),
                         "notes": sched_meal.get("notes", "")
                     }
+                data["scheduled"].append({
+                    "id": sched_meal.get("id", uuid.uuid4().hex),
+                    "library_id": library_map[name]["id"],
+                    "date": sched_meal.get("date", ""),
+                    "meal_time": sched_meal.get("meal_time", "Dinner"),
+                    "potential": sched_meal.get("potential", False)
+                })
 
             data["library"] = list(library_map.values())
-
-            # Convert scheduled to references
-            for sched_meal in old_scheduled:
-                name = sched_meal.get("name", "").strip()
-                if name in library_map:
-                    data["scheduled"].append({
-                        "id": sched_meal.get("id", uuid.uuid4().hex),
-                        "library_id": library_map[name]["id"],
-                        "date": sched_meal.get("date", ""),
-                        "meal_time": sched_meal.get("meal_time", "Dinner"),
-                        "potential": sched_meal.get("potential", False)
-                    })
+            # The old rows are not needed any more; don't hold them through the saves
+            del old_data, old_library, library_map
 
             _LOGGER.info("Migration complete: %d library, %d scheduled", len(data["library"]), len(data["scheduled"]))
 
             # Save in new format
-            def save_json_file(path, content):
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump(content, f, indent=2, ensure_ascii=False)
-
-            await hass.async_add_executor_job(save_json_file, library_path, data["library"])
-            await hass.async_add_executor_job(save_json_file, scheduled_path, data["scheduled"])
-            await hass.async_add_executor_job(save_json_file, settings_path, data["settings"])
+            await hass.async_add_executor_job(dump_json, library_path, data["library"], storage_format)
+            await hass.async_add_executor_job(dump_json, scheduled_path, data["scheduled"], storage_format)
+            await hass.async_add_executor_job(dump_json, settings_path, data["settings"], storage_format)
 
             # Backup old file
             backup_path = storage_base / "meals.json.backup"
@@ -336,32 +1372,92 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         except Exception as e:
             _LOGGER.error("Migration failed: %s", e, exc_info=True)
-            data = DEFAULT_DATA.copy()
+            data = {k: (v.copy() if isinstance(v, (dict, list)) else v) for k, v in DEFAULT_DATA.items()}
 
     _LOGGER.info("Final data: Library=%d, Scheduled=%d", len(data["library"]), len(data["scheduled"]))
 
-    # Normalize - ensure IDs exist and fields are present
-    for m in data["library"]:
-        m.setdefault("id", uuid.uuid4().hex)
-        m.setdefault("potential", False)
-        m.setdefault("videos", [])
-    for m in data["scheduled"]:
-        m.setdefault("id", uuid.uuid4().hex)
-        m.setdefault("library_id", "")
-        m.setdefault("meal_time", "Dinner")
-        m.setdefault("date", "")
-        m.pop("potential", None)  # potential lives on library entry now
-
-    # Save handles and paths
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN].update({
+    # Versioned migrations: only the steps newer than settings["schema_version"] run
+    stored_version = migrate(data)
+    if stored_version < SCHEMA_VERSION:
+        def save_migrated(paths_content):
+            for path, content in paths_content:
+                dump_json(path, content, storage_format)
+
+        # All three files, so a fresh install is loaded (and stamped) next time
+        to_save = [
+            (settings_path, data["settings"]),
+            (library_path, data["library"]),
+            (scheduled_path, data["scheduled"]),
+        ]
+        try:
+            await hass.async_add_executor_job(save_migrated, to_save)
+            _LOGGER.info("Data migrated from schema version %d to %d", stored_version, SCHEMA_VERSION)
+        except Exception as e:
+            _LOGGER.error("Failed to save migrated data: %s", e, exc_info=True)
+
+    # Meal statistics survive retention purges, so they have their own file.
+    # Without one (first run / upgrade), seed them from the rows we still have.
+    stats = None
+    if stats_path.exists():
+        try:
+            def load_stats(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            stats = MealStats(await hass.async_add_executor_job(load_stats, stats_path))
+        except Exception as e:
+            _LOGGER.error("Failed to load meal statistics, rebuilding: %s", e)
+    if stats is None:
+        stats = MealStats.from_scheduled(data["scheduled"])
+        _LOGGER.info("Meal statistics built from %d scheduled entries", len(data["scheduled"]))
+
+    # Save handles and paths. Every config entry is an independent plan with
+    # its own files, state, indexes and entities under hass.data[DOMAIN][entry_id].
+    slug = entry.data.get(CONF_SLUG, "")
+    index = DateIndex(data["scheduled"])
+    snapshots = SnapshotStore(data)
+    # Scheduled rows dropped by retention or the size cap are kept here
+    archive = Archive(storage_base / ARCHIVE_DIR)
+    await hass.async_add_executor_job(archive.load)
+    plan = {
+        "entry_id": entry.entry_id,
+        "default": is_default_plan,
+        "name": f"Meal Planner {entry.title}" if slug else "Meal Planner",
+        "object_id": f"meal_planner_{slug}" if slug else "meal_planner",
+        "panel_id": "meal-planner-" + slug.replace("_", "-") if slug else "meal-planner",
         "data": data,
+        "stats": stats,
+        "index": index,
+        "shopping": ShoppingList(data, index),
+        "lru": LibraryLRU(data, stats),
+        "snapshots": snapshots,
+        "archive": archive,
+        "changelog": ChangeLog(
+            entry.options.get(CONF_CHANGE_LOG_DEPTH, DEFAULT_CHANGE_LOG_DEPTH), snapshots.current.version
+        ),
+        "purging": False,
+        "history": UndoHistory(
+            entry.options.get(CONF_UNDO_DEPTH, DEFAULT_UNDO_DEPTH),
+            entry.options.get(CONF_UNDO_MEMORY_KB, DEFAULT_UNDO_MEMORY_KB) * 1024,
+        ),
+        "metrics": PerfCounters(),
+        "slow_operation_ms": entry.options.get(CONF_SLOW_OPERATION_MS, DEFAULT_SLOW_OPERATION_MS),
+        "max_library_size": entry.options.get(CONF_MAX_LIBRARY_SIZE, MAX_LIBRARY_SIZE),
+        "max_scheduled_size": entry.options.get(CONF_MAX_SCHEDULED_SIZE, MAX_SCHEDULED_SIZE),
+        "saver": None,
+        "profiler": None,
+        "sensors": {},
+        "services": {},
         "paths": {
             "library": library_path,
             "scheduled": scheduled_path,
-            "settings": settings_path
-        }
-    })
+            "settings": settings_path,
+            "stats": stats_path,
+            "rules": rules_path,
+            "templates": templates_path,
+        },
+    }
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = plan
 
     # Clean up any duplicate/old entity registrations
     from homeassistant.helpers import entity_registry as er
@@ -375,55 +1471,202 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.info(f"Removing old entity registration: {entity_id}")
             entity_reg.async_remove(entity_id)
 
-    # Forward to sensor platform
-    await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+    # Forward to sensor and calendar platforms
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Options (sidebar, optional sensors) are applied by reloading the entry
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
+    # Files in write order, with the content to write for each. The content
+    # is taken on the event loop and never changes afterwards, since the
+    # executor writes it while services keep mutating ``data``: the rows come
+    # from the published snapshot, the rest is copied.
+    file_contents = {
+        "library": lambda: list(plan["snapshots"].current.library.values()),
+        "scheduled": lambda: list(plan["snapshots"].current.scheduled.values()),
+        "settings": lambda: dict(plan["snapshots"].current.settings),
+        "rules": lambda: list(plan["snapshots"].current.rules.values()),
+        "templates": lambda: copy.deepcopy(data["templates"]),
+        "stats": stats.as_dict,
+    }
 
-    async def _save_and_notify(save_library=False, save_scheduled=False, save_settings=False):
-        # Save to appropriate files based on what changed
-        import json
+    async def _async_write_files(names: set) -> None:
+        paths = plan["paths"]
+        metrics = plan["metrics"]
+        try:
+            for name, content in file_contents.items():
+                if name not in names:
+                    continue
+                with metrics.timed(SAVE, name):
+                    await hass.async_add_executor_job(dump_json, paths[name], content(), storage_format)
+                _LOGGER.debug("Saved %s", paths[name].name)
+        except Exception as e:
+            _LOGGER.error("Failed to save data: %s", e, exc_info=True)
 
-        def save_json_file(path, content):
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(content, f, indent=2, ensure_ascii=False)
+    plan["saver"] = SaveScheduler(
+        hass, entry.options.get(CONF_SAVE_DELAY_MS, DEFAULT_SAVE_DELAY_MS), _async_write_files
+    )
 
-        paths = hass.data[DOMAIN]["paths"]
+    async def _async_flush_saves(event=None) -> None:
+        await plan["saver"].async_flush()
+
+    # Debounced saves still pending when Home Assistant stops are written first
+    entry.async_on_unload(hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, _async_flush_saves))
+
+    async def _save_and_notify(save_library=False, save_scheduled=False, save_settings=False, save_rules=False, save_templates=False, changes=None, operation=None):
+        """Commit an operation: update the aggregates, publish, save, refresh sensors and fire one event.
+
+        ``operation`` names the event's operation when there is no ``changes``.
+        """
+        metrics = plan["metrics"]
+
+        if changes:
+            changes.bump_versions()
+        # Fold the operation's row changes into the derived aggregates
+        save_stats = bool(changes) and stats.apply(changes)
+        if changes:
+            plan["index"].apply(changes)
+            plan["shopping"].apply(changes)
+            plan["lru"].apply(changes)
+            plan["history"].record(changes)
+        # Purged rows go to the archive with the meal's name, looked up
+        # before this commit may have removed the library entry
+        archived = []
+        if changes and changes.purged:
+            library = plan["snapshots"].current.library
+            for row_id in changes.purged:
+                row, after = changes.scheduled.get(row_id, (None, None))
+                if row is not None and after is None:
+                    archived.append({**row, "name": library.get(row.get("library_id"), {}).get("name", "")})
+        # Readers (ws get, sensors) see the commit from here on
+        snapshot = plan["snapshots"].publish(data, changes)
+        plan["changelog"].record(snapshot.version, changes)
 
+        # Save to appropriate files based on what changed
+        enter_stage(PERSIST)
+        flags = {
+            "library": save_library,
+            "scheduled": save_scheduled,
+            "settings": save_settings,
+            "rules": save_rules,
+            "templates": save_templates,
+            "stats": save_stats,
+        }
+        await plan["saver"].async_save(name for name, save in flags.items() if save)
+        if archived:
+            try:
+                with metrics.timed(SAVE, "archive"):
+                    await hass.async_add_executor_job(plan["archive"].append, archived)
+            except Exception as e:
+                _LOGGER.error("Failed to archive %d scheduled entries: %s", len(archived), e, exc_info=True)
+
+        # Update sensors (statistics only when they changed)
+        enter_stage(SENSORS)
+        sensors = plan["sensors"]
+        for key in ("potential", "week", "stats", "shopping", "calendar", "debug"):
+            if key not in sensors or (key == "stats" and not save_stats):
+                continue
+            with metrics.timed(SENSOR, key):
+                await sensors[key].async_update_from_data()
+        enter_stage(NOTIFY)
+        hass.bus.async_fire(EVENT_UPDATED, updated_event_data(
+            entry.entry_id,
+            changes.op if changes is not None else operation or "update",
+            plan["changelog"].revision(snapshot.version),
+            changes,
+            settings=save_settings,
+        ))
+        enter_stage(MUTATE)
+
+    async def _async_purge_expired(now=None) -> int:
+        """Drop scheduled rows past retention; save once.
+
+        Expired rows are looked up in the date index, then the live list is
+        rebuilt in a single O(n) pass of set lookups and committed right
+        away, without yielding in between, so no service ever sees the list
+        out of step with the index.
+        """
+        if plan["purging"]:
+            return 0
+        plan["purging"] = True
         try:
-            if save_library:
-                await hass.async_add_executor_job(save_json_file, paths["library"], data["library"])
-                _LOGGER.info("Library saved: %d meals", len(data["library"]))
-
-            if save_scheduled:
-                await hass.async_add_executor_job(save_json_file, paths["scheduled"], data["scheduled"])
-                _LOGGER.info("Scheduled saved: %d entries", len(data["scheduled"]))
+            cutoff, expired = _expired_scheduled(plan["index"], data)
+            changes = ChangeSet("purge")
+            if expired:
+                doomed = {m["id"] for m in expired}
+                kept = []
+                for m in data["scheduled"]:
+                    if m["id"] in doomed:
+                        changes.removed(SCHEDULED, m, purged=True)
+                    else:
+                        kept.append(m)
+                data["scheduled"] = kept
+            plan["metrics"].record_purge(len(changes.scheduled))
+            if not changes:
+                return 0
+            _LOGGER.info("Retention purge removed %d scheduled entries older than %s", len(changes.scheduled), cutoff)
+            await _save_and_notify(save_scheduled=True, changes=changes)
+            return len(changes.scheduled)
+        finally:
+            plan["purging"] = False
+
+    async def _async_apply_size_caps() -> None:
+        """Bring a plan above its size caps (lowered in the options) within them, in one commit."""
+        changes = ChangeSet("capacity")
+        max_library = plan["max_library_size"]
+        excess = len(data["library"]) - max_library
+        if excess > 0:
+            evict = set()
+            while len(evict) < excess:
+                library_id = plan["lru"].pop_candidate()
+                if library_id is None:
+                    break
+                evict.add(library_id)
+            kept = []
+            for lib in data["library"]:
+                if lib["id"] in evict:
+                    changes.removed(LIBRARY, lib, purged=True)
+                else:
+                    kept.append(lib)
+            data["library"] = kept
+            _LOGGER.warning(
+                "Meal library is above its cap of %d: evicted %d least recently used entries%s",
+                max_library, len(evict),
+                f"; {len(kept) - max_library} more are in use and stay" if len(kept) > max_library else "",
+            )
+        trimmed = len(data["scheduled"]) - plan["max_scheduled_size"]
+        if trimmed > 0:
+            _trim_scheduled(data, changes, plan["max_scheduled_size"])
+            _LOGGER.warning(
+                "Scheduled meals are above their cap of %d: moved the %d oldest to the archive",
+                plan["max_scheduled_size"], trimmed,
+            )
+        if changes:
+            await _save_and_notify(
+                save_library=bool(changes.library),
+                save_scheduled=bool(changes.scheduled),
+                changes=changes,
+            )
 
-            if save_settings:
-                await hass.async_add_executor_job(save_json_file, paths["settings"], data["settings"])
-                _LOGGER.info("Settings saved")
+    # Caps are options, so a lowered one takes effect here, on the reload
+    await _async_apply_size_caps()
 
-        except Exception as e:
-            _LOGGER.error("Failed to save data: %s", e, exc_info=True)
+    # Retention purge: daily at the quiet hour, and once right after startup
+    # (in the background, so a large backlog does not hold up setup)
+    entry.async_on_unload(async_track_time_change(
+        hass, _async_purge_expired,
+        hour=entry.options.get(CONF_PURGE_HOUR, DEFAULT_PURGE_HOUR), minute=0, second=0,
+    ))
+    hass.async_create_background_task(_async_purge_expired(), f"{DOMAIN} retention purge")
 
-        # Update sensors
-        sensors = hass.data[DOMAIN].get("sensors", {})
-        if "potential" in sensors:
-            await sensors["potential"].async_update_from_data()
-        if "week" in sensors:
-            await sensors["week"].async_update_from_data()
-        hass.bus.async_fire(EVENT_UPDATED)
-
-    # Purge old scheduled entries on startup
-    _startup_purged = _purge_old_scheduled(data)
-    if _startup_purged > 0:
-        await _save_and_notify(save_scheduled=True)
-
-    # Migrate potential flag from scheduled → library (one-time, idempotent)
-    _migration_changed = _migrate_potential_to_library(data)
-    if _migration_changed:
-        _LOGGER.info("Migrated potential flag from scheduled entries to library entries")
-        await _save_and_notify(save_library=True, save_scheduled=True)
+    if not stats_path.exists():
+        await hass.async_add_executor_job(dump_json, stats_path, stats.as_dict(), storage_format)
 
     # ---------- Services ----------
+    # Handlers are per plan; the domain services registered by
+    # _async_register_services route to them by ``entry_id``.
+    services = plan["services"]
+
     async def svc_add(call: ServiceCall):
         """Add a meal - creates library entry and scheduled entry."""
         # Validate and sanitize inputs
@@ -436,18 +1679,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         videos = _validate_url_list(call.data.get("videos", []))
         notes = _sanitize_string(call.data.get("notes", ""), MAX_NOTES_LENGTH, "notes")
 
+        changes = ChangeSet("add")
+
         # Find or create library entry
         library_entry = None
         for lib_meal in data["library"]:
             if lib_meal.get("name", "").lower() == name.lower():
                 library_entry = lib_meal
+                changes.touched(LIBRARY, library_entry)
                 # Update library entry with latest recipe/videos/notes
                 library_entry["recipe_url"] = recipe_url
                 library_entry["videos"] = videos
                 library_entry["notes"] = notes
+                if "ingredients" in call.data:
+                    library_entry["ingredients"] = _validate_ingredients(call.data.get("ingredients"))
                 break
 
         if not library_entry:
+            if not _make_library_room(data, plan["lru"], changes, plan["max_library_size"]):
+                return
             # Create new library entry
             library_entry = {
                 "id": uuid.uuid4().hex,
@@ -455,11 +1705,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 "recipe_url": recipe_url,
                 "videos": videos,
                 "notes": notes,
+                "ingredients": _validate_ingredients(call.data.get("ingredients", [])),
                 "potential": False,
             }
             data["library"].append(library_entry)
-            if len(data["library"]) > MAX_LIBRARY_SIZE:
-                data["library"] = data["library"][-MAX_LIBRARY_SIZE:]
+            changes.added(LIBRARY, library_entry)
 
         # Validate schedule info
         meal_time = (call.data.get("meal_time") or "Dinner").strip().title()
@@ -474,31 +1724,53 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if not date_str:
             # No date — mark as potential in library; no scheduled entry needed
             library_entry["potential"] = True
-            await _save_and_notify(save_library=True)
+            await _save_and_notify(save_library=True, changes=changes)
             return
 
         # Has a valid date — create scheduled entry and mark library as non-potential
         library_entry["potential"] = False
-        data["scheduled"].append({
+        scheduled_entry = {
             "id": uuid.uuid4().hex,
             "library_id": library_entry["id"],
             "meal_time": meal_time,
             "date": date_str,
-        })
+        }
+        data["scheduled"].append(scheduled_entry)
+        changes.added(SCHEDULED, scheduled_entry)
 
-        # Enforce limits
-        if len(data["scheduled"]) > MAX_SCHEDULED_SIZE:
-            data["scheduled"] = data["scheduled"][-MAX_SCHEDULED_SIZE:]
+        _trim_scheduled(data, changes, plan["max_scheduled_size"])
 
-        await _save_and_notify(save_library=True, save_scheduled=True)
+        await _save_and_notify(save_library=True, save_scheduled=True, changes=changes)
 
-    hass.services.async_register(DOMAIN, "add", svc_add)
+    services["add"] = svc_add
+
+    def _library_entry(library_id: str) -> Optional[dict]:
+        for lib in data["library"]:
+            if lib.get("id") == library_id:
+                return lib
+        return None
 
     async def svc_update(call: ServiceCall):
-        """Update a scheduled meal - updates library and/or scheduled entry."""
+        """Update a scheduled meal - updates library and/or scheduled entry.
+
+        With ``expected_version`` / ``expected_library_version`` the update is
+        refused when the scheduled row / its library entry changed since the
+        client read them: ``VersionConflict`` carries the current meal. A rename
+        that needs a new library entry while the library is full is refused
+        with ``library_full``. A successful update returns the new versions, the
+        meal and its library entry as the panel shows them, and the undo status.
+        """
         row_id = (call.data.get("row_id") or "").strip()
         if not row_id:
-            return
+            return {"success": False}
+        try:
+            expected = _parse_version(call.data.get("expected_version"))
+            expected_library = _parse_version(call.data.get("expected_library_version"))
+        except (TypeError, ValueError):
+            _LOGGER.warning("update: invalid expected version for %s", row_id)
+            return {"success": False}
+
+        changes = ChangeSet("update")
 
         # Find the scheduled entry
         scheduled_entry = None
@@ -507,50 +1779,77 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 scheduled_entry = m
                 break
 
+        if scheduled_entry:
+            current_lib = _library_entry(scheduled_entry.get("library_id"))
+            if _stale(scheduled_entry, expected) or (current_lib and _stale(current_lib, expected_library)):
+                _LOGGER.warning("update: %s was changed by someone else; not applied", row_id)
+                raise VersionConflict(
+                    f"Scheduled meal {row_id} was changed by someone else",
+                    _meal_item(scheduled_entry, current_lib),
+                )
+
+        # A new name may need a new library entry; refuse before changing anything when there is no room
+        new_name = ""
+        if "name" in call.data:
+            new_name = _sanitize_string(call.data.get("name", ""), MAX_NAME_LENGTH, "meal name")
+        if (
+            new_name
+            and not any(lib.get("name", "").lower() == new_name.lower() for lib in data["library"])
+            and not _library_has_room(data, plan["lru"], plan["max_library_size"])
+        ):
+            _LOGGER.warning("update: meal library is full; %s not renamed to %s", row_id, new_name)
+            return {"success": False, "error": "library_full"}
+
+        # Editing one occurrence of a recurring meal detaches it from the series
+        if not scheduled_entry:
+            scheduled_entry = _detach_occurrence(data, row_id, changes)
+
         if not scheduled_entry:
             _LOGGER.warning("Scheduled entry not found: %s", row_id)
-            return
+            return {"success": False}
 
         save_library = False
-        save_scheduled = False
+        save_scheduled = bool(changes.scheduled)
+        changes.touched(SCHEDULED, scheduled_entry)
 
         # Handle name change (requires library update)
-        if "name" in call.data:
-            new_name = _sanitize_string(call.data.get("name", ""), MAX_NAME_LENGTH, "meal name")
-            if new_name:
-                # Find current library entry
-                current_lib = None
+        if new_name:
+            # Find current library entry
+            current_lib = None
+            for lib in data["library"]:
+                if lib.get("id") == scheduled_entry.get("library_id"):
+                    current_lib = lib
+                    break
+
+            # Check if name is changing
+            if not current_lib or current_lib.get("name", "").lower() != new_name.lower():
+                # Find or create library entry with new name
+                new_lib = None
                 for lib in data["library"]:
-                    if lib.get("id") == scheduled_entry.get("library_id"):
-                        current_lib = lib
+                    if lib.get("name", "").lower() == new_name.lower():
+                        new_lib = lib
                         break
 
-                # Check if name is changing
-                if not current_lib or current_lib.get("name", "").lower() != new_name.lower():
-                    # Find or create library entry with new name
-                    new_lib = None
-                    for lib in data["library"]:
-                        if lib.get("name", "").lower() == new_name.lower():
-                            new_lib = lib
-                            break
-
-                    if not new_lib:
-                        # Create new library entry
-                        new_lib = {
-                            "id": uuid.uuid4().hex,
-                            "name": new_name,
-                            "recipe_url": call.data.get("recipe_url", "") if "recipe_url" in call.data else (current_lib.get("recipe_url", "") if current_lib else ""),
-                            "videos": _validate_url_list(call.data.get("videos", [])) if "videos" in call.data else (current_lib.get("videos", []) if current_lib else []),
-                            "notes": call.data.get("notes", "") if "notes" in call.data else (current_lib.get("notes", "") if current_lib else "")
-                        }
-                        data["library"].append(new_lib)
-                        save_library = True
-
-                    # Update scheduled entry to reference new library entry
-                    scheduled_entry["library_id"] = new_lib["id"]
-                    save_scheduled = True
+                if not new_lib:
+                    # Create new library entry (there is room, checked above)
+                    _make_library_room(data, plan["lru"], changes, plan["max_library_size"])
+                    new_lib = {
+                        "id": uuid.uuid4().hex,
+                        "name": new_name,
+                        "recipe_url": call.data.get("recipe_url", "") if "recipe_url" in call.data else (current_lib.get("recipe_url", "") if current_lib else ""),
+                        "videos": _validate_url_list(call.data.get("videos", [])) if "videos" in call.data else (current_lib.get("videos", []) if current_lib else []),
+                        "notes": call.data.get("notes", "") if "notes" in call.data else (current_lib.get("notes", "") if current_lib else ""),
+                        "ingredients": list(current_lib.get("ingredients", [])) if current_lib else [],
+                    }
+                    data["library"].append(new_lib)
+                    changes.added(LIBRARY, new_lib)
                     save_library = True
 
+                # Update scheduled entry to reference new library entry
+                scheduled_entry["library_id"] = new_lib["id"]
+                save_scheduled = True
+                save_library = True
+
         # Update library entry (recipe_url, notes)
         library_entry = None
         for lib in data["library"]:
@@ -559,6 +1858,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 break
 
         if library_entry:
+            changes.touched(LIBRARY, library_entry)
             if "recipe_url" in call.data:
                 library_entry["recipe_url"] = _validate_url(call.data.get("recipe_url", ""))
                 save_library = True
@@ -568,6 +1868,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             if "notes" in call.data:
                 library_entry["notes"] = _sanitize_string(call.data.get("notes", ""), MAX_NOTES_LENGTH, "notes")
                 save_library = True
+            if "ingredients" in call.data:
+                library_entry["ingredients"] = _validate_ingredients(call.data.get("ingredients"))
+                save_library = True
 
         # Update scheduled entry (date, meal_time, potential)
         valid_times = ("Breakfast", "Lunch", "Dinner", "Snack")
@@ -587,9 +1890,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             save_scheduled = True
 
         if save_library or save_scheduled:
-            await _save_and_notify(save_library=save_library, save_scheduled=save_scheduled)
+            await _save_and_notify(
+                save_library=save_library,
+                save_scheduled=save_scheduled,
+                save_rules=bool(changes.rules),
+                changes=changes,
+            )
+        library_entry = _library_entry(scheduled_entry.get("library_id"))
+        return {
+            "success": True,
+            "version": scheduled_entry.get(VERSION, 0),
+            "library_version": library_entry.get(VERSION, 0) if library_entry else 0,
+            "meal": _meal_item(scheduled_entry, library_entry),
+            "library": _library_item(library_entry) if library_entry else None,
+            "history": plan["history"].status(),
+        }
 
-    hass.services.async_register(DOMAIN, "update", svc_update)
+    services["update"] = svc_update
     
     async def svc_bulk(call: ServiceCall):
         """Bulk operations on scheduled entries."""
@@ -611,9 +1928,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         idset = set(ids)
         new_list = []
+        changes = ChangeSet(f"bulk_{action}")
         deleted_library_ids = set()
         library_map_by_id = {lib.get("id"): lib for lib in data.get("library", [])}
 
+        # Recurring occurrences: re-dated ones are detached, the rest skipped
+        for row_id in ids:
+            if split_occurrence_id(row_id) is None:
+                continue
+            if action == "assign_date":
+                row = _detach_occurrence(data, row_id, changes)
+                if row is not None:
+                    idset.add(row["id"])
+                continue
+            rule = _skip_occurrence(data, row_id, changes)
+            if rule is not None and action == "convert_to_potential":
+                lib_entry = library_map_by_id.get(rule.get("library_id"))
+                if lib_entry is not None:
+                    changes.touched(LIBRARY, lib_entry)
+                    lib_entry["potential"] = True
+
         for m in data["scheduled"]:
             if m["id"] not in idset:
                 new_list.append(m)
@@ -623,10 +1957,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 # Mark library entry as potential and drop the scheduled entry
                 lib_entry = library_map_by_id.get(m.get("library_id"))
                 if lib_entry is not None:
+                    changes.touched(LIBRARY, lib_entry)
                     lib_entry["potential"] = True
                 # Drop from scheduled (do not append to new_list)
+                changes.removed(SCHEDULED, m)
 
             elif action == "assign_date":
+                changes.touched(SCHEDULED, m)
                 if date_str:
                     m["date"] = date_str
                 if meal_time_in in ("Breakfast", "Lunch", "Dinner", "Snack"):
@@ -636,86 +1973,127 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             elif action == "delete":
                 deleted_library_ids.add(m.get("library_id", ""))
                 # drop this row
+                changes.removed(SCHEDULED, m)
 
         data["scheduled"] = new_list
 
         # Update save flags based on action
         save_library = False
+        save_rules = bool(changes.rules)
         if action == "convert_to_potential":
             save_library = True  # library entries were modified
         elif action == "delete" and deleted_library_ids:
             # Clean up library entries no longer referenced by any scheduled entry
             remaining_refs = {m.get("library_id") for m in data["scheduled"]}
+            remaining_refs.update(rule.get("library_id") for rule in data["rules"])
+            remaining_refs.update(m.get("library_id") for t in data["templates"] for m in t.get("meals", []))
             orphaned = deleted_library_ids - remaining_refs
             if orphaned:
+                for lib in data["library"]:
+                    if lib.get("id") in orphaned:
+                        changes.removed(LIBRARY, lib)
                 data["library"] = [lib for lib in data["library"] if lib.get("id") not in orphaned]
                 save_library = True
-                _LOGGER.info("Removed %d orphaned library entries after bulk delete", len(orphaned))
+                _LOGGER.debug("Removed %d orphaned library entries after bulk delete", len(orphaned))
 
-        await _save_and_notify(save_scheduled=True, save_library=save_library)
+        await _save_and_notify(
+            save_scheduled=True, save_library=save_library, save_rules=save_rules, changes=changes
+        )
 
-    hass.services.async_register(DOMAIN, "bulk", svc_bulk)
+    services["bulk"] = svc_bulk
 
     async def svc_clear_potential(call: ServiceCall):
         """Clear all potential meals (library entries with potential=True and their scheduled instances)."""
         potential_ids = {lib.get("id") for lib in data["library"] if lib.get("potential", False)}
         if not potential_ids:
             return
-        original_scheduled = len(data["scheduled"])
-        data["scheduled"] = [m for m in data["scheduled"] if m.get("library_id") not in potential_ids]
+        changes = ChangeSet("clear_potential")
+        kept = []
+        for m in data["scheduled"]:
+            if m.get("library_id") in potential_ids:
+                changes.removed(SCHEDULED, m)
+            else:
+                kept.append(m)
+        data["scheduled"] = kept
+        for lib in data["library"]:
+            if lib.get("potential", False):
+                changes.removed(LIBRARY, lib)
         data["library"] = [lib for lib in data["library"] if not lib.get("potential", False)]
-        save_scheduled = len(data["scheduled"]) != original_scheduled
-        await _save_and_notify(save_library=True, save_scheduled=save_scheduled)
+        save_rules = _remove_rules_for(data, potential_ids, changes)
+        save_templates = _remove_template_meals(data, potential_ids, changes)
+        save_scheduled = bool(changes.scheduled)
+        await _save_and_notify(
+            save_library=True, save_scheduled=save_scheduled, save_rules=save_rules,
+            save_templates=save_templates, changes=changes,
+        )
 
-    hass.services.async_register(DOMAIN, "clear_potential", svc_clear_potential)
+    services["clear_potential"] = svc_clear_potential
 
     async def svc_clear_week(call: ServiceCall):
         """Clear current week's scheduled meals."""
         today = datetime.now().date()
         start, end = _current_week_bounds(today, data["settings"]["week_start"])
+        changes = ChangeSet("clear_week")
         kept = []
         for m in data["scheduled"]:
             dt = _parse_date(m.get("date", ""))
             if dt and start <= dt <= end:
+                changes.removed(SCHEDULED, m)
                 continue
             kept.append(m)
         data["scheduled"] = kept
-        await _save_and_notify(save_scheduled=True)
+        await _save_and_notify(save_scheduled=True, changes=changes)
 
-    hass.services.async_register(DOMAIN, "clear_week", svc_clear_week)
+    services["clear_week"] = svc_clear_week
 
     async def svc_promote_future(call: ServiceCall):
         """Fire update event."""
-        hass.bus.async_fire(EVENT_UPDATED)
+        hass.bus.async_fire(EVENT_UPDATED, updated_event_data(
+            entry.entry_id,
+            "promote_future_to_week",
+            plan["changelog"].revision(plan["snapshots"].current.version),
+        ))
 
-    hass.services.async_register(DOMAIN, "promote_future_to_week", svc_promote_future)
+    services["promote_future_to_week"] = svc_promote_future
 
     async def svc_update_settings(call: ServiceCall):
         """Update settings."""
-        settings_data = dict(call.data)
+        settings_data = {k: v for k, v in call.data.items() if k not in ("entry_id", SCHEMA_VERSION_KEY)}
         data["settings"].update(settings_data)
-        purged = _purge_old_scheduled(data)
-        await _save_and_notify(save_settings=True, save_scheduled=purged > 0)
+        await _save_and_notify(save_settings=True, operation="update_settings")
+        # A shorter days_to_keep takes effect right away rather than at the next daily run
+        await _async_purge_expired()
 
-    hass.services.async_register(DOMAIN, "update_settings", svc_update_settings)
+    services["update_settings"] = svc_update_settings
 
     async def svc_update_library(call: ServiceCall):
-        """Update a library entry's name, recipe_url, or notes by library_id."""
+        """Update a library entry's name, recipe_url, or notes by library_id.
+
+        With ``expected_version`` the update is refused when the entry changed
+        since the client read it: ``VersionConflict`` carries the current entry.
+        A successful update returns the new version, the entry and the undo status.
+        """
         library_id = (call.data.get("library_id") or "").strip()
         if not library_id:
             _LOGGER.warning("update_library: library_id is required")
-            return
+            return {"success": False}
+        try:
+            expected = _parse_version(call.data.get("expected_version"))
+        except (TypeError, ValueError):
+            _LOGGER.warning("update_library: invalid expected version for %s", library_id)
+            return {"success": False}
 
-        lib_entry = None
-        for lib in data["library"]:
-            if lib.get("id") == library_id:
-                lib_entry = lib
-                break
+        lib_entry = _library_entry(library_id)
 
         if not lib_entry:
             _LOGGER.warning("update_library: library entry not found: %s", library_id)
-            return
+            return {"success": False}
+        if _stale(lib_entry, expected):
+            _LOGGER.warning("update_library: %s was changed by someone else; not applied", library_id)
+            raise VersionConflict(f"Library entry {library_id} was changed by someone else", _library_item(lib_entry))
 
+        changes = ChangeSet("update_library")
+        changes.touched(LIBRARY, lib_entry)
         if "name" in call.data:
             new_name = _sanitize_string(call.data.get("name", ""), MAX_NAME_LENGTH, "meal name")
             if new_name:
@@ -726,12 +2104,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             lib_entry["videos"] = _validate_url_list(call.data.get("videos", []))
         if "notes" in call.data:
             lib_entry["notes"] = _sanitize_string(call.data.get("notes", ""), MAX_NOTES_LENGTH, "notes")
+        if "ingredients" in call.data:
+            lib_entry["ingredients"] = _validate_ingredients(call.data.get("ingredients"))
         if "potential" in call.data:
             lib_entry["potential"] = bool(call.data.get("potential", False))
 
-        await _save_and_notify(save_library=True)
+        await _save_and_notify(save_library=True, changes=changes)
+        return {
+            "success": True,
+            "version": lib_entry.get(VERSION, 0),
+            "library": _library_item(lib_entry),
+            "history": plan["history"].status(),
+        }
 
-    hass.services.async_register(DOMAIN, "update_library", svc_update_library)
+    services["update_library"] = svc_update_library
 
     async def svc_delete_library(call: ServiceCall):
         """Delete a library entry and all its scheduled instances by library_id."""
@@ -740,221 +2126,407 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.warning("delete_library: library_id is required")
             return
 
+        changes = ChangeSet("delete_library")
         original_scheduled = len(data["scheduled"])
-        data["scheduled"] = [m for m in data["scheduled"] if m.get("library_id") != library_id]
+        kept = []
+        for m in data["scheduled"]:
+            if m.get("library_id") == library_id:
+                changes.removed(SCHEDULED, m)
+            else:
+                kept.append(m)
+        data["scheduled"] = kept
 
         original_library = len(data["library"])
+        for lib in data["library"]:
+            if lib.get("id") == library_id:
+                changes.removed(LIBRARY, lib)
         data["library"] = [lib for lib in data["library"] if lib.get("id") != library_id]
 
+        save_rules = _remove_rules_for(data, {library_id}, changes)
+        save_templates = _remove_template_meals(data, {library_id}, changes)
         save_scheduled = len(data["scheduled"]) != original_scheduled
         save_library = len(data["library"]) != original_library
 
-        if save_scheduled or save_library:
-            _LOGGER.info("delete_library: removed library entry %s (%d scheduled entries)", library_id, original_scheduled - len(data["scheduled"]))
-            await _save_and_notify(save_scheduled=save_scheduled, save_library=save_library)
+        if save_scheduled or save_library or save_rules or save_templates:
+            _LOGGER.debug("delete_library: removed library entry %s (%d scheduled entries)", library_id, original_scheduled - len(data["scheduled"]))
+            await _save_and_notify(
+                save_scheduled=save_scheduled, save_library=save_library, save_rules=save_rules,
+                save_templates=save_templates, changes=changes,
+            )
 
-    hass.services.async_register(DOMAIN, "delete_library", svc_delete_library)
+    services["delete_library"] = svc_delete_library
+
+    def _apply_rule_fields(rule: dict, fields: dict) -> bool:
+        """Validate and copy recurrence fields onto ``rule``. False if the result is invalid."""
+        if "meal_time" in fields:
+            mt = (fields.get("meal_time") or "").strip().title()
+            if mt in ("Breakfast", "Lunch", "Dinner", "Snack"):
+                rule["meal_time"] = mt
+        if "frequency" in fields:
+            frequency = (fields.get("frequency") or "").strip().lower()
+            if frequency not in FREQUENCIES:
+                _LOGGER.warning("Invalid recurrence frequency: %s", frequency)
+                return False
+            rule["frequency"] = frequency
+        if "interval" in fields:
+            try:
+                rule["interval"] = max(1, min(int(fields.get("interval")), MAX_RULE_INTERVAL))
+            except (TypeError, ValueError):
+                _LOGGER.warning("Invalid recurrence interval: %s", fields.get("interval"))
+                return False
+        if "weekdays" in fields:
+            rule["weekdays"] = _parse_weekdays(fields.get("weekdays"))
+        if "start_date" in fields:
+            start_date = _validate_date(fields.get("start_date") or "")
+            if not start_date:
+                _LOGGER.warning("Invalid recurrence start_date: %s", fields.get("start_date"))
+                return False
+            rule["start_date"] = start_date
+        if "end_date" in fields:
+            rule["end_date"] = _validate_date(fields.get("end_date") or "") or ""
+        if "exceptions" in fields:
+            rule["exceptions"] = sorted({d for d in map(_validate_date, fields.get("exceptions") or []) if d})
+        if rule["end_date"] and rule["end_date"] < rule["start_date"]:
+            _LOGGER.warning("Recurrence end_date %s is before start_date %s", rule["end_date"], rule["start_date"])
+            return False
+        return True
+
+    async def svc_add_rule(call: ServiceCall):
+        """Add a recurring meal (weekly on given weekdays, or every N days)."""
+        name = _sanitize_string(call.data.get("name", ""), MAX_NAME_LENGTH, "meal name")
+        if not name:
+            _LOGGER.warning("Meal name is required")
+            return
+        if len(data["rules"]) >= MAX_RULES:
+            _LOGGER.warning("Recurring meals limit reached (%d)", MAX_RULES)
+            return
 
-    # ---------- WebSocket commands (register BEFORE returning) ----------
-    _LOGGER.info("About to register WebSocket commands...")
-    from homeassistant.components import websocket_api
+        changes = ChangeSet("add_rule")
+        rule = {
+            "id": uuid.uuid4().hex,
+            "library_id": "",
+            "meal_time": "Dinner",
+            "frequency": "weekly",
+            "interval": 1,
+            "weekdays": [],
+            "start_date": "",
+            "end_date": "",
+            "exceptions": [],
+        }
+        if not _apply_rule_fields(rule, {"start_date": datetime.now().date().isoformat(), **call.data}):
+            return
 
-    @websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/get"})
-    @callback
-    def ws_get(hass, connection, msg):
-        """Get data - merges library + scheduled for frontend compatibility."""
-        # Build library lookup
-        library_map = {lib.get("id"): lib for lib in data.get("library", [])}
-
-        # Merge scheduled with library data for frontend
-        merged_scheduled = []
-        for sched in data.get("scheduled", []):
-            library_entry = library_map.get(sched.get("library_id"))
-            merged_meal = {
-                "id": sched.get("id", ""),
-                "name": library_entry.get("name", "") if library_entry else "",
-                "date": sched.get("date", ""),
-                "meal_time": sched.get("meal_time", "Dinner"),
-                "recipe_url": library_entry.get("recipe_url", "") if library_entry else "",
-                "videos": library_entry.get("videos", []) if library_entry else [],
-                "notes": library_entry.get("notes", "") if library_entry else "",
+        library_entry = None
+        for lib in data["library"]:
+            if lib.get("name", "").lower() == name.lower():
+                library_entry = lib
+                break
+        if not library_entry:
+            if not _make_library_room(data, plan["lru"], changes, plan["max_library_size"]):
+                return
+            library_entry = {
+                "id": uuid.uuid4().hex,
+                "name": name,
+                "recipe_url": "",
+                "videos": [],
+                "notes": "",
+                "ingredients": [],
+                "potential": False,
             }
-            merged_scheduled.append(merged_meal)
-
-        # Build library list with unique names for frontend (include id for edit/delete)
-        unique_library = []
-        seen_names = set()
-        for lib in data.get("library", []):
-            name = lib.get("name", "").lower()
-            if name and name not in seen_names:
-                seen_names.add(name)
-                unique_library.append({
-                    "id": lib.get("id", ""),
-                    "name": lib.get("name", ""),
-                    "recipe_url": lib.get("recipe_url", ""),
-                    "videos": lib.get("videos", []),
-                    "notes": lib.get("notes", ""),
-                    "potential": lib.get("potential", False),
-                })
-
-        connection.send_result(msg["id"], {
-            "settings": data.get("settings", {"week_start": "Sunday"}),
-            "scheduled": merged_scheduled,
-            "library": unique_library,
-        })
-
-    @websocket_api.websocket_command({
-        vol.Required("type"): f"{DOMAIN}/add",
-        vol.Required("name"): str,
-        vol.Optional("meal_time"): str,
-        vol.Optional("date"): str,
-        vol.Optional("recipe_url"): str,
-        vol.Optional("videos"): list,
-        vol.Optional("notes"): str,
-    })
-    async def ws_add(hass, connection, msg):
-        await hass.services.async_call(DOMAIN, "add", {
-            "name": msg.get("name",""),
-            "meal_time": msg.get("meal_time","Dinner"),
-            "date": msg.get("date",""),
-            "recipe_url": msg.get("recipe_url",""),
-            "videos": msg.get("videos",[]),
-            "notes": msg.get("notes",""),
-        })
-        connection.send_result(msg["id"], {"success": True})
+            data["library"].append(library_entry)
+            changes.added(LIBRARY, library_entry)
+        elif library_entry.get("potential", False):
+            changes.touched(LIBRARY, library_entry)
+            library_entry["potential"] = False
+
+        rule["library_id"] = library_entry["id"]
+        data["rules"].append(rule)
+        changes.added(RULES, rule)
+        await _save_and_notify(save_library=bool(changes.library), save_rules=True, changes=changes)
+
+    services["add_rule"] = svc_add_rule
+
+    async def svc_update_rule(call: ServiceCall):
+        """Update a recurring meal's schedule or exceptions by rule_id."""
+        rule = _find_rule(data, (call.data.get("rule_id") or "").strip())
+        if rule is None:
+            _LOGGER.warning("update_rule: rule not found: %s", call.data.get("rule_id"))
+            return
 
-    @websocket_api.websocket_command({
-        vol.Required("type"): f"{DOMAIN}/update",
-        vol.Required("row_id"): str,
-        vol.Optional("name"): str,
-        vol.Optional("meal_time"): str,
-        vol.Optional("date"): str,
-        vol.Optional("recipe_url"): str,
-        vol.Optional("videos"): list,
-        vol.Optional("notes"): str,
-    })
-    async def ws_update(hass, connection, msg):
-        try:
-            payload = {"row_id": msg.get("row_id", "")}
-            for k in ("name", "meal_time", "date", "recipe_url", "videos", "notes"):
-                if k in msg:
-                    payload[k] = msg.get(k, "")
-            await hass.services.async_call(DOMAIN, "update", payload)
-            connection.send_result(msg["id"], {"success": True})
-        except Exception as e:
-            _LOGGER.error("ws_update failed: %s", e, exc_info=True)
-            connection.send_error(msg["id"], "update_failed", str(e))
+        changes = ChangeSet("update_rule")
+        changes.touched(RULES, rule)
+        updated = dict(rule)
+        if not _apply_rule_fields(updated, call.data):
+            return
+        rule.update(updated)
+        await _save_and_notify(save_rules=True, changes=changes)
 
-    @websocket_api.websocket_command({
-        vol.Required("type"): f"{DOMAIN}/bulk",
-        vol.Required("action"): str,
-        vol.Required("ids"): list,
-        vol.Optional("date"): str,
-        vol.Optional("meal_time"): str,
-    })
-    async def ws_bulk(hass, connection, msg):
-        await hass.services.async_call(DOMAIN, "bulk", {
-            "action": msg.get("action",""),
-            "ids": msg.get("ids",[]),
-            "date": msg.get("date",""),
-            "meal_time": msg.get("meal_time",""),
-        })
-        connection.send_result(msg["id"], {"success": True})
+    services["update_rule"] = svc_update_rule
 
-    @websocket_api.websocket_command({
-        vol.Required("type"): f"{DOMAIN}/update_settings",
-        vol.Optional("week_start"): str,
-        vol.Optional("days_after_today"): int,
-        vol.Optional("days_to_keep"): int,
-    })
-    async def ws_update_settings(hass, connection, msg):
-        settings_data = {}
-        if "week_start" in msg:
-            settings_data["week_start"] = msg.get("week_start")
-        if "days_after_today" in msg:
-            settings_data["days_after_today"] = msg.get("days_after_today")
-        if "days_to_keep" in msg:
-            settings_data["days_to_keep"] = msg.get("days_to_keep")
+    async def svc_delete_rule(call: ServiceCall):
+        """Delete a recurring meal (the library entry is kept)."""
+        rule = _find_rule(data, (call.data.get("rule_id") or "").strip())
+        if rule is None:
+            _LOGGER.warning("delete_rule: rule not found: %s", call.data.get("rule_id"))
+            return
 
-        await hass.services.async_call(DOMAIN, "update_settings", settings_data)
-        connection.send_result(msg["id"], {"success": True})
+        changes = ChangeSet("delete_rule")
+        changes.removed(RULES, rule)
+        data["rules"] = [r for r in data["rules"] if r is not rule]
+        await _save_and_notify(save_rules=True, changes=changes)
 
-    @websocket_api.websocket_command({
-        vol.Required("type"): f"{DOMAIN}/update_library",
-        vol.Required("library_id"): str,
-        vol.Optional("name"): str,
-        vol.Optional("recipe_url"): str,
-        vol.Optional("videos"): list,
-        vol.Optional("notes"): str,
-        vol.Optional("potential"): bool,
-    })
-    async def ws_update_library(hass, connection, msg):
-        payload = {"library_id": msg.get("library_id", "")}
-        for k in ("name", "recipe_url", "videos", "notes"):
-            if k in msg:
-                payload[k] = msg.get(k, "")
-        if "potential" in msg:
-            payload["potential"] = msg.get("potential")
-        await hass.services.async_call(DOMAIN, "update_library", payload)
-        connection.send_result(msg["id"], {"success": True})
+    services["delete_rule"] = svc_delete_rule
 
-    @websocket_api.websocket_command({
-        vol.Required("type"): f"{DOMAIN}/delete_library",
-        vol.Required("library_id"): str,
-    })
-    async def ws_delete_library(hass, connection, msg):
-        await hass.services.async_call(DOMAIN, "delete_library", {
-            "library_id": msg.get("library_id", "")
-        })
-        connection.send_result(msg["id"], {"success": True})
+    async def svc_suggest(call: ServiceCall):
+        """Suggest meals for empty slots in the rolling week; optionally schedule the top picks."""
+        valid_times = ("Breakfast", "Lunch", "Dinner", "Snack")
+        meal_times = [
+            mt for mt in dict.fromkeys((t or "").strip().title() for t in call.data.get("meal_times") or [])
+            if mt in valid_times
+        ] or list(DEFAULT_SUGGEST_MEAL_TIMES)
+        try:
+            limit = int(call.data.get("limit", DEFAULT_SUGGEST_LIMIT))
+        except (TypeError, ValueError):
+            limit = DEFAULT_SUGGEST_LIMIT
+        limit = max(1, min(limit, MAX_SUGGEST_LIMIT))
+
+        slots = suggest(data, stats, plan["index"], datetime.now().date(), meal_times, limit)
+
+        if call.data.get("fill_week") and slots:
+            changes = ChangeSet("fill_week")
+            library_map = {lib.get("id"): lib for lib in data["library"]}
+            for slot in slots:
+                if not slot["suggestions"]:
+                    continue
+                library_entry = library_map[slot["suggestions"][0]["library_id"]]
+                if library_entry.get("potential", False):
+                    changes.touched(LIBRARY, library_entry)
+                    library_entry["potential"] = False
+                scheduled_entry = {
+                    "id": uuid.uuid4().hex,
+                    "library_id": library_entry["id"],
+                    "meal_time": slot["meal_time"],
+                    "date": slot["date"],
+                }
+                data["scheduled"].append(scheduled_entry)
+                changes.added(SCHEDULED, scheduled_entry)
+                slot["scheduled_id"] = scheduled_entry["id"]
+
+            if changes:
+                _trim_scheduled(data, changes, plan["max_scheduled_size"])
+                _LOGGER.debug("fill_week: scheduled %d suggested meals", len(changes.scheduled))
+                await _save_and_notify(save_library=bool(changes.library), save_scheduled=True, changes=changes)
+
+        return {"slots": slots}
+
+    services["suggest"] = svc_suggest
+
+    async def svc_copy_range(call: ServiceCall):
+        """Copy the scheduled meals of ``start``..``end`` to the days starting at ``target_start``.
+
+        Recurring meals are not copied; their rules already cover the target dates.
+        """
+        start = _parse_date(call.data.get("start", ""))
+        end = _parse_date(call.data.get("end", "")) or start
+        target_start = _parse_date(call.data.get("target_start", ""))
+        conflict = _parse_conflict(call.data.get("conflict"))
+        if start is None or target_start is None or end < start:
+            _LOGGER.warning("copy_range: valid start, end and target_start dates are required")
+            return {"success": False}
+        if conflict is None:
+            return {"success": False}
+        offset = target_start - start
+        if not offset:
+            _LOGGER.warning("copy_range: target_start is the same as start")
+            return {"success": False}
+
+        placements = []
+        for m in plan["index"].range(start, end):
+            source_date = _parse_date(m.get("date", ""))
+            if source_date is not None:
+                placements.append(((source_date + offset).isoformat(), m.get("meal_time", "Dinner"), m.get("library_id", "")))
+        changes = ChangeSet("copy_range")
+        result = _place_meals(data, plan["index"], placements, conflict, changes)
+        _trim_scheduled(data, changes, plan["max_scheduled_size"])
+        if changes:
+            _LOGGER.debug("copy_range: %s", result)
+            await _save_and_notify(save_library=bool(changes.library), save_scheduled=True, changes=changes)
+        return {"success": True, **result}
+
+    services["copy_range"] = svc_copy_range
+
+    def _template_week(call: ServiceCall) -> Optional[date]:
+        """``start`` from the call, or the first day of the current week."""
+        if call.data.get("start"):
+            start = _parse_date(call.data["start"])
+            if start is None:
+                _LOGGER.warning("Invalid template start date: %s", call.data["start"])
+            return start
+        return _current_week_bounds(datetime.now().date(), data["settings"].get("week_start", "Sunday"))[0]
+
+    async def svc_save_template(call: ServiceCall):
+        """Save the scheduled meals of a week as a named template (replacing one of the same name)."""
+        name = _sanitize_string(call.data.get("name", ""), MAX_NAME_LENGTH, "template name")
+        if not name:
+            _LOGGER.warning("Template name is required")
+            return
+        start = _template_week(call)
+        if start is None:
+            return
+        meals = capture_week(plan["index"].range(start, start + timedelta(days=TEMPLATE_DAYS - 1)), start)
+        if not meals:
+            _LOGGER.warning("save_template: no meals scheduled in the week of %s", start)
+            return
+        if len(meals) > MAX_TEMPLATE_MEALS:
+            _LOGGER.warning("save_template: week has %d meals, limit is %d", len(meals), MAX_TEMPLATE_MEALS)
+            return
 
-    # Test command - simple ping
-    @websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/ping"})
-    @callback
-    def ws_ping(hass, connection, msg):
-        _LOGGER.info("PING RECEIVED!")
-        connection.send_result(msg["id"], {"pong": True})
+        changes = ChangeSet("save_template")
+        template = find_template(data, name)
+        if template is None:
+            if len(data["templates"]) >= MAX_TEMPLATES:
+                _LOGGER.warning("Week templates limit reached (%d)", MAX_TEMPLATES)
+                return
+            template = {"id": uuid.uuid4().hex, "name": name, "meals": meals}
+            data["templates"].append(template)
+            changes.added(TEMPLATES, template)
+        else:
+            changes.touched(TEMPLATES, template)
+            template["meals"] = meals
+        await _save_and_notify(save_templates=True, changes=changes)
+
+    services["save_template"] = svc_save_template
+
+    async def svc_apply_template(call: ServiceCall):
+        """Schedule a template's meals in the week starting at ``start``."""
+        template = find_template(data, call.data.get("name") or "")
+        if template is None:
+            _LOGGER.warning("apply_template: template not found: %s", call.data.get("name"))
+            return {"success": False}
+        start = _template_week(call)
+        conflict = _parse_conflict(call.data.get("conflict"))
+        if start is None or conflict is None:
+            return {"success": False}
+
+        changes = ChangeSet("apply_template")
+        result = _place_meals(data, plan["index"], template_placements(template, start), conflict, changes)
+        _trim_scheduled(data, changes, plan["max_scheduled_size"])
+        if changes:
+            _LOGGER.debug("apply_template %s: %s", template["name"], result)
+            await _save_and_notify(save_library=bool(changes.library), save_scheduled=True, changes=changes)
+        return {"success": True, **result}
+
+    services["apply_template"] = svc_apply_template
+
+    async def svc_delete_template(call: ServiceCall):
+        """Delete a week template by name."""
+        template = find_template(data, call.data.get("name") or "")
+        if template is None:
+            _LOGGER.warning("delete_template: template not found: %s", call.data.get("name"))
+            return
 
-    _LOGGER.info("Registering websocket commands")
-    try:
-        websocket_api.async_register_command(hass, ws_ping)
-        _LOGGER.info("Registered: ping")
-        websocket_api.async_register_command(hass, ws_get)
-        _LOGGER.info("Registered: get")
-        websocket_api.async_register_command(hass, ws_add)
-        _LOGGER.info("Registered: add")
-        websocket_api.async_register_command(hass, ws_update)
-        _LOGGER.info("Registered: update")
-        websocket_api.async_register_command(hass, ws_bulk)
-        _LOGGER.info("Registered: bulk")
-        websocket_api.async_register_command(hass, ws_update_settings)
-        _LOGGER.info("Registered: update_settings")
-        websocket_api.async_register_command(hass, ws_update_library)
-        _LOGGER.info("Registered: update_library")
-        websocket_api.async_register_command(hass, ws_delete_library)
-        _LOGGER.info("Registered: delete_library")
-    except Exception as e:
-        _LOGGER.error("Failed to register websocket commands: %s", e, exc_info=True)
-    _LOGGER.info("Websocket commands registered successfully")
+        changes = ChangeSet("delete_template")
+        changes.removed(TEMPLATES, template)
+        data["templates"] = [t for t in data["templates"] if t is not template]
+        await _save_and_notify(save_templates=True, changes=changes)
+
+    services["delete_template"] = svc_delete_template
+
+    async def _step_history(direction: str) -> dict:
+        history = plan["history"]
+        step = history.undo(data) if direction == UNDO else history.redo(data)
+        if step is None:
+            _LOGGER.warning("Nothing to %s", direction)
+            return {"success": False, "op": None, **history.status()}
+        op, changes = step
+        await _save_and_notify(
+            save_library=bool(changes.library),
+            save_scheduled=bool(changes.scheduled),
+            save_rules=bool(changes.rules),
+            save_templates=bool(changes.templates),
+            changes=changes,
+        )
+        _LOGGER.debug("%s: %s (%d rows)", direction, op,
+                     len(changes.scheduled) + len(changes.library) + len(changes.rules) + len(changes.templates))
+        return {"success": True, "op": op, **history.status()}
+
+    async def svc_undo(call: ServiceCall):
+        """Revert the most recent edit (add, update, bulk, delete, ...)."""
+        return await _step_history(UNDO)
+
+    services[UNDO] = svc_undo
+
+    async def svc_redo(call: ServiceCall):
+        """Re-apply the most recently undone edit."""
+        return await _step_history(REDO)
+
+    services[REDO] = svc_redo
+
+    async def svc_profile(call: ServiceCall):
+        """Record a cProfile of this plan's service calls and websocket commands."""
+        if plan["profiler"] is not None:
+            _LOGGER.warning("A profile is already being recorded to %s", plan["profiler"].path)
+            return {"success": False, "path": str(plan["profiler"].path)}
+        try:
+            calls = int(call.data.get("calls") or 0)
+            seconds = float(call.data.get("seconds") or 0)
+        except (TypeError, ValueError):
+            _LOGGER.warning("Invalid profile duration: seconds=%s calls=%s", call.data.get("seconds"), call.data.get("calls"))
+            return {"success": False, "path": None}
+        # Only a call count: run until it is reached, but never unbounded
+        calls = max(0, min(calls, MAX_PROFILE_CALLS)) or None
+        if seconds <= 0:
+            seconds = MAX_PROFILE_SECONDS if calls else DEFAULT_PROFILE_SECONDS
+        seconds = min(seconds, MAX_PROFILE_SECONDS)
+
+        path = storage_base / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+        session = ProfileSession(path, seconds, calls)
+        plan["profiler"] = session
+
+        async def _async_finish_profile():
+            await session.wait()
+            if plan["profiler"] is session:
+                plan["profiler"] = None
+            if session.error:
+                _LOGGER.warning("Profile not recorded: %s", session.error)
+                return
+            try:
+                await hass.async_add_executor_job(session.dump)
+                _LOGGER.info("Profile of %d operations written to %s", session.calls, path)
+            except Exception as e:
+                _LOGGER.error("Failed to write profile: %s", e, exc_info=True)
+
+        hass.async_create_background_task(_async_finish_profile(), f"{DOMAIN} profile")
+        _LOGGER.info("Profiling meal plan operations for up to %.0f s (%s calls) into %s",
+                     seconds, calls or "any", path)
+        return {"success": True, "path": str(path), "seconds": seconds, "calls": calls}
+
+    services["profile"] = svc_profile
+
+    # ---------- Domain services and websocket commands (once for all plans) ----------
+    if not hass.services.has_service(DOMAIN, "add"):
+        _async_register_services(hass, services)
+        _async_register_websocket_commands(hass)
+    async_register_data_view(
+        hass,
+        functools.partial(_get_plan, hass),
+        lambda plan: _operation(plan, HTTP, "plan"),
+        functools.partial(_async_plan_json, hass),
+    )
 
-    # ---------- Serve static admin panel (no cache) ----------
+    # ---------- Serve static admin panel (content-hashed) ----------
     # NOTE: url_path must differ from frontend_url_path ("meal-planner") to avoid
     # a 403 on refresh — HA's HTTP server would intercept the directory request
     # before the frontend JS can handle the route.
+    # index.html is revalidated on every load and references app.js/style.css by
+    # content hash, so those can be cached forever without going stale after HACS updates.
     panel_dir = Path(__file__).parent / "panel"
-    await hass.http.async_register_static_paths(
-        [
-            StaticPathConfig(
-                url_path="/meal-planner-panel",
-                path=str(panel_dir),
-                cache_headers=False,  # avoid stale JS/CSS after HACS updates
-            )
-        ]
-    )
+    await async_register_assets(hass, "/meal-planner-panel", panel_dir, entrypoints=("index.html",))
     _LOGGER.info("Meal Planner: static panel served at /meal-planner-panel from %s", panel_dir)
 
     # ---------- Sidebar Panel ----------
-    panel_id = "meal-planner"
+    # One panel per plan; the iframe tells the dashboard which plan to address.
+    panel_id = plan["panel_id"]
     add_sidebar = entry.options.get("add_sidebar", True)
 
     try:
@@ -968,10 +2540,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             async_register_built_in_panel(
                 hass,
                 component_name="iframe",
-                sidebar_title="Meal Planner",
+                sidebar_title=plan["name"],
                 sidebar_icon="mdi:silverware-fork-knife",
                 frontend_url_path=panel_id,
-                config={"url": "/meal-planner-panel/index.html"},
+                config={"url": f"/meal-planner-panel/index.html?entry_id={entry.entry_id}"},
                 require_admin=False,
             )
             _LOGGER.info("Meal Planner: iframe panel '%s' registered", panel_id)
@@ -982,56 +2554,59 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # ---------- Register Custom Lovelace Cards ----------
     cards_dir = Path(__file__).parent / "www"
-    # Disable caching for card JavaScript files to prevent stale cache issues
-    await hass.http.async_register_static_paths(
-        [
-            StaticPathConfig(
-                url_path="/meal_planner",
-                path=str(cards_dir),
-                cache_headers=False,  # Disable browser caching
-            )
-        ]
+    # Card URLs carry a content hash, so browsers cache them until the file changes.
+    # The loader is rewritten to import the hashed card modules on first use.
+    card_names = await async_register_assets(
+        hass, "/meal_planner", cards_dir, entrypoints=(CARDS_LOADER,)
     )
 
     # Auto-register cards in frontend (no manual resource registration needed!)
-    # Add version parameter for cache busting
+    # Only the small loader is fetched on every page load; card code is lazy.
     from homeassistant.components.frontend import add_extra_js_url
-    import json
-
-    manifest_path = Path(__file__).parent / "manifest.json"
-    version = "0.2.0"  # default
-    try:
-        with open(manifest_path, "r", encoding="utf-8") as f:
-            manifest = json.load(f)
-            version = manifest.get("version", version)
-    except Exception:
-        pass
+    from homeassistant.loader import async_get_integration
 
-    add_extra_js_url(hass, f"/meal_planner/meal-planner-weekly-horizontal.js?v={version}")
-    add_extra_js_url(hass, f"/meal_planner/meal-planner-weekly-vertical.js?v={version}")
-    add_extra_js_url(hass, f"/meal_planner/meal-planner-potential-meals.js?v={version}")
+    integration = await async_get_integration(hass, DOMAIN)  # manifest already parsed by HA
+    cards_url = f"/meal_planner/{card_names[CARDS_LOADER]}"
+    if hass.data.get(CARDS_URL_KEY) != cards_url:
+        add_extra_js_url(hass, cards_url)
+        hass.data[CARDS_URL_KEY] = cards_url
 
-    _LOGGER.info("Meal Planner: custom cards auto-registered (v%s) and served from %s", version, cards_dir)
+    _LOGGER.info("Meal Planner: custom cards auto-registered (v%s) and served from %s", integration.version, cards_dir)
 
     _LOGGER.info("=" * 80)
-    _LOGGER.info("MEAL PLANNER: async_setup_entry completed successfully!")
+    plan["metrics"].startup_ms = round((time.perf_counter() - started) * 1000, 1)
+    _LOGGER.info("MEAL PLANNER: async_setup_entry completed successfully in %.0f ms", plan["metrics"].startup_ms)
     _LOGGER.info("=" * 80)
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    plan = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if plan and plan["saver"] is not None:
+        # Write debounced saves before the plan (and its data) goes away
+        await plan["saver"].async_flush()
     try:
-        await async_remove_panel(hass, "meal-planner")
+        await async_remove_panel(hass, plan["panel_id"] if plan else "meal-planner")
     except Exception:
         pass
 
-    # Unload sensor platform
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    # Unload sensor and calendar platforms
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data.pop(DOMAIN, None)
+        plans = hass.data.get(DOMAIN, {})
+        plans.pop(entry.entry_id, None)
+        if not plans:
+            # Last plan gone: drop the shared services and card loader
+            hass.data.pop(DOMAIN, None)
+            _async_remove_services(hass)
+            cards_url = hass.data.pop(CARDS_URL_KEY, None)
+            if cards_url:
+                from homeassistant.components.frontend import remove_extra_js_url
+                remove_extra_js_url(hass, cards_url)
 
     return unload_ok
-
-
-
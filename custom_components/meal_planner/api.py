@@ -0,0 +1,128 @@
+"""Read-only REST endpoint for plan data, with conditional GET.
+
+``GET /api/meal_planner/plan`` returns the same payload as the ``get``
+websocket command, for wall displays and scripts that poll over plain HTTP.
+The query string takes the command's options: ``entry_id`` to pick the plan
+and ``start`` / ``end`` (ISO dates). Given a range, the response holds only
+the scheduled meals in it, and recurring meals are expanded in it; a
+malformed date or a reversed range is answered with ``400 Bad Request``.
+
+Every response carries an ETag derived from the plan's revision, the
+requested range and today's date (the default range and the rule expansion
+depend on it). A poll that sends it back in ``If-None-Match`` while nothing
+has changed gets ``304 Not Modified`` before any payload is built, so an
+unchanged poll costs one lookup and one hash.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import date, datetime
+from typing import Awaitable, Callable, ContextManager, Optional
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .snapshot import Snapshot
+
+DATA_VIEW = f"{DOMAIN}_data_view"
+
+# Authenticated data: browsers and proxies must not share it, and must revalidate
+PRIVATE_REVALIDATE_CACHE = "private, no-cache"
+
+
+def _parse_date(value: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def plan_etag(entry_id: str, revision: str, start: Optional[date], end: Optional[date], today: date) -> str:
+    """Strong ETag of the plan payload for one revision, range and day."""
+    key = "|".join((
+        entry_id,
+        revision,
+        start.isoformat() if start else "",
+        end.isoformat() if end else "",
+        today.isoformat(),
+    ))
+    return f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value lists ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class MealPlannerDataView(HomeAssistantView):
+    """Serve a plan's data as JSON, answering unchanged polls with 304."""
+
+    url = f"/api/{DOMAIN}/plan"
+    name = f"api:{DOMAIN}:plan"
+
+    def __init__(
+        self,
+        get_plan: Callable[[Optional[str]], Optional[dict]],
+        operation: Callable[[dict], ContextManager],
+        build: Callable[[dict, Snapshot, str, str, date], Awaitable[bytes]],
+    ) -> None:
+        self._get_plan = get_plan
+        self._operation = operation
+        self._build = build
+
+    async def get(self, request: web.Request) -> web.Response:
+        plan = self._get_plan(request.query.get("entry_id"))
+        if plan is None:
+            raise web.HTTPNotFound()
+
+        with self._operation(plan):
+            snapshot = plan["snapshots"].current
+            revision = plan["changelog"].revision(snapshot.version)
+            start = _parse_date(request.query.get("start", ""))
+            end = _parse_date(request.query.get("end", ""))
+            for key, value in (("start", start), ("end", end)):
+                if request.query.get(key) and value is None:
+                    raise web.HTTPBadRequest(text=f"Invalid {key} date: expected YYYY-MM-DD")
+            if start and end and end < start:
+                raise web.HTTPBadRequest(text="end is before start")
+            today = datetime.now().date()
+
+            etag = plan_etag(plan["entry_id"], revision, start, end, today)
+            headers = {"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE_CACHE}
+            if etag_matches(request.headers.get("If-None-Match"), etag):
+                return web.Response(status=304, headers=headers)
+
+            body = await self._build(
+                plan,
+                snapshot,
+                start.isoformat() if start else "",
+                end.isoformat() if end else "",
+                today,
+            )
+            return web.Response(body=body, content_type="application/json", headers=headers)
+
+
+def async_register_data_view(
+    hass: HomeAssistant,
+    get_plan: Callable[[Optional[str]], Optional[dict]],
+    operation: Callable[[dict], ContextManager],
+    build: Callable[[dict, Snapshot, str, str, date], Awaitable[bytes]],
+) -> None:
+    """Serve the plan data endpoint.
+
+    HTTP routes cannot be removed again, so the view is registered once per
+    Home Assistant run and looks plans up per request.
+    """
+    if hass.data.get(DATA_VIEW):
+        return
+    hass.http.register_view(MealPlannerDataView(get_plan, operation, build))
+    hass.data[DATA_VIEW] = True
@@ -0,0 +1,181 @@
+"""Compressed archive of scheduled meals past retention.
+
+The retention purge and the scheduled size cap drop the oldest scheduled
+rows from the live list. Instead of being lost, those rows are appended to
+the archive in ``archive/`` of the plan's storage directory, one file per
+month of their date::
+
+    archive/
+        index.json              {"2025-01": {"rows": 92, "first": "2025-01-01",
+                                             "last": "2025-01-31", "bytes": 2811}}
+        scheduled-2025-01.jsonl.gz
+
+A month file holds one JSON row per line (the scheduled row plus the meal's
+name at the time, since the library entry may be gone later). Each purge
+appends a new gzip member to the files it touches, so nothing is rewritten;
+gzip readers treat the members as one stream. The small index lists the
+months with their row counts and date range, so a history query
+decompresses only the months it covers. Rows without a date go to
+``scheduled-undated.jsonl.gz``.
+
+A row can be archived twice if Home Assistant stops before the purged
+scheduled file was saved; reads keep one row per id. A member cut short by a
+crash ends the readable part of its month file; the rows before it are
+still read.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "archive"
+INDEX_FILE = "index.json"
+UNDATED = "undated"
+
+
+def _parse_date(value: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(value or "")
+    except ValueError:
+        return None
+
+
+def month_key(date_str: str) -> str:
+    """Archive partition of a row dated ``date_str``: ``YYYY-MM`` or ``undated``."""
+    day = _parse_date(date_str)
+    return f"{day.year:04d}-{day.month:02d}" if day else UNDATED
+
+
+class Archive:
+    """Month-partitioned gzip archive of scheduled rows with a date index.
+
+    The methods doing I/O are blocking and run in the executor; a lock keeps
+    an append and a read of the same file apart.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        # month -> {"rows", "first", "last", "bytes"}
+        self.index: dict[str, dict] = {}
+        # Kept apart from the index so the event loop can read it while an append runs
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def _path(self, month: str) -> Path:
+        return self.directory / f"scheduled-{month}.jsonl.gz"
+
+    def load(self) -> None:
+        """Read the index; rebuild it from the month files when missing or unreadable."""
+        index_path = self.directory / INDEX_FILE
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if isinstance(index, dict):
+                self.index = index
+                self.rows = sum(entry.get("rows", 0) for entry in index.values())
+                return
+        except FileNotFoundError:
+            if not self.directory.is_dir():
+                return
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Archive index %s is unreadable (%s); rebuilding it", index_path, e)
+        with self._lock:
+            self.index = {}
+            self.rows = 0
+            for path in sorted(self.directory.glob("scheduled-*.jsonl.gz")):
+                month = path.name[len("scheduled-"):-len(".jsonl.gz")]
+                for row in self._read_month(month):
+                    self._count(month, row.get("date", ""))
+                if month in self.index:
+                    self.index[month]["bytes"] = path.stat().st_size
+            self._write_index()
+
+    def _count(self, month: str, date_str: str) -> None:
+        entry = self.index.setdefault(month, {"rows": 0, "first": None, "last": None, "bytes": 0})
+        entry["rows"] += 1
+        self.rows += 1
+        if date_str and month != UNDATED:
+            if entry["first"] is None or date_str < entry["first"]:
+                entry["first"] = date_str
+            if entry["last"] is None or date_str > entry["last"]:
+                entry["last"] = date_str
+
+    def _write_index(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        index_path = self.directory / INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, index_path)
+
+    def append(self, rows: Iterable[dict]) -> int:
+        """Append ``rows`` to their month files and update the index. Returns the row count."""
+        by_month: dict[str, list[dict]] = {}
+        for row in rows:
+            by_month.setdefault(month_key(row.get("date", "")), []).append(row)
+        if not by_month:
+            return 0
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for month, month_rows in sorted(by_month.items()):
+                path = self._path(month)
+                lines = "".join(
+                    json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n" for row in month_rows
+                )
+                with gzip.open(path, "at", encoding="utf-8") as f:
+                    f.write(lines)
+                for row in month_rows:
+                    self._count(month, row.get("date", ""))
+                self.index[month]["bytes"] = path.stat().st_size
+            self._write_index()
+        return sum(len(month_rows) for month_rows in by_month.values())
+
+    def months(self, start: date, end: date) -> list[str]:
+        """Archived months with rows dated within ``start``..``end``."""
+        with self._lock:
+            return self._months(start, end)
+
+    def _months(self, start: date, end: date) -> list[str]:
+        start_str, end_str = start.isoformat(), end.isoformat()
+        return sorted(
+            month for month, entry in self.index.items()
+            if month != UNDATED and (entry.get("first") or "~") <= end_str and (entry.get("last") or "") >= start_str
+        )
+
+    def _read_month(self, month: str) -> list[dict]:
+        rows = []
+        path = self._path(month)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(row, dict):
+                        rows.append(row)
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, zlib.error) as e:
+            _LOGGER.warning("Archive file %s is damaged after %d rows: %s", path.name, len(rows), e)
+        return rows
+
+    def read(self, start: date, end: date) -> list[dict]:
+        """Archived rows dated within ``start``..``end``, one per id. Decompresses only those months."""
+        start_str, end_str = start.isoformat(), end.isoformat()
+        rows: dict[str, dict] = {}
+        with self._lock:
+            for month in self._months(start, end):
+                for row in self._read_month(month):
+                    if start_str <= row.get("date", "") <= end_str:
+                        rows[row.get("id", "")] = row
+        return list(rows.values())
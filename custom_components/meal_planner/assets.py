@@ -0,0 +1,177 @@
+"""Content-hashed, precompressed static assets for the admin panel and cards.
+
+Every file in ``panel/`` and ``www/`` is read once at startup (in the executor),
+hashed and gzip-compressed in memory. Each file is then served under two names:
+
+- ``app.<hash>.js`` — immutable, cached by the browser for a year
+- ``app.js``        — revalidated on every load via ETag (for manual resources)
+
+Entry points (``index.html`` and friends) are rewritten so that their relative
+``./file`` references point at the hashed names. A HACS update therefore changes
+the URLs the browser asks for instead of relying on disabled caching.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_ASSETS = f"{DOMAIN}_assets"
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Files smaller than this are not worth the gzip framing overhead
+MIN_GZIP_SIZE = 512
+HASH_LENGTH = 12
+
+_TEXT_SUFFIXES = (".html", ".js", ".css", ".json", ".svg")
+
+
+@dataclass(frozen=True)
+class Asset:
+    """A single in-memory static file."""
+
+    body: bytes
+    gzip_body: bytes | None
+    content_type: str
+    charset: str | None
+    etag: str
+    immutable: bool
+
+
+def _hashed_name(name: str, digest: str) -> str:
+    stem, dot, suffix = name.rpartition(".")
+    if not dot:
+        return f"{name}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def _content_type(name: str) -> str:
+    if name.endswith(".js"):
+        return "application/javascript"
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def _make_assets(name: str, body: bytes) -> tuple[str, Asset, Asset]:
+    digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+    gzip_body = None
+    if len(body) >= MIN_GZIP_SIZE:
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            gzip_body = compressed
+    content_type = _content_type(name)
+    charset = "utf-8" if name.endswith(_TEXT_SUFFIXES) else None
+    etag = f'"{digest}"'
+    hashed = _hashed_name(name, digest)
+    return (
+        hashed,
+        Asset(body, gzip_body, content_type, charset, etag, immutable=False),
+        Asset(body, gzip_body, content_type, charset, etag, immutable=True),
+    )
+
+
+def build_assets(directory: Path, entrypoints: tuple[str, ...] = ()) -> tuple[dict[str, Asset], dict[str, str]]:
+    """Hash and compress every file in ``directory``.
+
+    Returns ``(assets, hashed_names)`` where ``assets`` is keyed by served file
+    name (plain and hashed) and ``hashed_names`` maps plain name → hashed name.
+    Blocking: run in the executor.
+    """
+    assets: dict[str, Asset] = {}
+    hashed_names: dict[str, str] = {}
+
+    files = sorted(p for p in directory.iterdir() if p.is_file())
+    # Entry points are processed last so they can reference hashed siblings
+    files.sort(key=lambda p: p.name in entrypoints)
+
+    for path in files:
+        body = path.read_bytes()
+        if path.name in entrypoints and path.suffix in _TEXT_SUFFIXES:
+            text = body.decode("utf-8")
+            for plain, hashed in hashed_names.items():
+                for quote in ('"', "'"):
+                    text = text.replace(f"{quote}./{plain}{quote}", f"{quote}./{hashed}{quote}")
+            body = text.encode("utf-8")
+
+        hashed, plain_asset, hashed_asset = _make_assets(path.name, body)
+        assets[path.name] = plain_asset
+        assets[hashed] = hashed_asset
+        hashed_names[path.name] = hashed
+
+    return assets, hashed_names
+
+
+class MealPlannerAssetView(HomeAssistantView):
+    """Serve one asset directory from memory with hash-based caching."""
+
+    requires_auth = False
+
+    def __init__(self, url_path: str, name: str, assets: dict[str, Asset]) -> None:
+        self.url = f"{url_path}/{{filename}}"
+        self.name = name
+        self._assets = assets
+
+    async def get(self, request: web.Request, filename: str) -> web.Response:
+        asset = self._assets.get(filename)
+        if asset is None:
+            raise web.HTTPNotFound()
+
+        headers = {
+            "ETag": asset.etag,
+            "Cache-Control": IMMUTABLE_CACHE if asset.immutable else REVALIDATE_CACHE,
+            "Vary": "Accept-Encoding",
+        }
+        if request.headers.get("If-None-Match") == asset.etag:
+            return web.Response(status=304, headers=headers)
+
+        body = asset.body
+        if asset.gzip_body is not None and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = asset.gzip_body
+            headers["Content-Encoding"] = "gzip"
+
+        return web.Response(
+            body=body, content_type=asset.content_type, charset=asset.charset, headers=headers
+        )
+
+
+async def async_register_assets(
+    hass: HomeAssistant,
+    url_path: str,
+    directory: Path,
+    entrypoints: tuple[str, ...] = (),
+) -> dict[str, str]:
+    """Build and serve ``directory`` under ``url_path``. Returns plain → hashed names.
+
+    HTTP routes cannot be removed again, so each directory is only built and
+    registered once per Home Assistant run; config entry reloads reuse it.
+    """
+    registered = hass.data.setdefault(DATA_ASSETS, {})
+    if url_path in registered:
+        return registered[url_path]
+
+    assets, hashed_names = await hass.async_add_executor_job(build_assets, directory, entrypoints)
+    view_name = f"{DOMAIN}:assets:{url_path.strip('/')}"
+    hass.http.register_view(MealPlannerAssetView(url_path, view_name, assets))
+    registered[url_path] = hashed_names
+
+    plain = [a for a in assets.values() if not a.immutable]
+    raw = sum(len(a.body) for a in plain)
+    packed = sum(len(a.gzip_body or a.body) for a in plain)
+    _LOGGER.debug(
+        "Meal Planner: %d assets from %s served at %s (%d bytes, %d gzipped)",
+        len(hashed_names), directory, url_path, raw, packed,
+    )
+    return hashed_names
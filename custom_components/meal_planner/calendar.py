@@ -0,0 +1,118 @@
+"""Calendar platform for Meal Planner."""
+from __future__ import annotations
+
+import itertools
+import logging
+from datetime import date, datetime, time, timedelta
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, MEAL_TIME_SLOTS, MEAL_EVENT_MINUTES, RULE_HORIZON_DAYS
+from .recurrence import expand_rules
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Meal Planner calendar."""
+    plan = hass.data[DOMAIN][entry.entry_id]
+    calendar = MealPlannerCalendar(hass, plan)
+    async_add_entities([calendar], True)
+
+    # Store reference for updates
+    plan["sensors"]["calendar"] = calendar
+
+
+class MealPlannerCalendar(CalendarEntity):
+    """One event per scheduled meal, timed by its meal_time."""
+
+    _attr_has_entity_name = False
+    _attr_name = "Meal Planner"
+    _attr_icon = "mdi:silverware-fork-knife"
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, plan: dict):
+        """Initialize the calendar."""
+        self.hass = hass
+        self.plan = plan
+        self.index = plan["index"]
+        # (snapshot version, day) → that day's upcoming events, for ``event``
+        self._upcoming: tuple[tuple[int, date], list[CalendarEvent]] | None = None
+        self._attr_name = plan["name"]
+        self._attr_unique_id = f"{plan['entry_id']}_meal_planner_calendar"
+        self._attr_suggested_object_id = plan["object_id"]
+
+    def _events(self, start: date, end: date) -> list[CalendarEvent]:
+        """Events for scheduled and recurring meals dated within ``[start, end]``.
+
+        Names and rules come from the plan's current snapshot; the date index
+        matches it between commits.
+        """
+        snapshot = self.plan["snapshots"].current
+        library_map = snapshot.library
+        tz = dt_util.get_default_time_zone()
+        events = []
+        rows = itertools.chain(
+            self.index.range(start, end),
+            expand_rules(snapshot.rules.values(), start, end),
+        )
+        for m in rows:
+            library_entry = library_map.get(m.get("library_id"))
+            if not library_entry:
+                continue
+            try:
+                day = date.fromisoformat(m["date"])
+            except (KeyError, ValueError):
+                continue
+            meal_time = m.get("meal_time") or "Dinner"
+            hour, minute = MEAL_TIME_SLOTS.get(meal_time, MEAL_TIME_SLOTS["Dinner"])
+            event_start = datetime.combine(day, time(hour, minute), tzinfo=tz)
+            description = "\n".join(
+                part for part in (library_entry.get("notes", ""), library_entry.get("recipe_url", "")) if part
+            )
+            events.append(CalendarEvent(
+                start=event_start,
+                end=event_start + timedelta(minutes=MEAL_EVENT_MINUTES),
+                summary=f"{meal_time}: {library_entry.get('name', '')}",
+                description=description or None,
+                uid=m.get("id"),
+            ))
+        events.sort(key=lambda e: e.start)
+        return events
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """The current or next upcoming meal.
+
+        The horizon's events are built once per data version and day, not on
+        every state write.
+        """
+        now = dt_util.now()
+        key = (self.plan["snapshots"].current.version, now.date())
+        if self._upcoming is None or self._upcoming[0] != key:
+            today = now.date()
+            self._upcoming = (key, self._events(today, today + timedelta(days=RULE_HORIZON_DAYS)))
+        return next((e for e in self._upcoming[1] if e.end > now), None)
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Events overlapping ``[start_date, end_date)``, served from the date index."""
+        start = dt_util.as_local(start_date).date()
+        end = dt_util.as_local(end_date).date()
+        return [
+            e for e in self._events(start, end)
+            if e.end > start_date and e.start < end_date
+        ]
+
+    async def async_update_from_data(self) -> None:
+        """Update calendar state from data changes."""
+        self.async_write_ha_state()
@@ -0,0 +1,77 @@
+"""Recent row changes by revision, for delta sync.
+
+Every published snapshot has a revision: its version, prefixed with an epoch
+that is new on every start so a client never mixes revisions of two runs
+(``"<epoch>.<version>"``). ``ChangeLog`` remembers which library, scheduled
+and rule ids each of the last ``depth`` revisions touched. A client that
+already holds revision R asks for the changes since R and gets only the rows
+touched after it, read from the current snapshot: rows that still exist are
+sent whole, the others as deleted ids. When R is older than the log (or from
+another run) the client must reload everything.
+"""
+from __future__ import annotations
+
+import uuid
+from collections import deque
+from typing import Optional
+
+from .changes import ChangeSet, LIBRARY, RULES, SCHEDULED
+from .snapshot import Snapshot
+
+_KINDS = (LIBRARY, SCHEDULED, RULES)
+
+
+class ChangeLog:
+    """Ids touched per revision, for the last ``depth`` revisions."""
+
+    def __init__(self, depth: int, version: int) -> None:
+        self.depth = max(0, depth)
+        self.epoch = uuid.uuid4().hex[:8]
+        self._entries: deque[tuple[int, dict[str, frozenset]]] = deque(maxlen=self.depth or None)
+        # Changes after this version are all in the log
+        self._base = version
+
+    def revision(self, version: int) -> str:
+        return f"{self.epoch}.{version}"
+
+    def record(self, version: int, changes: Optional[ChangeSet]) -> None:
+        """Remember the ids ``changes`` touched to produce snapshot ``version``."""
+        if not self.depth:
+            self._base = version
+            return
+        if len(self._entries) == self.depth:
+            self._base = self._entries[0][0]
+        touched = {
+            kind: frozenset(getattr(changes, kind))
+            for kind in _KINDS
+            if changes and getattr(changes, kind)
+        }
+        self._entries.append((version, touched))
+
+    def _version_of(self, revision: str) -> Optional[int]:
+        epoch, _, version = (revision or "").partition(".")
+        if epoch != self.epoch:
+            return None
+        try:
+            return int(version)
+        except ValueError:
+            return None
+
+    def delta(self, since_revision: str, snapshot: Snapshot) -> Optional[dict]:
+        """Rows changed after ``since_revision`` as of ``snapshot``; None if a full reload is needed."""
+        since = self._version_of(since_revision)
+        if since is None or since < self._base or since > snapshot.version:
+            return None
+        touched: dict[str, set] = {kind: set() for kind in _KINDS}
+        for version, ids in reversed(self._entries):
+            if version <= since:
+                break
+            for kind, kind_ids in ids.items():
+                touched[kind] |= kind_ids
+        result = {"revision": self.revision(snapshot.version), "deleted": {}}
+        for kind in _KINDS:
+            table = getattr(snapshot, kind)
+            result[kind] = [table[row_id] for row_id in touched[kind] if row_id in table]
+            result["deleted"][kind] = sorted(row_id for row_id in touched[kind] if row_id not in table)
+        result["settings"] = dict(snapshot.settings)
+        return result
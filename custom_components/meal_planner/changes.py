@@ -0,0 +1,99 @@
+"""Row-level change tracking for Meal Planner mutations.
+
+Services record every scheduled/library row they insert, modify or remove in a
+``ChangeSet``. ``_save_and_notify`` hands the change set to the derived
+structures (statistics, indexes, ...) so they can update in O(changed rows)
+instead of rescanning ``data``.
+
+Library and scheduled rows carry a ``version`` that ``bump_versions`` raises
+on every insert and every edit that changes the row. Clients send the
+version they last saw with an update, and the update is refused when the row
+has changed since. Versions never go back, not even when an undo restores
+older content, so a version always names one state of the row.
+"""
+from __future__ import annotations
+
+SCHEDULED = "scheduled"
+LIBRARY = "library"
+RULES = "rules"
+TEMPLATES = "templates"
+
+VERSION = "version"
+VERSIONED = (LIBRARY, SCHEDULED)
+
+
+def _copy_row(row: dict) -> dict:
+    return {k: list(v) if isinstance(v, list) else v for k, v in row.items()}
+
+
+def _content_differs(before: dict, after: dict) -> bool:
+    keys = (before.keys() | after.keys()) - {VERSION}
+    return any(before.get(k) != after.get(k) for k in keys)
+
+
+class ChangeSet:
+    """Rows touched by one operation, as ``[before, after]`` pairs keyed by row id.
+
+    ``kind`` is one of ``SCHEDULED``, ``LIBRARY``, ``RULES`` or ``TEMPLATES``.
+
+    ``before`` is a copy taken the first time a row is touched (``None`` for
+    inserts); ``after`` is the live row (``None`` for deletes). List values are
+    copied too, since some edits append to them in place (rule exceptions).
+    """
+
+    def __init__(self, op: str) -> None:
+        self.op = op
+        self.scheduled: dict[str, list] = {}
+        self.library: dict[str, list] = {}
+        self.rules: dict[str, list] = {}
+        self.templates: dict[str, list] = {}
+        # Row ids removed by retention/capacity rather than by the user
+        self.purged: set[str] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.scheduled or self.library or self.rules or self.templates)
+
+    def _table(self, kind: str) -> dict[str, list]:
+        return getattr(self, kind)
+
+    def added(self, kind: str, row: dict) -> None:
+        """Record a newly inserted row."""
+        table = self._table(kind)
+        entry = table.get(row["id"])
+        if entry is None:
+            table[row["id"]] = [None, row]
+        else:
+            entry[1] = row
+
+    def touched(self, kind: str, row: dict) -> None:
+        """Record a row that is about to be modified in place. Call before mutating."""
+        table = self._table(kind)
+        if row["id"] not in table:
+            table[row["id"]] = [_copy_row(row), row]
+
+    def removed(self, kind: str, row: dict, purged: bool = False) -> None:
+        """Record a row that was removed from its list."""
+        table = self._table(kind)
+        entry = table.get(row["id"])
+        if entry is None:
+            table[row["id"]] = [row, None]
+        elif entry[0] is None:
+            # Inserted and removed within the same operation: no net change
+            del table[row["id"]]
+            return
+        else:
+            entry[1] = None
+        if purged:
+            self.purged.add(row["id"])
+
+    def bump_versions(self) -> None:
+        """Give every inserted or changed library and scheduled row its next version."""
+        for kind in VERSIONED:
+            for before, after in self._table(kind).values():
+                if after is None:
+                    continue
+                if before is None:
+                    # New, or restored by undo/redo: continue from the version it had
+                    after[VERSION] = after.get(VERSION, 0) + 1
+                elif _content_differs(before, after):
+                    after[VERSION] = max(before.get(VERSION, 0), after.get(VERSION, 0)) + 1
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import re
+
 from homeassistant.config_entries import (
     ConfigEntry,
     ConfigFlow,
@@ -8,17 +10,78 @@ from homeassistant.config_entries import (
 )
 import voluptuous as vol
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    PLANS_STORAGE_DIR,
+    CONF_STATS_SENSOR,
+    CONF_DEBUG_SENSOR,
+    CONF_SLUG,
+    CONF_STORAGE_DIR,
+    CONF_UNDO_DEPTH,
+    CONF_UNDO_MEMORY_KB,
+    DEFAULT_UNDO_DEPTH,
+    DEFAULT_UNDO_MEMORY_KB,
+    MAX_UNDO_DEPTH,
+    MAX_UNDO_MEMORY_KB,
+    CONF_PURGE_HOUR,
+    DEFAULT_PURGE_HOUR,
+    CONF_SLOW_OPERATION_MS,
+    DEFAULT_SLOW_OPERATION_MS,
+    MAX_SLOW_OPERATION_MS,
+    CONF_STORAGE_FORMAT,
+    STORAGE_FORMAT_JSON,
+    STORAGE_FORMATS,
+    CONF_SAVE_DELAY_MS,
+    DEFAULT_SAVE_DELAY_MS,
+    MAX_SAVE_DELAY_MS,
+    CONF_MAX_LIBRARY_SIZE,
+    CONF_MAX_SCHEDULED_SIZE,
+    MAX_LIBRARY_SIZE,
+    MAX_SCHEDULED_SIZE,
+    LIBRARY_SIZE_RANGE,
+    SCHEDULED_SIZE_RANGE,
+    CONF_CHANGE_LOG_DEPTH,
+    DEFAULT_CHANGE_LOG_DEPTH,
+    MAX_CHANGE_LOG_DEPTH,
+    CONF_RECORDER_ATTRIBUTES,
+    RECORDER_ATTRIBUTES_FULL,
+    RECORDER_ATTRIBUTE_MODES,
+)
+
+DEFAULT_TITLE = "Basic Meal Planner"
+
+
+def _slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
 
 class MealPlannerConfigFlow(ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     async def async_step_user(self, user_input=None) -> ConfigFlowResult:
-        if self._async_current_entries():
-            return self.async_abort(reason="already_configured")
+        # The first plan keeps the original storage and entity ids; every
+        # further plan gets its own storage directory (under PLANS_STORAGE_DIR),
+        # entities and panel.
+        existing = self._async_current_entries()
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="Basic Meal Planner", data={})
-        return self.async_show_form(step_id="user", data_schema=vol.Schema({}))
+            name = user_input.get("name", "").strip() or DEFAULT_TITLE
+            if not existing:
+                return self.async_create_entry(title=name, data={})
+            slug = _slugify(name)
+            if not slug:
+                errors["name"] = "invalid_name"
+            elif any(e.data.get(CONF_SLUG) == slug for e in existing):
+                return self.async_abort(reason="already_configured")
+            else:
+                return self.async_create_entry(
+                    title=name,
+                    data={CONF_SLUG: slug, CONF_STORAGE_DIR: f"{PLANS_STORAGE_DIR}/{slug}"},
+                )
+
+        default = DEFAULT_TITLE if not existing else ""
+        schema = vol.Schema({vol.Required("name", default=default): str})
+        return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
 
     @staticmethod
     def async_get_options_flow(config_entry: ConfigEntry) -> MealPlannerOptionsFlow:
@@ -33,6 +96,55 @@ class MealPlannerOptionsFlow(OptionsFlow):
             vol.Optional(
                 "add_sidebar",
                 default=self.config_entry.options.get("add_sidebar", True)
-            ): bool
+            ): bool,
+            vol.Optional(
+                CONF_STATS_SENSOR,
+                default=self.config_entry.options.get(CONF_STATS_SENSOR, False)
+            ): bool,
+            vol.Optional(
+                CONF_UNDO_DEPTH,
+                default=self.config_entry.options.get(CONF_UNDO_DEPTH, DEFAULT_UNDO_DEPTH)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_UNDO_DEPTH)),
+            vol.Optional(
+                CONF_UNDO_MEMORY_KB,
+                default=self.config_entry.options.get(CONF_UNDO_MEMORY_KB, DEFAULT_UNDO_MEMORY_KB)
+            ): vol.All(vol.Coerce(int), vol.Range(min=16, max=MAX_UNDO_MEMORY_KB)),
+            vol.Optional(
+                CONF_PURGE_HOUR,
+                default=self.config_entry.options.get(CONF_PURGE_HOUR, DEFAULT_PURGE_HOUR)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=23)),
+            vol.Optional(
+                CONF_DEBUG_SENSOR,
+                default=self.config_entry.options.get(CONF_DEBUG_SENSOR, False)
+            ): bool,
+            vol.Optional(
+                CONF_SLOW_OPERATION_MS,
+                default=self.config_entry.options.get(CONF_SLOW_OPERATION_MS, DEFAULT_SLOW_OPERATION_MS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_SLOW_OPERATION_MS)),
+            # Performance tuning
+            vol.Optional(
+                CONF_STORAGE_FORMAT,
+                default=self.config_entry.options.get(CONF_STORAGE_FORMAT, STORAGE_FORMAT_JSON)
+            ): vol.In(STORAGE_FORMATS),
+            vol.Optional(
+                CONF_SAVE_DELAY_MS,
+                default=self.config_entry.options.get(CONF_SAVE_DELAY_MS, DEFAULT_SAVE_DELAY_MS)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_SAVE_DELAY_MS)),
+            vol.Optional(
+                CONF_MAX_LIBRARY_SIZE,
+                default=self.config_entry.options.get(CONF_MAX_LIBRARY_SIZE, MAX_LIBRARY_SIZE)
+            ): vol.All(vol.Coerce(int), vol.Range(*LIBRARY_SIZE_RANGE)),
+            vol.Optional(
+                CONF_MAX_SCHEDULED_SIZE,
+                default=self.config_entry.options.get(CONF_MAX_SCHEDULED_SIZE, MAX_SCHEDULED_SIZE)
+            ): vol.All(vol.Coerce(int), vol.Range(*SCHEDULED_SIZE_RANGE)),
+            vol.Optional(
+                CONF_CHANGE_LOG_DEPTH,
+                default=self.config_entry.options.get(CONF_CHANGE_LOG_DEPTH, DEFAULT_CHANGE_LOG_DEPTH)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_CHANGE_LOG_DEPTH)),
+            vol.Optional(
+                CONF_RECORDER_ATTRIBUTES,
+                default=self.config_entry.options.get(CONF_RECORDER_ATTRIBUTES, RECORDER_ATTRIBUTES_FULL)
+            ): vol.In(RECORDER_ATTRIBUTE_MODES),
         })
         return self.async_show_form(step_id="init", data_schema=schema)
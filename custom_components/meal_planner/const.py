@@ -1,7 +1,16 @@
 DOMAIN = "meal_planner"
 STORAGE_DIR = "meal_planner"
+# Plans after the first, one subdirectory each; a sibling of STORAGE_DIR so a
+# plan's name can never clash with the first plan's own subdirectories
+PLANS_STORAGE_DIR = "meal_planner_plans"
 STORAGE_FILE = "meals.json"
+STATS_FILE = "stats.json"
+RULES_FILE = "rules.json"
+TEMPLATES_FILE = "templates.json"
 EVENT_UPDATED = f"{DOMAIN}_updated"
+CARDS_LOADER = "meal-planner-cards.js"
+# hass.data key for the card loader URL, shared by all plans
+CARDS_URL_KEY = f"{DOMAIN}_cards_url"
 
 # Validation constants
 MAX_NAME_LENGTH = 100
@@ -10,3 +19,73 @@ MAX_URL_LENGTH = 2048
 MAX_LIBRARY_SIZE = 1000
 MAX_SCHEDULED_SIZE = 5000
 MAX_VIDEOS = 10
+MAX_RULES = 200
+MAX_TEMPLATES = 50
+MAX_TEMPLATE_MEALS = 100
+
+# Calendar event start (hour, minute) and length per meal_time
+MEAL_TIME_SLOTS = {
+    "Breakfast": (8, 0),
+    "Lunch": (12, 0),
+    "Snack": (15, 0),
+    "Dinner": (18, 0),
+}
+MEAL_EVENT_MINUTES = 60
+
+# Recurring meals are expanded this far ahead for the admin panel
+RULE_HORIZON_DAYS = 56
+# Longest date range one meal_planner/history query may cover
+MAX_HISTORY_DAYS = 366
+
+# Options
+CONF_STATS_SENSOR = "stats_sensor"
+CONF_DEBUG_SENSOR = "debug_sensor"
+CONF_UNDO_DEPTH = "undo_depth"
+CONF_UNDO_MEMORY_KB = "undo_memory_kb"
+CONF_PURGE_HOUR = "purge_hour"
+CONF_SLOW_OPERATION_MS = "slow_operation_ms"
+
+# Undo history bounds (entries, and KiB of row copies held)
+DEFAULT_UNDO_DEPTH = 50
+MAX_UNDO_DEPTH = 500
+DEFAULT_UNDO_MEMORY_KB = 512
+MAX_UNDO_MEMORY_KB = 16384
+
+# Config entry data (plans after the first)
+CONF_SLUG = "slug"
+CONF_STORAGE_DIR = "storage_dir"
+
+# Daily retention purge: local hour it runs at
+DEFAULT_PURGE_HOUR = 3
+
+# Operations at least this slow are logged with their stage breakdown (0: never)
+DEFAULT_SLOW_OPERATION_MS = 500
+MAX_SLOW_OPERATION_MS = 60000
+
+# Storage file format: indented (readable) or compact JSON (smaller, faster to write)
+CONF_STORAGE_FORMAT = "storage_format"
+STORAGE_FORMAT_JSON = "json"
+STORAGE_FORMAT_COMPACT = "json_compact"
+STORAGE_FORMATS = (STORAGE_FORMAT_JSON, STORAGE_FORMAT_COMPACT)
+
+# Saves within this window are coalesced into one write per file (0: write at once)
+CONF_SAVE_DELAY_MS = "save_delay_ms"
+DEFAULT_SAVE_DELAY_MS = 0
+MAX_SAVE_DELAY_MS = 10000
+
+# Dataset caps; MAX_LIBRARY_SIZE / MAX_SCHEDULED_SIZE are the defaults
+CONF_MAX_LIBRARY_SIZE = "max_library_size"
+CONF_MAX_SCHEDULED_SIZE = "max_scheduled_size"
+LIBRARY_SIZE_RANGE = (100, 10000)
+SCHEDULED_SIZE_RANGE = (500, 50000)
+
+# Revisions kept for delta sync (meal_planner/changes); older clients reload everything
+CONF_CHANGE_LOG_DEPTH = "change_log_depth"
+DEFAULT_CHANGE_LOG_DEPTH = 200
+MAX_CHANGE_LOG_DEPTH = 5000
+
+# Sensor attributes stored by the recorder: all of them, or none of the large lists
+CONF_RECORDER_ATTRIBUTES = "recorder_attributes"
+RECORDER_ATTRIBUTES_FULL = "full"
+RECORDER_ATTRIBUTES_COMPACT = "compact"
+RECORDER_ATTRIBUTE_MODES = (RECORDER_ATTRIBUTES_FULL, RECORDER_ATTRIBUTES_COMPACT)
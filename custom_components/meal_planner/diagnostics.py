@@ -0,0 +1,26 @@
+"""Diagnostics for Meal Planner: dataset and file sizes, and performance counters."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .metrics import dataset_sizes, file_sizes
+from .migrations import SCHEMA_VERSION_KEY
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for one meal plan. Contains no meal names or notes."""
+    plan = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if plan is None:
+        return {"loaded": False, "options": dict(entry.options)}
+
+    return {
+        "loaded": True,
+        "default_plan": plan["default"],
+        "options": dict(entry.options),
+        "schema_version": plan["data"].get("settings", {}).get(SCHEMA_VERSION_KEY),
+        "dataset": dataset_sizes(plan),
+        "files": await hass.async_add_executor_job(file_sizes, plan["paths"]),
+        "performance": plan["metrics"].as_dict(),
+    }
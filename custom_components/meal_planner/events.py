@@ -0,0 +1,111 @@
+"""Payload of the ``meal_planner_updated`` bus event.
+
+The event fires once per committed operation, so a bulk action or a purge is
+one event however many rows it touched. Its data says what happened, so
+automations don't have to re-read the sensors and diff them::
+
+    {
+        "entry_id": "…",
+        "operation": "bulk_delete",
+        "revision": "3f2a9c1e.42",
+        "scheduled": [
+            {"id": "…", "change": "removed", "date": "2025-01-06",
+             "meal_time": "Dinner", "library_id": "…"},
+            {"id": "…", "change": "updated", "date": "2025-01-08",
+             "meal_time": "Lunch", "library_id": "…",
+             "previous": {"date": "2025-01-07", "meal_time": "Dinner"}},
+        ],
+        "library": [{"id": "…", "change": "added", "name": "Pizza"}],
+        "rules": [{"id": "…", "change": "updated", "library_id": "…"}],
+        "settings": False,
+        "truncated": False,
+    }
+
+``change`` is ``added``, ``updated``, ``removed`` or ``purged`` (a scheduled
+row dropped by retention or the size cap). Scheduled rows carry the slot
+after the change, or the one they were removed from; ``previous`` is only
+there when an update moved the row. Events are stored by the recorder, so
+each list holds at most ``MAX_EVENT_ROWS`` rows; ``truncated`` tells that
+more rows changed than are listed.
+"""
+from __future__ import annotations
+
+import itertools
+from typing import Optional
+
+from .changes import ChangeSet, LIBRARY, RULES, SCHEDULED
+
+MAX_EVENT_ROWS = 100
+
+ADDED = "added"
+UPDATED = "updated"
+REMOVED = "removed"
+PURGED = "purged"
+
+_SLOT = ("date", "meal_time")
+
+
+def _change(before: Optional[dict], after: Optional[dict]) -> str:
+    if before is None:
+        return ADDED
+    if after is None:
+        return REMOVED
+    return UPDATED
+
+
+def _scheduled_row(row_id: str, before: Optional[dict], after: Optional[dict], purged: set) -> dict:
+    row = after if after is not None else before
+    change = _change(before, after)
+    item = {
+        "id": row_id,
+        "change": PURGED if change == REMOVED and row_id in purged else change,
+        "date": row.get("date", ""),
+        "meal_time": row.get("meal_time", ""),
+        "library_id": row.get("library_id", ""),
+    }
+    if change == UPDATED and any(before.get(k) != after.get(k) for k in _SLOT):
+        item["previous"] = {k: before.get(k, "") for k in _SLOT}
+    return item
+
+
+def _library_row(row_id: str, before: Optional[dict], after: Optional[dict]) -> dict:
+    row = after if after is not None else before
+    return {"id": row_id, "change": _change(before, after), "name": row.get("name", "")}
+
+
+def _rule_row(row_id: str, before: Optional[dict], after: Optional[dict]) -> dict:
+    row = after if after is not None else before
+    return {"id": row_id, "change": _change(before, after), "library_id": row.get("library_id", "")}
+
+
+def updated_event_data(
+    entry_id: str,
+    operation: str,
+    revision: str,
+    changes: Optional[ChangeSet] = None,
+    settings: bool = False,
+) -> dict:
+    """Data for one ``meal_planner_updated`` event."""
+    truncated = False
+
+    def rows(kind: str, describe) -> list:
+        nonlocal truncated
+        table = getattr(changes, kind) if changes else {}
+        if len(table) > MAX_EVENT_ROWS:
+            truncated = True
+        return [
+            describe(row_id, before, after)
+            for row_id, (before, after) in itertools.islice(table.items(), MAX_EVENT_ROWS)
+        ]
+
+    purged = changes.purged if changes else set()
+    return {
+        "entry_id": entry_id,
+        "operation": operation,
+        "revision": revision,
+        SCHEDULED: rows(SCHEDULED, lambda i, b, a: _scheduled_row(i, b, a, purged)),
+        LIBRARY: rows(LIBRARY, _library_row),
+        RULES: rows(RULES, _rule_row),
+        "settings": settings,
+        "truncated": truncated,
+    }
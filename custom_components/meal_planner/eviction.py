@@ -0,0 +1,177 @@
+"""Least-recently-used eviction for a full meal library.
+
+When the library is at ``MAX_LIBRARY_SIZE``, adding a meal evicts one entry.
+Only entries that nothing points at may go: no scheduled row, recurring
+rule or week template references them, and they are not on the potential
+list. Among those,
+the least recently used goes first.
+
+``LibraryLRU`` keeps a reference count and a last-used stamp per entry and
+follows every ``ChangeSet``, like the date index and statistics. Evictable
+entries sit in a min-heap ordered by stamp. Entries that were used again,
+became referenced or were removed stay in the heap as stale items and are
+skipped when they surface, so finding a candidate is O(log n) amortized
+instead of a scan of the library. The evicted entry is swapped with the
+last one and popped, found through a cached id → position map that is
+checked on every lookup and rebuilt only when the library list changed
+under it; the panel and sensors sort the library by name, so its order does
+not matter.
+
+Stamps live in memory only. At startup they are seeded from the meal
+statistics (the last date an entry was scheduled, capped at today); entries
+never scheduled rank oldest, in library order.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from datetime import datetime
+from typing import Optional
+
+from .changes import ChangeSet, LIBRARY, RULES, SCHEDULED, TEMPLATES
+from .stats import MealStats
+from .templates import library_ids
+
+
+class LibraryLRU:
+    """Evictable library entries, least recently used first."""
+
+    def __init__(self, data: dict, stats: MealStats) -> None:
+        self._seq = itertools.count()
+        # library_id → index in data["library"]; may be stale, checked on use
+        self._positions: dict[str, int] = {}
+        self.rebuild(data, stats)
+
+    def rebuild(self, data: dict, stats: MealStats) -> None:
+        now = time.time()
+        self._refs: dict[str, int] = {}
+        self._potential: dict[str, bool] = {}
+        # library_id → (last used, tie-breaker); heap items carry the same pair
+        self._stamps: dict[str, tuple[float, int]] = {}
+        for kind in (SCHEDULED, RULES):
+            for row in data.get(kind, []):
+                self._ref(row.get("library_id"), 1)
+        for template in data.get("templates", []):
+            for library_id in library_ids(template):
+                self._ref(library_id, 1)
+        for lib in data.get("library", []):
+            library_id = lib["id"]
+            entry = stats.get(library_id)
+            used = 0.0
+            if entry and entry.get("last_date"):
+                try:
+                    used = min(datetime.fromisoformat(entry["last_date"]).timestamp(), now)
+                except ValueError:
+                    pass
+            self._potential[library_id] = bool(lib.get("potential", False))
+            self._stamps[library_id] = (used, next(self._seq))
+        self._heap: list[tuple[float, int, str]] = [
+            (*stamp, library_id) for library_id, stamp in self._stamps.items() if self._evictable(library_id)
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    def _ref(self, library_id: Optional[str], delta: int) -> None:
+        if not library_id:
+            return
+        count = self._refs.get(library_id, 0) + delta
+        if count > 0:
+            self._refs[library_id] = count
+        else:
+            self._refs.pop(library_id, None)
+
+    def _evictable(self, library_id: str) -> bool:
+        return (
+            library_id in self._stamps
+            and library_id not in self._refs
+            and not self._potential.get(library_id, False)
+        )
+
+    def _push(self, library_id: str) -> None:
+        if self._evictable(library_id):
+            heapq.heappush(self._heap, (*self._stamps[library_id], library_id))
+
+    def _compact(self) -> None:
+        """Drop stale heap items once they outnumber the live entries."""
+        if len(self._heap) > 2 * len(self._stamps) + 64:
+            self._heap = [item for item in self._heap if self._is_current(item)]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, item: tuple[float, int, str]) -> bool:
+        used, seq, library_id = item
+        return self._stamps.get(library_id) == (used, seq) and self._evictable(library_id)
+
+    def apply(self, changes: ChangeSet) -> None:
+        """Follow references, potential flags and uses in ``changes``."""
+        now = time.time()
+        affected = set()
+        for kind in (SCHEDULED, RULES):
+            for before, after in getattr(changes, kind).values():
+                if before is not None:
+                    self._ref(before.get("library_id"), -1)
+                    affected.add(before.get("library_id"))
+                if after is not None:
+                    library_id = after.get("library_id")
+                    self._ref(library_id, 1)
+                    # Scheduling a meal (or editing its row) counts as using it
+                    if library_id in self._stamps:
+                        self._stamps[library_id] = (now, next(self._seq))
+                    affected.add(library_id)
+        for before, after in changes.templates.values():
+            if before is not None:
+                for library_id in library_ids(before):
+                    self._ref(library_id, -1)
+                    affected.add(library_id)
+            if after is not None:
+                for library_id in library_ids(after):
+                    self._ref(library_id, 1)
+        for library_id, (before, after) in changes.library.items():
+            if after is None:
+                self._stamps.pop(library_id, None)
+                self._potential.pop(library_id, None)
+                continue
+            self._potential[library_id] = bool(after.get("potential", False))
+            self._stamps[library_id] = (now, next(self._seq))
+            affected.add(library_id)
+        for library_id in affected:
+            if library_id:
+                self._push(library_id)
+        self._compact()
+
+    def peek_candidate(self) -> Optional[str]:
+        """The least recently used evictable entry, left in the heap; None if every entry is in use."""
+        while self._heap:
+            if self._is_current(self._heap[0]):
+                return self._heap[0][2]
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_candidate(self) -> Optional[str]:
+        """The least recently used evictable entry, or None if every entry is in use.
+
+        The entry is taken out of the heap; the caller removes it from the
+        library (``take``) and records that in the operation's ``ChangeSet``.
+        """
+        library_id = self.peek_candidate()
+        if library_id is not None:
+            heapq.heappop(self._heap)
+        return library_id
+
+    def take(self, library: list[dict], library_id: str) -> Optional[dict]:
+        """Remove the entry ``library_id`` from ``library`` in O(1); the last entry takes its place."""
+        i = self._positions.get(library_id)
+        if i is None or i >= len(library) or library[i].get("id") != library_id:
+            self._positions = {lib.get("id"): j for j, lib in enumerate(library)}
+            i = self._positions.get(library_id)
+            if i is None:
+                return None
+        entry = library[i]
+        last = library.pop()
+        del self._positions[library_id]
+        if i < len(library):
+            library[i] = last
+            self._positions[last.get("id")] = i
+        return entry
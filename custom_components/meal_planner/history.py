@@ -0,0 +1,158 @@
+"""Bounded undo/redo for Meal Planner edits.
+
+Every user operation already describes itself as a ``ChangeSet`` of
+``[before, after]`` row pairs. ``UndoHistory`` keeps a copy of just those rows
+per operation, so an entry costs memory in proportion to what the operation
+changed, not to the size of the library. Undo writes the ``before`` side back
+into ``data`` (re-inserting deleted rows, removing inserted ones); redo writes
+the ``after`` side. Both produce a new ``ChangeSet`` so statistics, the date
+index and the shopping list follow along like for any other edit.
+
+The history lives in memory only and is bounded twice: by entry count (a ring
+buffer) and by an estimate of the bytes held, evicting the oldest entries first.
+Rows removed by retention or a size cap (``ChangeSet.purged``) are not recorded.
+"""
+from __future__ import annotations
+
+import copy
+import json
+from collections import deque
+from typing import Optional
+
+from .changes import ChangeSet, LIBRARY, RULES, SCHEDULED, TEMPLATES
+
+UNDO = "undo"
+REDO = "redo"
+
+# Restore order: library rows before the scheduled rows, rules and templates that point at them
+_KINDS = (LIBRARY, RULES, TEMPLATES, SCHEDULED)
+
+
+def _row_size(row: Optional[dict]) -> int:
+    if row is None:
+        return 0
+    return len(json.dumps(row, ensure_ascii=False, default=str))
+
+
+class _Entry:
+    """Copies of the rows one operation changed."""
+
+    __slots__ = ("op", "rows", "size")
+
+    def __init__(self, op: str, rows: dict[str, dict[str, tuple]]) -> None:
+        self.op = op
+        self.rows = rows
+        self.size = sum(
+            _row_size(before) + _row_size(after)
+            for table in rows.values()
+            for before, after in table.values()
+        )
+
+
+class UndoHistory:
+    """Ring buffer of per-operation row deltas with a redo stack."""
+
+    def __init__(self, max_depth: int, max_bytes: int) -> None:
+        self.max_depth = max(0, max_depth)
+        self.max_bytes = max(0, max_bytes)
+        self._undo: deque[_Entry] = deque()
+        self._redo: list[_Entry] = []
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def status(self) -> dict:
+        return {
+            "undo": len(self._undo),
+            "redo": len(self._redo),
+            "undo_op": self._undo[-1].op if self._undo else None,
+            "redo_op": self._redo[-1].op if self._redo else None,
+            "bytes": self._bytes,
+        }
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+
+    def record(self, changes: ChangeSet) -> None:
+        """Remember ``changes`` (a user edit) so it can be undone. Clears redo."""
+        if not self.max_depth or changes.op in (UNDO, REDO):
+            return
+        rows = {}
+        for kind in _KINDS:
+            table = {
+                row_id: (copy.deepcopy(before), copy.deepcopy(after))
+                for row_id, (before, after) in getattr(changes, kind).items()
+                if row_id not in changes.purged
+            }
+            if table:
+                rows[kind] = table
+        if not rows:
+            return
+        entry = _Entry(changes.op, rows)
+        self._redo.clear()
+        if entry.size > self.max_bytes:
+            # Too large to ever fit: older entries would no longer undo cleanly
+            # past this edit, so the history starts over
+            self.clear()
+            return
+        self._undo.append(entry)
+        self._bytes += entry.size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._undo and (len(self._undo) > self.max_depth or self._bytes > self.max_bytes):
+            self._bytes -= self._undo.popleft().size
+
+    def undo(self, data: dict) -> Optional[tuple[str, ChangeSet]]:
+        """Revert the latest edit in ``data``. Returns ``(op, changes)``, or None if empty."""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._bytes -= entry.size
+        self._redo.append(entry)
+        return entry.op, _restore(data, entry, UNDO, side=0)
+
+    def redo(self, data: dict) -> Optional[tuple[str, ChangeSet]]:
+        """Re-apply the latest undone edit. Returns ``(op, changes)``, or None if empty."""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        self._bytes += entry.size
+        self._evict()
+        return entry.op, _restore(data, entry, REDO, side=1)
+
+
+def _restore(data: dict, entry: _Entry, op: str, side: int) -> ChangeSet:
+    """Bring every row in ``entry`` to its ``before`` (side 0) or ``after`` (side 1) state."""
+    changes = ChangeSet(op)
+    for kind in _KINDS:
+        table = entry.rows.get(kind)
+        if not table:
+            continue
+        rows = data.setdefault(kind, [])
+        positions = {row.get("id"): i for i, row in enumerate(rows)}
+        removed = set()
+        for row_id, pair in table.items():
+            target = pair[side]
+            i = positions.get(row_id)
+            if i is None:
+                if target is not None:
+                    row = copy.deepcopy(target)
+                    rows.append(row)
+                    changes.added(kind, row)
+            elif target is None:
+                changes.removed(kind, rows[i])
+                removed.add(row_id)
+            else:
+                row = rows[i]
+                changes.touched(kind, row)
+                # Update in place: the index and sensors hold the live row
+                row.clear()
+                row.update(copy.deepcopy(target))
+        if removed:
+            data[kind] = [row for row in rows if row.get("id") not in removed]
+    return changes
@@ -0,0 +1,69 @@
+"""Date index over scheduled rows for range queries.
+
+Keeps the distinct scheduled dates in a sorted list (ISO strings sort like
+dates) and the rows of each date in a bucket. A range query is two bisects plus
+the rows it returns, so a calendar asking for several months does not scan
+``data["scheduled"]``. The index follows mutations through the same
+``ChangeSet`` that drives the meal statistics.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Iterable, Iterator
+
+from .changes import ChangeSet
+
+
+class DateIndex:
+    """Scheduled rows bucketed by date, with sorted date keys."""
+
+    def __init__(self, scheduled: Iterable[dict] = ()) -> None:
+        self._dates: list[str] = []
+        self._buckets: dict[str, dict[str, dict]] = {}
+        self.rebuild(scheduled)
+
+    def rebuild(self, scheduled: Iterable[dict]) -> None:
+        self._buckets = {}
+        for row in scheduled:
+            date_str = (row.get("date") or "").strip()
+            if date_str:
+                self._buckets.setdefault(date_str, {})[row["id"]] = row
+        self._dates = sorted(self._buckets)
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def _add(self, row: dict) -> None:
+        date_str = (row.get("date") or "").strip()
+        if not date_str:
+            return
+        bucket = self._buckets.get(date_str)
+        if bucket is None:
+            bucket = self._buckets[date_str] = {}
+            insort(self._dates, date_str)
+        bucket[row["id"]] = row
+
+    def _remove(self, row: dict) -> None:
+        date_str = (row.get("date") or "").strip()
+        bucket = self._buckets.get(date_str)
+        if bucket is None or bucket.pop(row["id"], None) is None:
+            return
+        if not bucket:
+            del self._buckets[date_str]
+            del self._dates[bisect_left(self._dates, date_str)]
+
+    def apply(self, changes: ChangeSet) -> None:
+        """Move the rows in ``changes`` to their new dates."""
+        for before, after in changes.scheduled.values():
+            if before is not None:
+                self._remove(before)
+            if after is not None:
+                self._add(after)
+
+    def range(self, start: date, end: date) -> Iterator[dict]:
+        """Rows dated within ``[start, end]`` (inclusive), in date order."""
+        lo = bisect_left(self._dates, start.isoformat())
+        hi = bisect_right(self._dates, end.isoformat())
+        for date_str in self._dates[lo:hi]:
+            yield from self._buckets[date_str].values()
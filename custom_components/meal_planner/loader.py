@@ -0,0 +1,134 @@
+"""Incremental loading of the row files (library, scheduled, rules, templates).
+
+``json.load`` reads a whole file into one string and then parses it, so at
+startup the text and the parsed rows are in memory together. ``load_records``
+reads the file in fixed-size chunks and decodes one array element at a time,
+so besides the rows being built only one chunk and one record are held. Each
+record goes through ``normalize_record`` as it is decoded: anything that is
+not an object is dropped, a missing id is filled in, and keys and the values
+that repeat across rows (library ids, meal times, dates) are interned so every
+row shares one copy of them.
+
+The files keep their format (an indented JSON array), so they stay readable
+and older versions of the integration can still load them.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sys
+import uuid
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Values that repeat across many rows
+_SHARED_VALUES = frozenset(("library_id", "meal_time", "date", "frequency", "start_date", "end_date"))
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def normalize_record(record) -> Optional[dict]:
+    """A row with interned keys and shared values and an ``id``; None to drop it."""
+    if not isinstance(record, dict):
+        return None
+    intern = sys.intern
+    row = {
+        intern(key): intern(value) if key in _SHARED_VALUES and isinstance(value, str) else value
+        for key, value in record.items()
+    }
+    if not row.get("id"):
+        row["id"] = uuid.uuid4().hex
+    return row
+
+
+def iter_json_array(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """Yield the elements of the JSON array in ``path`` one by one. Does blocking I/O.
+
+    Raises ``ValueError`` (``json.JSONDecodeError``) on malformed JSON or when
+    the top level is not an array.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def more() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace() -> None:
+            nonlocal pos
+            while True:
+                pos = _WHITESPACE.match(buf, pos).end()
+                if pos < len(buf) or not more():
+                    return
+
+        def expect(chars: str, what: str) -> str:
+            skip_whitespace()
+            if pos >= len(buf) or buf[pos] not in chars:
+                raise json.JSONDecodeError(f"Expecting {what}", buf, pos)
+            return buf[pos]
+
+        def end_of_array() -> None:
+            nonlocal pos
+            pos += 1
+            skip_whitespace()
+            if pos < len(buf):
+                raise json.JSONDecodeError("Extra data", buf, pos)
+
+        expect("[", "'['")
+        pos += 1
+        skip_whitespace()
+        if buf[pos:pos + 1] == "]":
+            end_of_array()
+            return
+        while True:
+            skip_whitespace()
+            while True:
+                try:
+                    value, end = _DECODER.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # Record continues in the next chunk
+                    if more():
+                        continue
+                    raise
+                # Only a value followed by its separator is complete: a number cut
+                # off at the end of the buffer also decodes, but to a prefix
+                after = _WHITESPACE.match(buf, end).end()
+                if (after < len(buf) and buf[after] in ",]") or not more():
+                    break
+            pos = end
+            yield value
+            if expect(",]", "',' or ']'") == "]":
+                end_of_array()
+                return
+            pos += 1
+
+
+def load_records(path: Path, normalize: Callable = normalize_record) -> list:
+    """Rows of the JSON array in ``path``, each passed through ``normalize``. Does blocking I/O."""
+    rows = []
+    dropped = 0
+    for record in iter_json_array(path):
+        row = normalize(record)
+        if row is None:
+            dropped += 1
+        else:
+            rows.append(row)
+    if dropped:
+        _LOGGER.warning("Skipped %d malformed records in %s", dropped, path.name)
+    return rows
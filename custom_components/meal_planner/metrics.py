@@ -0,0 +1,153 @@
+"""Live performance counters for Meal Planner.
+
+Every plan keeps one ``PerfCounters``. Services, websocket commands, HTTP
+requests, file saves and sensor updates record how long they took under a
+``(category, name)`` key. Each key holds a call count, an error count, the
+total and maximum duration and a fixed-bucket latency histogram, so the
+counters use constant memory however long Home Assistant runs. They are read
+by the diagnostics download and the optional debug sensor, and start over on
+every restart.
+"""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+SERVICE = "service"
+WEBSOCKET = "websocket"
+HTTP = "http"
+SAVE = "save"
+SENSOR = "sensor"
+
+# Upper bounds (ms) of the histogram buckets; one more bucket holds the slower calls
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _Timing:
+    """Counters and latency histogram for one operation."""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms: float, error: bool) -> None:
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+    def as_dict(self) -> dict:
+        result = self.summary()
+        histogram = {f"<={bound}ms": n for bound, n in zip(BUCKETS_MS, self.buckets)}
+        histogram[f">{BUCKETS_MS[-1]}ms"] = self.buckets[-1]
+        result["histogram"] = histogram
+        return result
+
+
+class PerfCounters:
+    """Per-operation timings of one plan, plus startup and retention purge figures."""
+
+    def __init__(self) -> None:
+        self._timings: dict[tuple[str, str], _Timing] = {}
+        self.startup_ms: Optional[float] = None
+        self.purge_runs = 0
+        self.purged_rows = 0
+        self.last_purge: Optional[str] = None
+
+    def record(self, category: str, name: str, ms: float, error: bool = False) -> None:
+        timing = self._timings.get((category, name))
+        if timing is None:
+            timing = self._timings[(category, name)] = _Timing()
+        timing.add(ms, error)
+
+    @contextmanager
+    def timed(self, category: str, name: str) -> Iterator[None]:
+        """Time the ``with`` body; an exception counts as an error and propagates."""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.record(category, name, (time.perf_counter() - start) * 1000, error)
+
+    def record_purge(self, rows: int) -> None:
+        self.purge_runs += 1
+        self.purged_rows += rows
+        self.last_purge = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @property
+    def calls(self) -> int:
+        return sum(t.count for t in self._timings.values())
+
+    def _grouped(self, full: bool) -> dict:
+        grouped: dict[str, dict] = {}
+        for (category, name), timing in sorted(self._timings.items()):
+            grouped.setdefault(category, {})[name] = timing.as_dict() if full else timing.summary()
+        return grouped
+
+    def summary(self) -> dict:
+        """Counts and average/maximum latency per operation (no histograms)."""
+        return {
+            "startup_ms": self.startup_ms,
+            "purge_runs": self.purge_runs,
+            "purged_rows": self.purged_rows,
+            "last_purge": self.last_purge,
+            "operations": self._grouped(full=False),
+        }
+
+    def as_dict(self) -> dict:
+        result = self.summary()
+        result["operations"] = self._grouped(full=True)
+        return result
+
+
+def dataset_sizes(plan: dict) -> dict:
+    """Row counts of a plan's data and of the structures derived from it."""
+    data = plan["data"]
+    history = plan["history"].status()
+    return {
+        "library": len(data.get("library", [])),
+        "scheduled": len(data.get("scheduled", [])),
+        "rules": len(data.get("rules", [])),
+        "templates": len(data.get("templates", [])),
+        "archived_scheduled": plan["archive"].rows,
+        "indexed_rows": len(plan["index"]),
+        "stats_entries": len(plan["stats"]),
+        "undo_entries": history["undo"],
+        "redo_entries": history["redo"],
+        "undo_bytes": history["bytes"],
+    }
+
+
+def file_sizes(paths: dict[str, Path]) -> dict[str, Optional[int]]:
+    """Size in bytes of each storage file (None if missing). Does blocking I/O."""
+    sizes = {}
+    for name, path in paths.items():
+        try:
+            sizes[name] = path.stat().st_size
+        except OSError:
+            sizes[name] = None
+    return sizes
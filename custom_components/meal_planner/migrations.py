@@ -0,0 +1,124 @@
+"""Versioned data migrations.
+
+``settings.json`` carries a ``schema_version``. Each migration step is
+registered with the version it brings the data to, and ``migrate`` runs only
+the steps newer than the stored version, then stamps the current one. Data
+that is already up to date costs one integer comparison at startup instead of
+a pass over every library and scheduled row.
+
+To change the stored shape: add a step with the next version number. Steps
+must be idempotent, since data without a stamp (first run after upgrading)
+goes through all of them.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+# version → (description, step); a step returns True if it changed anything
+MIGRATIONS: dict[int, tuple[str, Callable[[dict], bool]]] = {}
+
+
+def migration(version: int, description: str):
+    """Register ``func`` as the step that brings data to ``version``."""
+    def register(func: Callable[[dict], bool]) -> Callable[[dict], bool]:
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS[version] = (description, func)
+        return func
+    return register
+
+
+@migration(1, "ensure ids and required fields")
+def _normalize_rows(data: dict) -> bool:
+    changed = False
+    defaults = {
+        "library": (("potential", False), ("videos", None)),
+        "scheduled": (("library_id", ""), ("meal_time", "Dinner"), ("date", "")),
+    }
+    for kind, fields in defaults.items():
+        for m in data.get(kind, []):
+            if "id" not in m:
+                m["id"] = uuid.uuid4().hex
+                changed = True
+            for key, default in fields:
+                if key not in m:
+                    m[key] = [] if default is None else default
+                    changed = True
+    return changed
+
+
+@migration(2, "move the potential flag from scheduled entries to the library")
+def _potential_to_library(data: dict) -> bool:
+    """Move the potential flag from scheduled entries into library entries.
+
+    - Scheduled entries with potential=True OR with no date are removed from
+      scheduled; their library entry gets potential=True.
+    - Any leftover 'potential' key on normal scheduled entries is stripped.
+    """
+    changed = False
+    library_map = {lib.get("id"): lib for lib in data.get("library", [])}
+
+    keep_scheduled = []
+    for m in data.get("scheduled", []):
+        is_potential = m.get("potential", False)
+        has_no_date = not (m.get("date") or "").strip()
+
+        if is_potential or has_no_date:
+            lib_entry = library_map.get(m.get("library_id"))
+            if lib_entry is not None:
+                lib_entry["potential"] = True
+            changed = True
+        else:
+            if "potential" in m:
+                del m["potential"]
+                changed = True
+            keep_scheduled.append(m)
+
+    data["scheduled"] = keep_scheduled
+    return changed
+
+
+@migration(3, "add ingredient lists to library entries")
+def _library_ingredients(data: dict) -> bool:
+    changed = False
+    for m in data.get("library", []):
+        if "ingredients" not in m:
+            m["ingredients"] = []
+            changed = True
+    return changed
+
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def migrate(data: dict) -> int:
+    """Run the steps newer than the stored schema version and stamp the current one.
+
+    Returns the stored version; when it is below ``SCHEMA_VERSION`` the data
+    should be saved. Data written by a newer version of the integration is
+    left untouched.
+    """
+    settings = data.setdefault("settings", {})
+    try:
+        stored = int(settings.get(SCHEMA_VERSION_KEY, 0))
+    except (TypeError, ValueError):
+        stored = 0
+    if stored > SCHEMA_VERSION:
+        _LOGGER.warning(
+            "Meal Planner data has schema version %d, newer than this version supports (%d)",
+            stored, SCHEMA_VERSION,
+        )
+        return stored
+
+    for version in sorted(v for v in MIGRATIONS if v > stored):
+        description, step = MIGRATIONS[version]
+        if step(data):
+            _LOGGER.info("Migrated data to schema version %d: %s", version, description)
+    settings[SCHEMA_VERSION_KEY] = SCHEMA_VERSION
+    return stored
@@ -1,6 +1,162 @@
 // Meal Planner Panel App
 // Vanilla JavaScript with WebSocket integration
 
+// Windowed table: only the rows near the viewport are in the DOM.
+// Rows are keyed, so re-rendering with new data reuses existing <tr> elements
+// and only rewrites rows whose signature (serialized content) changed.
+class VirtualTable {
+  constructor(container, { colgroup, header, keyOf, signatureOf, renderRow, estimatedRowHeight = 56, overscan = 8 }) {
+    this.container = container;
+    this.keyOf = keyOf;
+    this.signatureOf = signatureOf;
+    this.renderRow = renderRow;
+    this.estimatedRowHeight = estimatedRowHeight;
+    this.overscan = overscan;
+    this.items = [];
+    this.rows = new Map();     // key -> { el, sig }
+    this.heights = new Map();  // key -> measured height (px), survives scrolling
+    this.framePending = false;
+
+    container.innerHTML = `<div class="table-container"><table>${colgroup}<thead><tr>${header}</tr></thead><tbody></tbody></table></div>`;
+    this.table = container.querySelector('table');
+    this.tbody = container.querySelector('tbody');
+    this.columnCount = (header.match(/<th/g) || []).length;
+    this.topSpacer = this.createSpacer();
+    this.bottomSpacer = this.createSpacer();
+    this.tbody.append(this.topSpacer, this.bottomSpacer);
+
+    this.onScroll = () => this.scheduleRender();
+    window.addEventListener('scroll', this.onScroll, { passive: true });
+    window.addEventListener('resize', this.onScroll, { passive: true });
+  }
+
+  createSpacer() {
+    const tr = document.createElement('tr');
+    tr.className = 'virtual-spacer';
+    tr.setAttribute('aria-hidden', 'true');
+    tr.innerHTML = `<td colspan="${this.columnCount}"></td>`;
+    return tr;
+  }
+
+  setSpacerHeight(spacer, height) {
+    spacer.style.display = height > 0 ? '' : 'none';
+    spacer.firstChild.style.height = `${height}px`;
+  }
+
+  destroy() {
+    window.removeEventListener('scroll', this.onScroll);
+    window.removeEventListener('resize', this.onScroll);
+  }
+
+  setItems(items) {
+    this.items = items;
+    const keys = new Set(items.map(this.keyOf));
+    for (const key of this.rows.keys()) {
+      if (!keys.has(key)) {
+        this.rows.get(key).el.remove();
+        this.rows.delete(key);
+        this.heights.delete(key);
+      }
+    }
+    this.render();
+  }
+
+  scheduleRender() {
+    if (this.framePending) return;
+    this.framePending = true;
+    requestAnimationFrame(() => {
+      this.framePending = false;
+      this.render();
+    });
+  }
+
+  averageHeight() {
+    if (this.heights.size === 0) return this.estimatedRowHeight;
+    let total = 0;
+    for (const h of this.heights.values()) total += h;
+    return total / this.heights.size;
+  }
+
+  render() {
+    // Hidden view (display: none) has no layout to measure against
+    if (!this.container.offsetParent) return;
+
+    const items = this.items;
+    const estimate = this.averageHeight();
+    const tbodyTop = this.tbody.getBoundingClientRect().top;
+    const viewTop = -tbodyTop - this.overscan * estimate;
+    const viewBottom = -tbodyTop + window.innerHeight + this.overscan * estimate;
+
+    // Walk cumulative heights to find the visible slice
+    let offset = 0;
+    let start = items.length;
+    let end = items.length;
+    let topHeight = 0;
+    for (let i = 0; i < items.length; i++) {
+      const h = this.heights.get(this.keyOf(items[i])) ?? estimate;
+      if (start === items.length && offset + h > viewTop) {
+        start = i;
+        topHeight = offset;
+      }
+      if (offset > viewBottom) {
+        end = i;
+        break;
+      }
+      offset += h;
+    }
+    if (start === items.length) topHeight = offset;
+    let bottomHeight = 0;
+    for (let i = end; i < items.length; i++) {
+      bottomHeight += this.heights.get(this.keyOf(items[i])) ?? estimate;
+    }
+
+    // Detach rows that scrolled out of the window (kept for reuse)
+    const visibleKeys = new Set();
+    for (let i = start; i < end; i++) visibleKeys.add(this.keyOf(items[i]));
+    for (const [key, row] of this.rows) {
+      if (!visibleKeys.has(key) && row.el.parentNode) row.el.remove();
+    }
+
+    // Insert/patch visible rows in order between the spacers
+    let cursor = this.topSpacer;
+    for (let i = start; i < end; i++) {
+      const item = items[i];
+      const key = this.keyOf(item);
+      const sig = this.signatureOf(item);
+      let row = this.rows.get(key);
+      if (!row) {
+        row = { el: document.createElement('tr'), sig: null };
+        this.rows.set(key, row);
+      }
+      if (row.sig !== sig) {
+        const { className, html } = this.renderRow(item);
+        row.el.className = className || '';
+        row.el.innerHTML = html;
+        row.sig = sig;
+        this.heights.delete(key);
+      }
+      if (cursor.nextSibling !== row.el) {
+        this.tbody.insertBefore(row.el, cursor.nextSibling);
+      }
+      cursor = row.el;
+    }
+
+    this.setSpacerHeight(this.topSpacer, topHeight);
+    this.setSpacerHeight(this.bottomSpacer, bottomHeight);
+
+    // Measure what was just laid out so later frames use real heights
+    const gap = parseFloat(getComputedStyle(this.tbody).rowGap) || 0;
+    let remeasure = false;
+    for (let i = start; i < end; i++) {
+      const key = this.keyOf(items[i]);
+      const h = this.rows.get(key).el.offsetHeight + gap;
+      if (Math.abs((this.heights.get(key) ?? estimate) - h) > 1) remeasure = true;
+      this.heights.set(key, h);
+    }
+    if (remeasure) this.scheduleRender();
+  }
+}
+
 class MealPlannerApp {
   constructor() {
     this.hass = null;
@@ -12,6 +168,10 @@ class MealPlannerApp {
     this.currentView = 'dashboard';
     this.editingMeal = null;
     this.searchQuery = '';
+    this.tables = {};     // view key -> VirtualTable
+    this.sortCache = {};
+    // Which meal plan this panel edits (one sidebar panel per config entry)
+    this.entryId = new URLSearchParams(location.search).get('entry_id');
 
     this.init();
   }
@@ -97,6 +257,9 @@ class MealPlannerApp {
   }
 
   async callService(type, data = {}) {
+    if (this.entryId) {
+      data = { ...data, entry_id: this.entryId };
+    }
     console.log('[Meal Planner] callService called with:', { type, data });
 
     // Use Home Assistant service API directly (more reliable than WebSocket)
@@ -111,7 +274,9 @@ class MealPlannerApp {
         'meal_planner/bulk': 'bulk',
         'meal_planner/update_settings': 'update_settings',
         'meal_planner/update_library': 'update_library',
-        'meal_planner/delete_library': 'delete_library'
+        'meal_planner/delete_library': 'delete_library',
+        'meal_planner/undo': 'undo',
+        'meal_planner/redo': 'redo'
       };
 
       const serviceName = serviceMap[type];
@@ -133,7 +298,7 @@ class MealPlannerApp {
     if (this.hass && this.hass.callWS && type === 'meal_planner/get') {
       console.log('[Meal Planner] Using WebSocket API for GET');
       try {
-        const result = await this.hass.callWS({ type });
+        const result = await this.hass.callWS({ type, ...data });
         console.log('[Meal Planner] WebSocket result:', result);
         return result;
       } catch (error) {
@@ -179,27 +344,87 @@ class MealPlannerApp {
         this.data = response;
         console.log('[Meal Planner] Data loaded:', this.data);
       }
+      this.updateHistoryButtons();
     } catch (error) {
       console.error('[Meal Planner] Failed to load data:', error);
     }
   }
 
-  async saveData() {
-    if (!this.hass) {
-      console.warn('[Meal Planner] No HASS connection - cannot save');
-      return false;
+  // Edits that send the version the panel last loaded; returns the command's result
+  async callWithVersion(type, data) {
+    if (this.entryId) {
+      data = { ...data, entry_id: this.entryId };
     }
+    return await this.hass.callWS({ type, ...data });
+  }
 
-    try {
-      console.log('[Meal Planner] Saving data to backend...');
+  // Another device changed the row since it was loaded (a "conflict" error):
+  // show theirs, from the error's `current`, instead of overwriting it
+  async handleConflict(error, kind) {
+    console.warn('[Meal Planner] Edit refused, row changed elsewhere:', error.current);
+    await this.showAlert('This meal was changed on another device. Showing the latest version — please make your change again.');
+    const current = error.current;
+    const applied = current && (kind === 'library' ? this.applyLibraryRow(current) : this.applyMealRow(current));
+    if (!applied) {
+      await this.loadData();
+    }
+    this.renderCurrentView();
+  }
 
-      await this.callService('meal_planner/bulk', { data: this.data });
+  // Put a scheduled meal as the backend now has it into the loaded data.
+  // Returns false when the panel does not hold that row (a recurring
+  // occurrence that was detached under a new id); the caller then reloads.
+  applyMealRow(meal) {
+    const scheduled = this.data.scheduled || [];
+    const index = scheduled.findIndex(m => m.id === meal.id);
+    if (index < 0) return false;
+    this.data.scheduled = scheduled.map((m, i) => (i === index ? meal : m));
+    return true;
+  }
 
-      console.log('[Meal Planner] Data saved successfully');
-      return true;
-    } catch (error) {
-      console.error('[Meal Planner] Failed to save data:', error);
-      return false;
+  // Put a library entry as the backend now has it into the loaded data, and
+  // carry its fields over to the scheduled meals and recurring meals showing
+  // it (library names are unique, so meals match on the entry's previous
+  // name). Returns false when the panel does not hold the entry or the new
+  // name clashes with another one; the caller then reloads.
+  applyLibraryRow(entry) {
+    const library = this.data.library || [];
+    const index = library.findIndex(lib => lib.id === entry.id);
+    if (index < 0) return false;
+    const newName = entry.name.toLowerCase();
+    if (library.some(lib => lib.id !== entry.id && lib.name.toLowerCase() === newName)) return false;
+    const oldName = library[index].name.toLowerCase();
+    this.data.library = library.map((lib, i) => (i === index ? entry : lib));
+    this.data.scheduled = (this.data.scheduled || []).map(meal => {
+      if (meal.name.toLowerCase() !== oldName) return meal;
+      const updated = {
+        ...meal,
+        name: entry.name,
+        recipe_url: entry.recipe_url,
+        videos: entry.videos,
+        notes: entry.notes,
+        ingredients: entry.ingredients
+      };
+      // Occurrences of recurring meals have no versions
+      if (!meal.rule_id) updated.library_version = entry.version;
+      return updated;
+    });
+    this.data.rules = (this.data.rules || []).map(rule =>
+      (rule.library_id === entry.id ? { ...rule, name: entry.name } : rule));
+    return true;
+  }
+
+  // Apply a successful update's rows and undo status in place of a reload
+  async applyEditResult(result) {
+    let applied = Boolean(result);
+    if (applied && result.library) applied = this.applyLibraryRow(result.library);
+    if (applied && result.meal) applied = this.applyMealRow(result.meal);
+    if (applied && result.history) {
+      this.data.history = result.history;
+      this.updateHistoryButtons();
+    }
+    if (!applied) {
+      await this.loadData();
     }
   }
 
@@ -222,6 +447,31 @@ class MealPlannerApp {
     }
   }
 
+  updateHistoryButtons() {
+    const history = this.data.history || { undo: 0, redo: 0 };
+    const label = (op) => (op || '').replace(/_/g, ' ');
+    document.querySelectorAll('.undo-btn').forEach(btn => {
+      btn.disabled = !history.undo;
+      btn.title = history.undo ? `Undo ${label(history.undo_op)}` : 'Nothing to undo';
+    });
+    document.querySelectorAll('.redo-btn').forEach(btn => {
+      btn.disabled = !history.redo;
+      btn.title = history.redo ? `Redo ${label(history.redo_op)}` : 'Nothing to redo';
+    });
+  }
+
+  async stepHistory(direction) {
+    if (!this.hass) return;
+    try {
+      await this.callService(`meal_planner/${direction}`);
+      await this.loadData();
+      this.renderCurrentView();
+    } catch (error) {
+      console.error(`[Meal Planner] ${direction} failed:`, error);
+      await this.showAlert(`Failed to ${direction}. Please try again.`);
+    }
+  }
+
   // Modal helpers
   showAlert(message) {
     return new Promise((resolve) => {
@@ -330,18 +580,25 @@ class MealPlannerApp {
     }
   }
 
+  // Returns true, false on failure, or 'conflict' when the entry changed elsewhere
   async updateLibraryEntry(libraryId, fields) {
     try {
-      await this.callService('meal_planner/update_library', { library_id: libraryId, ...fields });
-      await this.loadData();
+      const result = await this.callWithVersion('meal_planner/update_library', { library_id: libraryId, ...fields });
+      if (!result || !result.success) return false;
+      await this.applyEditResult(result);
       this.renderCurrentView();
       return true;
     } catch (error) {
+      if (error && error.code === 'conflict') {
+        await this.handleConflict(error, 'library');
+        return 'conflict';
+      }
       console.error('[Meal Planner] Failed to update library entry:', error);
       return false;
     }
   }
 
+  // Returns true, false on failure, or 'conflict' when the meal changed elsewhere
   async updateMeal(mealId, newMeal) {
     if (!this.hass) {
       console.warn('[Meal Planner] No HASS connection - cannot update meal');
@@ -351,20 +608,24 @@ class MealPlannerApp {
     try {
       console.log('[Meal Planner] Updating meal:', { mealId, newMeal });
 
-      const result = await this.callService('meal_planner/update', {
+      const result = await this.callWithVersion('meal_planner/update', {
         row_id: mealId,
         ...newMeal
       });
 
       console.log('[Meal Planner] Update result:', result);
+      if (!result || !result.success) return false;
 
-      // Reload data
-      await this.loadData();
+      await this.applyEditResult(result);
       this.renderCurrentView();
 
       console.log('[Meal Planner] Meal updated successfully');
       return true;
     } catch (error) {
+      if (error && error.code === 'conflict') {
+        await this.handleConflict(error, 'meal');
+        return 'conflict';
+      }
       console.error('[Meal Planner] Failed to update meal:', error);
       console.error('[Meal Planner] Error details:', error.message, error.stack);
       return false;
@@ -399,6 +660,14 @@ class MealPlannerApp {
       libraryFilter.addEventListener('change', () => this.renderMealsLibrary());
     }
 
+    // Undo / redo buttons (one pair per view header)
+    document.querySelectorAll('.undo-btn').forEach(btn => {
+      btn.addEventListener('click', () => this.stepHistory('undo'));
+    });
+    document.querySelectorAll('.redo-btn').forEach(btn => {
+      btn.addEventListener('click', () => this.stepHistory('redo'));
+    });
+
     // Settings button
     const settingsBtn = document.getElementById('settings-btn');
     if (settingsBtn) {
@@ -514,7 +783,7 @@ class MealPlannerApp {
       if (target.classList.contains('toggle-potential-btn') || target.closest('.toggle-potential-btn')) {
         const btn = target.classList.contains('toggle-potential-btn') ? target : target.closest('.toggle-potential-btn');
         const libData = JSON.parse(btn.getAttribute('data-lib'));
-        this.togglePotential(libData.library_id, !libData.potential);
+        this.togglePotential(libData.library_id, !libData.potential, libData.version);
       }
 
       // Open recipe link (companion app compatible — window.top breaks out of iframe)
@@ -574,74 +843,110 @@ class MealPlannerApp {
     }
   }
 
+  // Show an empty-state message in place of a view's table
+  showEmptyState(viewKey, content, html) {
+    if (this.tables[viewKey]) {
+      this.tables[viewKey].destroy();
+      delete this.tables[viewKey];
+    }
+    content.innerHTML = html;
+  }
+
+  // Reuse the view's virtual table across renders so unchanged rows stay in the DOM
+  getTable(viewKey, content, options) {
+    if (!this.tables[viewKey]) {
+      this.tables[viewKey] = new VirtualTable(content, options);
+    }
+    return this.tables[viewKey];
+  }
+
+  // Sorted copies are cached per data object; loadData() swaps the object
+  sortedScheduled() {
+    const scheduled = this.data.scheduled || [];
+    if (this.sortCache.scheduledSource !== scheduled) {
+      // Sort ascending: past meals at top, upcoming meals below
+      this.sortCache.scheduled = scheduled
+        .filter(m => m.date && m.date.trim())
+        .sort((a, b) => (a.date < b.date ? -1 : a.date > b.date ? 1 : 0));
+      this.sortCache.scheduledSource = scheduled;
+    }
+    return this.sortCache.scheduled;
+  }
+
+  sortedLibrary() {
+    const library = this.data.library || [];
+    if (this.sortCache.librarySource !== library) {
+      this.sortCache.library = library
+        .map(meal => ({ meal, key: meal.name.toLowerCase() }))
+        .sort((a, b) => a.key.localeCompare(b.key))
+        .map(entry => entry.meal);
+      this.sortCache.librarySource = library;
+    }
+    return this.sortCache.library;
+  }
+
   renderDashboard() {
     const content = document.getElementById('dashboard-content');
-    const scheduled = this.data.scheduled || [];
 
     // Filter to meals with dates (not potential) within the keep window
     const daysToKeep = this.data.settings?.days_to_keep ?? 14;
     const cutoff = new Date();
     cutoff.setDate(cutoff.getDate() - daysToKeep);
-    cutoff.setHours(0, 0, 0, 0);
-
-    const scheduledMeals = scheduled.filter(m => {
-      if (!m.date || !m.date.trim()) return false;
-      return new Date(m.date + 'T00:00:00') >= cutoff;
-    });
+    const cutoffStr = `${cutoff.getFullYear()}-${String(cutoff.getMonth() + 1).padStart(2, '0')}-${String(cutoff.getDate()).padStart(2, '0')}`;
 
-    // Sort ascending: past meals at top, upcoming meals below
-    scheduledMeals.sort((a, b) => new Date(a.date) - new Date(b.date));
+    const scheduledMeals = this.sortedScheduled().filter(m => m.date >= cutoffStr);
 
     if (scheduledMeals.length === 0) {
-      content.innerHTML = `
+      this.showEmptyState('dashboard', content, `
         <div class="empty-state">
           <div class="empty-icon">📅</div>
           <div class="empty-text">No scheduled meals yet</div>
           <div class="empty-hint">Click "Add Meal" to schedule your first meal</div>
         </div>
-      `;
+      `);
       return;
     }
 
-    let html = '<div class="table-container"><table>';
-    html += '<colgroup><col style="width:14%"><col style="width:10%"><col style="width:33%"><col style="width:27%"><col style="width:16%"></colgroup>';
-    html += '<thead><tr>';
-    html += '<th>Date</th>';
-    html += '<th>Meal Type</th>';
-    html += '<th>Meal Name</th>';
-    html += '<th>Notes</th>';
-    html += '<th>Actions</th>';
-    html += '</tr></thead>';
-    html += '<tbody>';
-
-    scheduledMeals.forEach(meal => {
-      const mealData = JSON.stringify({
-        id: meal.id,
-        name: meal.name,
-        date: meal.date,
-        meal_time: meal.meal_time,
-        recipe_url: meal.recipe_url || '',
-        videos: meal.videos || [],
-        notes: meal.notes || ''
-      });
-      const hasVideos = meal.videos && meal.videos.length > 0;
-
-      html += '<tr>';
-      html += `<td data-label="Date">${this.formatDate(meal.date)}</td>`;
-      html += `<td data-label="Type"><span class="badge badge-secondary">${this.capitalize(meal.meal_time)}</span></td>`;
-      html += `<td data-label="Meal">${this.escapeHtml(meal.name)}</td>`;
-      html += `<td data-label="Notes">${meal.notes ? this.escapeHtml(meal.notes) : '-'}</td>`;
-      html += `<td class="actions-td"><div class="row-actions">
+    const table = this.getTable('dashboard', content, {
+      colgroup: '<colgroup><col style="width:14%"><col style="width:10%"><col style="width:33%"><col style="width:27%"><col style="width:16%"></colgroup>',
+      header: '<th>Date</th><th>Meal Type</th><th>Meal Name</th><th>Notes</th><th>Actions</th>',
+      keyOf: meal => meal.id,
+      signatureOf: meal => JSON.stringify(this.scheduledRowData(meal)),
+      renderRow: meal => this.renderScheduledRow(meal)
+    });
+    table.setItems(scheduledMeals);
+  }
+
+  scheduledRowData(meal) {
+    return {
+      id: meal.id,
+      name: meal.name,
+      date: meal.date,
+      meal_time: meal.meal_time,
+      recipe_url: meal.recipe_url || '',
+      videos: meal.videos || [],
+      notes: meal.notes || '',
+      version: meal.version,
+      library_version: meal.library_version
+    };
+  }
+
+  renderScheduledRow(meal) {
+    const mealData = JSON.stringify(this.scheduledRowData(meal));
+    const hasVideos = meal.videos && meal.videos.length > 0;
+
+    let html = '';
+    html += `<td data-label="Date">${this.formatDate(meal.date)}</td>`;
+    html += `<td data-label="Type"><span class="badge badge-secondary">${this.capitalize(meal.meal_time)}</span></td>`;
+    html += `<td data-label="Meal">${this.escapeHtml(meal.name)}</td>`;
+    html += `<td data-label="Notes">${meal.notes ? this.escapeHtml(meal.notes) : '-'}</td>`;
+    html += `<td class="actions-td"><div class="row-actions">
         <button class="${meal.recipe_url ? 'recipe-link btn-recipe' : 'btn-recipe-disabled'}" ${meal.recipe_url ? `data-url="${this.escapeHtml(meal.recipe_url)}"` : 'disabled'} title="${meal.recipe_url ? 'View Recipe' : 'No recipe'}">📖</button>
         <button class="${hasVideos ? 'video-list-btn btn-recipe' : 'btn-recipe-disabled'}" ${hasVideos ? `data-videos='${this.escapeHtml(JSON.stringify(meal.videos))}'` : 'disabled'} title="${hasVideos ? 'View Videos' : 'No videos'}">🎥</button>
         <button class="edit-meal-btn btn-edit" data-meal='${this.escapeHtml(mealData)}' title="Edit">✏️</button>
         <button class="delete-meal-btn btn-danger" data-meal='${this.escapeHtml(mealData)}' title="Delete">🗑️</button>
       </div></td>`;
-      html += '</tr>';
-    });
-
-    html += '</tbody></table></div>';
-    content.innerHTML = html;
+    return { className: '', html };
   }
 
   renderMealsLibrary() {
@@ -650,9 +955,7 @@ class MealPlannerApp {
     const filterValue = filterEl ? filterEl.value : 'all';
 
     // Read directly from library (includes all meals regardless of scheduled status)
-    let meals = (this.data.library || []).slice().sort((a, b) =>
-      a.name.toLowerCase().localeCompare(b.name.toLowerCase())
-    );
+    let meals = this.sortedLibrary();
 
     // Filter by search query
     if (this.searchQuery) {
@@ -671,68 +974,73 @@ class MealPlannerApp {
         ? `No meals found matching "${this.escapeHtml(this.searchQuery)}"`
         : 'No meals in library yet';
 
-      content.innerHTML = `
+      this.showEmptyState('meals', content, `
         <div class="empty-state">
           <div class="empty-icon">📚</div>
           <div class="empty-text">${message}</div>
           <div class="empty-hint">Add meals to build your library</div>
         </div>
-      `;
+      `);
       return;
     }
 
-    let html = '<div class="table-container"><table>';
-    html += '<colgroup><col style="width:5%"><col style="width:34%"><col style="width:48%"><col style="width:13%"></colgroup>';
-    html += '<thead><tr>';
-    html += '<th></th>';
-    html += '<th>Meal Name</th>';
-    html += '<th>Notes</th>';
-    html += '<th>Actions</th>';
-    html += '</tr></thead>';
-    html += '<tbody>';
-
-    meals.forEach(meal => {
-      const libData = JSON.stringify({
-        library_id: meal.id,
-        name: meal.name,
-        recipe_url: meal.recipe_url || '',
-        videos: meal.videos || [],
-        notes: meal.notes || '',
-        potential: meal.potential || false
-      });
-      const isPotential = meal.potential === true;
-      const rowClass = isPotential ? ' class="potential-row"' : '';
-      const starClass = isPotential ? 'btn-potential btn-potential-active' : 'btn-potential';
-      const starTitle = isPotential ? 'Remove Potential Meal' : 'Mark as a Potential Meal';
-      const starIcon = isPotential ? '⭐' : '☆';
-      const hasVideos = meal.videos && meal.videos.length > 0;
-
-      html += `<tr${rowClass}>`;
-      html += `<td class="star-td"><button class="${starClass} toggle-potential-btn" data-lib='${this.escapeHtml(libData)}' title="${starTitle}">${starIcon}</button></td>`;
-      html += `<td data-label="Meal">${this.escapeHtml(meal.name)}</td>`;
-      html += `<td data-label="Notes">${meal.notes ? this.escapeHtml(meal.notes) : '-'}</td>`;
-      html += `<td class="actions-td"><div class="row-actions">
+    const table = this.getTable('meals', content, {
+      colgroup: '<colgroup><col style="width:5%"><col style="width:34%"><col style="width:48%"><col style="width:13%"></colgroup>',
+      header: '<th></th><th>Meal Name</th><th>Notes</th><th>Actions</th>',
+      keyOf: meal => meal.id,
+      signatureOf: meal => JSON.stringify(this.libraryRowData(meal)),
+      renderRow: meal => this.renderLibraryRow(meal)
+    });
+    table.setItems(meals);
+  }
+
+  libraryRowData(meal) {
+    return {
+      library_id: meal.id,
+      name: meal.name,
+      recipe_url: meal.recipe_url || '',
+      videos: meal.videos || [],
+      notes: meal.notes || '',
+      potential: meal.potential || false,
+      version: meal.version
+    };
+  }
+
+  renderLibraryRow(meal) {
+    const libData = JSON.stringify(this.libraryRowData(meal));
+    const isPotential = meal.potential === true;
+    const starClass = isPotential ? 'btn-potential btn-potential-active' : 'btn-potential';
+    const starTitle = isPotential ? 'Remove Potential Meal' : 'Mark as a Potential Meal';
+    const starIcon = isPotential ? '⭐' : '☆';
+    const hasVideos = meal.videos && meal.videos.length > 0;
+
+    let html = '';
+    html += `<td class="star-td"><button class="${starClass} toggle-potential-btn" data-lib='${this.escapeHtml(libData)}' title="${starTitle}">${starIcon}</button></td>`;
+    html += `<td data-label="Meal">${this.escapeHtml(meal.name)}</td>`;
+    html += `<td data-label="Notes">${meal.notes ? this.escapeHtml(meal.notes) : '-'}</td>`;
+    html += `<td class="actions-td"><div class="row-actions">
         <button class="${meal.recipe_url ? 'recipe-link btn-recipe' : 'btn-recipe-disabled'}" ${meal.recipe_url ? `data-url="${this.escapeHtml(meal.recipe_url)}"` : 'disabled'} title="${meal.recipe_url ? 'View Recipe' : 'No recipe'}">📖</button>
         <button class="${hasVideos ? 'video-list-btn btn-recipe' : 'btn-recipe-disabled'}" ${hasVideos ? `data-videos='${this.escapeHtml(JSON.stringify(meal.videos))}'` : 'disabled'} title="${hasVideos ? 'View Videos' : 'No videos'}">🎥</button>
         <button class="edit-library-btn btn-edit" data-lib='${this.escapeHtml(libData)}' title="Edit">✏️</button>
         <button class="delete-library-meal-btn btn-danger" data-lib='${this.escapeHtml(libData)}' title="Delete">🗑️</button>
       </div></td>`;
-      html += '</tr>';
-    });
-
-    html += '</tbody></table></div>';
-    content.innerHTML = html;
+    return { className: isPotential ? 'potential-row' : '', html };
   }
 
-  async togglePotential(libraryId, newValue) {
+  async togglePotential(libraryId, newValue, version) {
     try {
-      await this.callService('meal_planner/update_library', {
+      const result = await this.callWithVersion('meal_planner/update_library', {
         library_id: libraryId,
-        potential: newValue
+        potential: newValue,
+        expected_version: version
       });
-      await this.loadData();
+      await this.applyEditResult(result && result.success ? result : null);
       this.renderMealsLibrary();
     } catch (error) {
+      if (error && error.code === 'conflict') {
+        await this.handleConflict(error, 'library');
+        return;
+      }
       console.error('[Meal Planner] Failed to toggle potential:', error);
       await this.showAlert('Failed to update potential status. Please try again.');
     }
@@ -746,6 +1054,7 @@ class MealPlannerApp {
     form.reset();
     this.editingMeal = null;
     this.editingLibraryId = libData.library_id;
+    this.editingLibraryVersion = libData.version;
 
     // Ensure all fields are visible
     document.getElementById('meal-date').closest('.form-group').style.display = '';
@@ -869,15 +1178,20 @@ class MealPlannerApp {
           name,
           recipe_url: recipe || '',
           videos,
-          notes: notes || ''
+          notes: notes || '',
+          expected_version: this.editingLibraryVersion
         });
-        // If a date was also provided, create a scheduled entry
-        if (success && date) {
+        // If a date was also provided, create a scheduled entry (not when the edit was refused)
+        if (success === true && date) {
           success = await this.addMeal({ name, date, meal_time: mealTime, recipe_url: recipe || '', videos, notes: notes || '' });
         }
       } else if (this.editingMeal && this.editingMeal.id) {
         // Update an existing scheduled entry
-        success = await this.updateMeal(this.editingMeal.id, mealData);
+        success = await this.updateMeal(this.editingMeal.id, {
+          ...mealData,
+          expected_version: this.editingMeal.version,
+          expected_library_version: this.editingMeal.library_version
+        });
       } else {
         // Add new meal
         success = await this.addMeal(mealData);
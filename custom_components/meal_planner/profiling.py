@@ -0,0 +1,81 @@
+"""On-demand cProfile capture of Meal Planner operations.
+
+A ``ProfileSession`` is enabled only while one of the plan's service calls or
+websocket commands is running, so the profile shows the integration's own
+code paths rather than everything else on the event loop (work of other tasks
+that runs while an operation awaits is still included). File writes happen in
+the executor and show up as time spent awaiting them.
+
+A session ends after a number of operations or when its time runs out,
+whichever comes first; the caller then writes it with ``dump`` (blocking
+I/O, run it in the executor). The ``.prof`` file opens with ``pstats``,
+snakeviz or any other cProfile viewer.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+DEFAULT_PROFILE_SECONDS = 30
+MAX_PROFILE_SECONDS = 600
+MAX_PROFILE_CALLS = 10000
+
+
+class ProfileSession:
+    """cProfile over a plan's operations, for a number of seconds or calls."""
+
+    def __init__(self, path: Path, seconds: float, calls: Optional[int] = None) -> None:
+        self.path = path
+        self.seconds = seconds
+        self.max_calls = calls
+        self.calls = 0
+        self.error: Optional[str] = None
+        self.finished = asyncio.Event()
+        self._profile = cProfile.Profile()
+        self._active = 0
+
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """Profile the ``with`` body (one outermost operation)."""
+        if self.finished.is_set():
+            yield
+            return
+        if not self._active:
+            try:
+                self._profile.enable()
+            except ValueError as err:
+                # Another profiler (e.g. Home Assistant's profiler integration) is running
+                self.error = str(err)
+                self.finished.set()
+                yield
+                return
+        self._active += 1
+        try:
+            yield
+        finally:
+            if self._active:  # 0 when wait() already stopped the profile
+                self._active -= 1
+                if not self._active:
+                    self._profile.disable()
+            self.calls += 1
+            if self.max_calls and self.calls >= self.max_calls:
+                self.finished.set()
+
+    async def wait(self) -> None:
+        """Return when the call count is reached or the time is up."""
+        try:
+            await asyncio.wait_for(self.finished.wait(), self.seconds)
+        except asyncio.TimeoutError:
+            pass
+        self.finished.set()
+        if self._active:
+            # An operation is still running; stop profiling it here
+            self._active = 0
+            self._profile.disable()
+
+    def dump(self) -> None:
+        """Write the profile to ``path``. Does blocking I/O."""
+        self._profile.dump_stats(str(self.path))
@@ -0,0 +1,117 @@
+"""Recurring meal rules, expanded lazily for the window being read.
+
+A rule is stored once (in ``rules.json``) instead of as hundreds of
+scheduled rows::
+
+    {
+        "id": "…",
+        "library_id": "…",
+        "meal_time": "Dinner",
+        "frequency": "weekly",        # or "daily" (every ``interval`` days)
+        "interval": 1,                # weeks for weekly, days for daily
+        "weekdays": [4],              # weekly only, Monday = 0
+        "start_date": "2025-01-03",
+        "end_date": "",               # open-ended when blank
+        "exceptions": ["2025-02-14"], # occurrences skipped
+    }
+
+``expand_rules`` walks only the dates inside the requested window, so reading
+a week costs the same whether a series runs for a month or for ten years.
+Occurrences look like scheduled rows with an ``id`` of ``"<rule_id>:<date>"``
+and a ``rule_id`` key. Editing a single occurrence detaches it: its date is
+added to ``exceptions`` and one ordinary scheduled row takes its place.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+FREQUENCIES = ("weekly", "daily")
+MAX_RULE_INTERVAL = 52
+OCCURRENCE_SEP = ":"
+
+
+def _parse(date_str: str) -> Optional[date]:
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        return None
+
+
+def occurrence_id(rule_id: str, date_str: str) -> str:
+    return f"{rule_id}{OCCURRENCE_SEP}{date_str}"
+
+
+def split_occurrence_id(row_id: str) -> Optional[tuple[str, str]]:
+    """``(rule_id, date)`` for an occurrence id, or None for a plain scheduled row id."""
+    rule_id, sep, date_str = row_id.partition(OCCURRENCE_SEP)
+    if not sep or _parse(date_str) is None:
+        return None
+    return rule_id, date_str
+
+
+def _rule_dates(rule: dict, start: date, end: date) -> Iterator[date]:
+    """Dates of ``rule`` within ``[start, end]``, in order, before exceptions."""
+    first = _parse(rule.get("start_date", ""))
+    if first is None:
+        return
+    last = _parse(rule.get("end_date", "")) or end
+    lo, hi = max(start, first), min(end, last)
+    if lo > hi:
+        return
+    interval = max(1, int(rule.get("interval", 1)))
+
+    if rule.get("frequency") == "daily":
+        # Jump straight to the first occurrence on or after ``lo``
+        skip = -(-(lo - first).days // interval)
+        d = first + timedelta(days=skip * interval)
+        step = timedelta(days=interval)
+        while d <= hi:
+            yield d
+            d += step
+        return
+
+    weekdays = sorted(set(rule.get("weekdays") or [first.weekday()]))
+    anchor = first - timedelta(days=first.weekday())  # Monday of the first week
+    week = (lo - anchor).days // 7
+    week = -(-week // interval) * interval  # round up to an active week
+    monday = anchor + timedelta(weeks=week)
+    step = timedelta(weeks=interval)
+    while monday <= hi:
+        for wd in weekdays:
+            d = monday + timedelta(days=wd)
+            if d > hi:
+                return
+            if d >= lo:
+                yield d
+        monday += step
+
+
+def expand_rule(rule: dict, start: date, end: date) -> Iterator[dict]:
+    """Occurrences of one rule within ``[start, end]``."""
+    exceptions = set(rule.get("exceptions") or ())
+    for d in _rule_dates(rule, start, end):
+        date_str = d.isoformat()
+        if date_str in exceptions:
+            continue
+        yield {
+            "id": occurrence_id(rule["id"], date_str),
+            "rule_id": rule["id"],
+            "library_id": rule.get("library_id", ""),
+            "meal_time": rule.get("meal_time", "Dinner"),
+            "date": date_str,
+        }
+
+
+def expand_rules(rules: Iterable[dict], start: date, end: date) -> Iterator[dict]:
+    """Occurrences of all rules within ``[start, end]`` (rule by rule, not sorted)."""
+    for rule in rules:
+        yield from expand_rule(rule, start, end)
+
+
+def is_occurrence(rule: dict, date_str: str) -> bool:
+    """Whether ``date_str`` is a (non-skipped) occurrence of ``rule``."""
+    d = _parse(date_str)
+    if d is None or date_str in (rule.get("exceptions") or ()):
+        return False
+    return next(_rule_dates(rule, d, d), None) is not None
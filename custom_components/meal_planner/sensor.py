@@ -1,6 +1,8 @@
 """Sensor platform for Meal Planner."""
 from __future__ import annotations
 
+import functools
+import itertools
 import logging
 from datetime import datetime, timedelta
 
@@ -9,10 +11,22 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_STATS_SENSOR,
+    CONF_DEBUG_SENSOR,
+    CONF_RECORDER_ATTRIBUTES,
+    RECORDER_ATTRIBUTES_COMPACT,
+)
+from .metrics import dataset_sizes, file_sizes
+from .recurrence import expand_rules
+from .snapshot import Snapshot
 
 _LOGGER = logging.getLogger(__name__)
 
+# Meals listed in the statistics sensor attributes
+STATS_TOP_MEALS = 10
+
 
 def _current_week_bounds(today, week_start: str):
     """Get the start and end dates of the current week."""
@@ -27,86 +41,136 @@ def _current_week_bounds(today, week_start: str):
     return start, end
 
 
+@functools.cache
+def _compact_recorded(cls: type) -> type:
+    """``cls`` with its ``_LARGE_ATTRIBUTES`` left out of the recorder database."""
+    return type(cls.__name__, (cls,), {
+        "_unrecorded_attributes": cls._unrecorded_attributes | cls._LARGE_ATTRIBUTES,
+    })
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Meal Planner sensors."""
-    data = hass.data[DOMAIN]["data"]
+    plan = hass.data[DOMAIN][entry.entry_id]
+
+    # Compact recording keeps the states but not the lists that change with every edit
+    compact = entry.options.get(CONF_RECORDER_ATTRIBUTES) == RECORDER_ATTRIBUTES_COMPACT
+
+    def make(cls: type):
+        return (_compact_recorded(cls) if compact else cls)(hass, plan)
 
     sensors = [
-        PotentialMealsSensor(hass, data, entry.entry_id),
-        WeeklyMealsSensor(hass, data, entry.entry_id),
+        make(PotentialMealsSensor),
+        make(WeeklyMealsSensor),
+        make(ShoppingListSensor),
     ]
 
-    async_add_entities(sensors, True)
-
-    # Store references for updates
-    hass.data[DOMAIN]["sensors"] = {
+    refs = {
         "potential": sensors[0],
         "week": sensors[1],
+        "shopping": sensors[2],
     }
+    if entry.options.get(CONF_STATS_SENSOR, False):
+        refs["stats"] = make(MealStatsSensor)
+        sensors.append(refs["stats"])
+    if entry.options.get(CONF_DEBUG_SENSOR, False):
+        refs["debug"] = make(PerformanceSensor)
+        sensors.append(refs["debug"])
+
+    async_add_entities(sensors, True)
+
+    # Store references for updates (shared with the calendar platform)
+    plan["sensors"].update(refs)
+
 
+class _SnapshotSensor(SensorEntity):
+    """Sensor computed from the plan's read snapshot.
 
-class PotentialMealsSensor(SensorEntity):
+    Updates compute the state in the executor; a result is only written if no
+    newer snapshot was written meanwhile.
+    """
+
+    _version = 0
+
+    def _compute(self, snapshot: Snapshot) -> tuple:
+        """Return ``(state, attributes)`` for ``snapshot``. Runs in the executor."""
+        raise NotImplementedError
+
+    def _apply(self, snapshot: Snapshot, result: tuple) -> bool:
+        if snapshot.version < self._version:
+            return False
+        self._version = snapshot.version
+        self._attr_native_value, self._attr_extra_state_attributes = result
+        return True
+
+    def _recalc(self) -> None:
+        """Recalculate sensor state and attributes (on the calling thread)."""
+        snapshot = self.snapshots.current
+        self._apply(snapshot, self._compute(snapshot))
+
+    async def async_update_from_data(self) -> None:
+        """Update sensor from data changes."""
+        snapshot = self.snapshots.current
+        result = await self.hass.async_add_executor_job(self._compute, snapshot)
+        if self._apply(snapshot, result):
+            self.async_write_ha_state()
+
+
+class PotentialMealsSensor(_SnapshotSensor):
     """Sensor for potential meals."""
 
     _attr_has_entity_name = False
     _attr_name = "Meal Planner Potential"
     _attr_icon = "mdi:lightbulb-outline"
     _attr_should_poll = False
+    _LARGE_ATTRIBUTES = frozenset({"items"})
 
-    def __init__(self, hass: HomeAssistant, data: dict, entry_id: str):
+    def __init__(self, hass: HomeAssistant, plan: dict):
         """Initialize the sensor."""
         self.hass = hass
-        self.data = data
-        self._attr_unique_id = f"{entry_id}_meal_planner_potential"
-        self._attr_suggested_object_id = "meal_planner_potential"
+        self.snapshots = plan["snapshots"]
+        self._attr_name = f"{plan['name']} Potential"
+        self._attr_unique_id = f"{plan['entry_id']}_meal_planner_potential"
+        self._attr_suggested_object_id = f"{plan['object_id']}_potential"
         self._recalc()
 
-    def _recalc(self) -> None:
-        """Recalculate sensor state and attributes."""
+    def _compute(self, snapshot: Snapshot) -> tuple:
         # Potential flag lives on library entries now
         items = []
-        for lib in self.data.get("library", []):
+        for lib in snapshot.library.values():
             if lib.get("potential", False):
                 name = lib.get("name", "")
                 if name:
                     items.append(name)
 
-        self._attr_native_value = len(items)
-        self._attr_extra_state_attributes = {
-            "items": sorted(items, key=lambda s: s.lower())
-        }
-
-    async def async_update_from_data(self) -> None:
-        """Update sensor from data changes."""
-        self._recalc()
-        self.async_write_ha_state()
+        return len(items), {"items": sorted(items, key=lambda s: s.lower())}
 
 
-class WeeklyMealsSensor(SensorEntity):
+class WeeklyMealsSensor(_SnapshotSensor):
     """Sensor for weekly meals."""
 
     _attr_has_entity_name = False
     _attr_name = "Meal Planner Week"
     _attr_icon = "mdi:calendar-week"
     _attr_should_poll = False
+    _LARGE_ATTRIBUTES = frozenset({"days"})
 
-    def __init__(self, hass: HomeAssistant, data: dict, entry_id: str):
+    def __init__(self, hass: HomeAssistant, plan: dict):
         """Initialize the sensor."""
         self.hass = hass
-        self.data = data
-        self._attr_unique_id = f"{entry_id}_meal_planner_week"
-        self._attr_suggested_object_id = "meal_planner_week"
+        self.snapshots = plan["snapshots"]
+        self._attr_name = f"{plan['name']} Week"
+        self._attr_unique_id = f"{plan['entry_id']}_meal_planner_week"
+        self._attr_suggested_object_id = f"{plan['object_id']}_week"
         self._recalc()
 
-    def _recalc(self) -> None:
-        """Recalculate sensor state and attributes."""
+    def _compute(self, snapshot: Snapshot) -> tuple:
         today = datetime.now().date()
-        days_after = self.data.get("settings", {}).get("days_after_today", 3)
-
+        days_after = snapshot.settings.get("days_after_today", 3)
         # Calculate days before to maintain 7 day total
         # Cap days_after at 6 to prevent exceeding 7 total
         days_after = min(days_after, 6)
@@ -117,7 +181,7 @@ class WeeklyMealsSensor(SensorEntity):
         end = today + timedelta(days=days_after)
 
         # Build library lookup
-        library_map = {lib.get("id"): lib for lib in self.data.get("library", [])}
+        library_map = snapshot.library
 
         # Build grid for rolling days
         grid = {}
@@ -137,10 +201,14 @@ class WeeklyMealsSensor(SensorEntity):
                 "snack": ""
             }
 
-        # Populate meals
-        for m in self.data.get("scheduled", []):
+        # Populate meals: recurring occurrences for this window first, so an
+        # explicitly scheduled meal in the same slot wins
+        occurrences = expand_rules(snapshot.rules.values(), start, end)
+        first, last = start.isoformat(), end.isoformat()
+        for m in itertools.chain(occurrences, snapshot.scheduled.values()):
             ds = (m.get("date") or "").strip()
-            if not ds:
+            # Stored dates are ISO, so rows outside the window are skipped unparsed
+            if not first <= ds <= last:
                 continue
             try:
                 d = datetime.strptime(ds, "%Y-%m-%d").date()
@@ -159,8 +227,7 @@ class WeeklyMealsSensor(SensorEntity):
                         if library_entry:
                             grid[day_key][slot] = library_entry.get("name", "")
 
-        self._attr_native_value = f"{start.isoformat()} to {end.isoformat()}"
-        self._attr_extra_state_attributes = {
+        return f"{start.isoformat()} to {end.isoformat()}", {
             "days_after_today": days_after,
             "days_before_today": days_before,
             "total_days": total_days,
@@ -170,7 +237,117 @@ class WeeklyMealsSensor(SensorEntity):
             "days": grid,
         }
 
+
+class ShoppingListSensor(SensorEntity):
+    """Sensor for the upcoming shopping list."""
+
+    _attr_has_entity_name = False
+    _attr_name = "Meal Planner Shopping List"
+    _attr_icon = "mdi:cart-outline"
+    _attr_should_poll = False
+    _LARGE_ATTRIBUTES = frozenset({"items"})
+
+    def __init__(self, hass: HomeAssistant, plan: dict):
+        """Initialize the sensor."""
+        self.hass = hass
+        self.shopping = plan["shopping"]
+        self._attr_name = f"{plan['name']} Shopping List"
+        self._attr_unique_id = f"{plan['entry_id']}_meal_planner_shopping_list"
+        self._attr_suggested_object_id = f"{plan['object_id']}_shopping_list"
+        self._recalc()
+
+    def _recalc(self) -> None:
+        """Recalculate sensor state and attributes."""
+        # Totals are maintained incrementally; this only formats them
+        current = self.shopping.current(datetime.now().date())
+        self._attr_native_value = len(current["items"])
+        self._attr_extra_state_attributes = current
+
+    async def async_update_from_data(self) -> None:
+        """Update sensor from data changes."""
+        self._recalc()
+        self.async_write_ha_state()
+
+
+class MealStatsSensor(SensorEntity):
+    """Sensor for meal history statistics (optional)."""
+
+    _attr_has_entity_name = False
+    _attr_name = "Meal Planner Stats"
+    _attr_icon = "mdi:chart-bar"
+    _attr_should_poll = False
+    _LARGE_ATTRIBUTES = frozenset({"meals"})
+
+    def __init__(self, hass: HomeAssistant, plan: dict):
+        """Initialize the sensor."""
+        self.hass = hass
+        self.data = plan["data"]
+        self.stats = plan["stats"]
+        self._attr_name = f"{plan['name']} Stats"
+        self._attr_unique_id = f"{plan['entry_id']}_meal_planner_stats"
+        self._attr_suggested_object_id = f"{plan['object_id']}_stats"
+        self._recalc()
+
+    def _recalc(self) -> None:
+        """Recalculate sensor state and attributes."""
+        names = {lib.get("id"): lib.get("name", "") for lib in self.data.get("library", [])}
+        total = 0
+        top = []
+        for library_id, entry in self.stats:
+            total += entry["count"]
+            if library_id in names:
+                top.append((entry["count"], entry["last_date"], names[library_id]))
+        top.sort(key=lambda t: (-t[0], t[2].lower()))
+
+        self._attr_native_value = total
+        self._attr_extra_state_attributes = {
+            "meals": [
+                {"name": name, "count": count, "last_date": last_date}
+                for count, last_date, name in top[:STATS_TOP_MEALS]
+            ]
+        }
+
     async def async_update_from_data(self) -> None:
         """Update sensor from data changes."""
         self._recalc()
         self.async_write_ha_state()
+
+
+class PerformanceSensor(SensorEntity):
+    """Sensor exposing the plan's performance counters (optional, for debugging)."""
+
+    _attr_has_entity_name = False
+    _attr_name = "Meal Planner Performance"
+    _attr_icon = "mdi:speedometer"
+    _attr_should_poll = False
+    _LARGE_ATTRIBUTES = frozenset({"dataset", "files", "operations"})
+
+    def __init__(self, hass: HomeAssistant, plan: dict):
+        """Initialize the sensor."""
+        self.hass = hass
+        self.plan = plan
+        self._files = {}
+        self._attr_name = f"{plan['name']} Performance"
+        self._attr_unique_id = f"{plan['entry_id']}_meal_planner_performance"
+        self._attr_suggested_object_id = f"{plan['object_id']}_performance"
+        self._recalc()
+
+    def _recalc(self) -> None:
+        """Recalculate sensor state and attributes."""
+        metrics = self.plan["metrics"]
+        self._attr_native_value = metrics.calls
+        self._attr_extra_state_attributes = {
+            "dataset": dataset_sizes(self.plan),
+            "files": self._files,
+            **metrics.summary(),
+        }
+
+    async def async_update(self) -> None:
+        """Refresh file sizes (blocking I/O, so in the executor) and recalculate."""
+        self._files = await self.hass.async_add_executor_job(file_sizes, self.plan["paths"])
+        self._recalc()
+
+    async def async_update_from_data(self) -> None:
+        """Update sensor from data changes."""
+        await self.async_update()
+        self.async_write_ha_state()
@@ -0,0 +1,253 @@
+"""Ingredients and shopping list aggregation.
+
+Library entries may carry ``ingredients``: a list of
+``{"quantity": 2.0, "unit": "cup", "item": "flour"}`` (quantity may be None
+for "salt to taste"). A shopping list sums the quantities of every meal
+scheduled in a date window, grouped by item and unit.
+
+``ShoppingList`` keeps the totals for the upcoming window (today through the
+end of the rolling week) up to date from change sets: scheduling, moving or
+deleting a meal adds or subtracts that one recipe, and editing a recipe
+re-applies it once per scheduled use. Other windows are aggregated on demand
+from the date index.
+"""
+from __future__ import annotations
+
+import itertools
+import re
+from collections import Counter
+from datetime import date
+from fractions import Fraction
+from typing import Iterable, Optional
+
+from .changes import ChangeSet
+from .recurrence import expand_rules, split_occurrence_id
+from .suggest import upcoming_days
+
+MAX_INGREDIENTS = 50
+MAX_UNIT_LENGTH = 20
+
+UNIT_ALIASES = {
+    "cups": "cup",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbs": "tbsp",
+    "teaspoon": "tsp", "teaspoons": "tsp",
+    "gram": "g", "grams": "g",
+    "kilogram": "kg", "kilograms": "kg",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "pound": "lb", "pounds": "lb", "lbs": "lb",
+    "ounce": "oz", "ounces": "oz",
+    "cloves": "clove", "cans": "can", "pinches": "pinch",
+}
+KNOWN_UNITS = set(UNIT_ALIASES.values()) | {"piece", "slice", "bunch", "handful"}
+
+_QUANTITY_RE = re.compile(r"^\s*(\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?)\s*(.*)$")
+
+
+def _normalize_unit(unit: str) -> str:
+    unit = (unit or "").strip().lower().rstrip(".")
+    return UNIT_ALIASES.get(unit, unit)
+
+
+def _parse_quantity(text: str) -> Optional[float]:
+    try:
+        return float(sum(Fraction(part) for part in text.split()))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def parse_ingredient(value) -> Optional[dict]:
+    """One ingredient from a dict or a line like ``"1 1/2 cups flour"``."""
+    if isinstance(value, dict):
+        item = str(value.get("item") or "").strip()
+        quantity = value.get("quantity")
+        if isinstance(quantity, str):
+            quantity = _parse_quantity(quantity)
+        elif quantity is not None:
+            try:
+                quantity = float(quantity)
+            except (TypeError, ValueError):
+                quantity = None
+        unit = _normalize_unit(str(value.get("unit") or ""))
+    elif isinstance(value, str):
+        item, quantity, unit = value.strip(), None, ""
+        match = _QUANTITY_RE.match(item)
+        if match:
+            quantity = _parse_quantity(match.group(1))
+            rest = match.group(2)
+            word, _, remainder = rest.partition(" ")
+            if _normalize_unit(word) in KNOWN_UNITS and remainder.strip():
+                unit, item = _normalize_unit(word), remainder.strip()
+            else:
+                item = rest.strip()
+    else:
+        return None
+    if not item:
+        return None
+    if quantity is not None and quantity < 0:
+        quantity = None
+    return {"quantity": quantity, "unit": unit[:MAX_UNIT_LENGTH], "item": item}
+
+
+def _key(ingredient: dict) -> tuple[str, str]:
+    return ingredient["item"].strip().lower(), ingredient.get("unit", "")
+
+
+class _Totals:
+    """Quantities and meal counts per (item, unit)."""
+
+    def __init__(self) -> None:
+        self._totals: dict[tuple[str, str], list] = {}
+        self._labels: dict[tuple[str, str], str] = {}
+
+    def add(self, ingredients: Iterable[dict], sign: int = 1) -> None:
+        for ing in ingredients:
+            key = _key(ing)
+            entry = self._totals.get(key)
+            if entry is None:
+                entry = self._totals[key] = [0.0, 0]
+                self._labels[key] = ing["item"].strip()
+            if ing.get("quantity") is not None:
+                entry[0] += sign * ing["quantity"]
+            entry[1] += sign
+            if entry[1] <= 0:
+                del self._totals[key]
+                del self._labels[key]
+
+    def as_list(self) -> list[dict]:
+        items = [
+            {
+                "item": self._labels[key],
+                "unit": key[1],
+                "quantity": round(quantity, 3) if quantity > 1e-9 else None,
+                "meals": meals,
+            }
+            for key, (quantity, meals) in self._totals.items()
+        ]
+        items.sort(key=lambda i: (i["item"].lower(), i["unit"]))
+        return items
+
+
+def aggregate(rows: Iterable[dict], library_map: dict) -> list[dict]:
+    """Shopping list for arbitrary scheduled rows."""
+    totals = _Totals()
+    for row in rows:
+        library_entry = library_map.get(row.get("library_id"))
+        if library_entry:
+            totals.add(library_entry.get("ingredients") or [])
+    return totals.as_list()
+
+
+class ShoppingList:
+    """Incrementally maintained shopping list for the upcoming window."""
+
+    def __init__(self, data: dict, index) -> None:
+        self._data = data
+        self._index = index
+        self._window: Optional[tuple[date, date]] = None
+
+    def _reset(self, window: tuple[date, date]) -> None:
+        self._window = window
+        self._totals = _Totals()
+        # Row id → library id, and the ingredients each library entry last contributed
+        self._rows: dict[str, str] = {}
+        self._uses: Counter = Counter()
+        self._applied: dict[str, list] = {}
+        library_map = {lib.get("id"): lib for lib in self._data.get("library", [])}
+        rows = itertools.chain(
+            self._index.range(*window),
+            expand_rules(self._data.get("rules", []), *window),
+        )
+        for row in rows:
+            self._add_row(row, library_map.get)
+
+    def invalidate(self) -> None:
+        """Drop the running totals; the next read rebuilds them."""
+        self._window = None
+
+    def _in_window(self, row: Optional[dict]) -> bool:
+        if row is None:
+            return False
+        start, end = self._window
+        return start.isoformat() <= (row.get("date") or "") <= end.isoformat()
+
+    def _add_row(self, row: dict, find_library) -> None:
+        library_id = row.get("library_id")
+        if library_id not in self._applied:
+            library_entry = find_library(library_id)
+            self._applied[library_id] = list(library_entry.get("ingredients") or []) if library_entry else []
+        self._rows[row["id"]] = library_id
+        self._uses[library_id] += 1
+        self._totals.add(self._applied[library_id])
+
+    def _remove_row(self, row_id: str) -> None:
+        library_id = self._rows.pop(row_id, None)
+        if library_id is None:
+            return
+        self._totals.add(self._applied[library_id], sign=-1)
+        self._uses[library_id] -= 1
+        if self._uses[library_id] <= 0:
+            del self._uses[library_id]
+            del self._applied[library_id]
+
+    def apply(self, changes: ChangeSet) -> None:
+        """Fold one operation's changes into the current window's totals."""
+        if self._window is None:
+            return
+        library_map = None
+
+        def find_library(library_id):
+            # Only built when a meal not yet in the window shows up
+            nonlocal library_map
+            if library_map is None:
+                library_map = {lib.get("id"): lib for lib in self._data.get("library", [])}
+            return library_map.get(library_id)
+
+        for row_id, (before, after) in changes.scheduled.items():
+            if row_id in self._rows:
+                self._remove_row(row_id)
+            if self._in_window(after):
+                self._add_row(after, find_library)
+
+        if changes.rules:
+            # Few rules and a short window: re-expand occurrences wholesale
+            for row_id in [r for r in self._rows if split_occurrence_id(r) is not None]:
+                self._remove_row(row_id)
+            for row in expand_rules(self._data.get("rules", []), *self._window):
+                self._add_row(row, find_library)
+
+        for library_id, (before, after) in changes.library.items():
+            uses = self._uses.get(library_id, 0)
+            if not uses or after is None:
+                continue
+            ingredients = list(after.get("ingredients") or [])
+            if ingredients != self._applied[library_id]:
+                for _ in range(uses):
+                    self._totals.add(self._applied[library_id], sign=-1)
+                    self._totals.add(ingredients)
+                self._applied[library_id] = ingredients
+
+    def current(self, today: date) -> dict:
+        """Shopping list for today through the end of the rolling week."""
+        days = upcoming_days(self._data.get("settings", {}), today)
+        window = (days[0], days[-1])
+        if window != self._window:
+            # Midnight or a settings change moved the window
+            self._reset(window)
+        return {
+            "start": window[0].isoformat(),
+            "end": window[1].isoformat(),
+            "items": self._totals.as_list(),
+        }
+
+    def query(self, start: date, end: date, today: date) -> dict:
+        """Shopping list for any window; the upcoming one comes from the running totals."""
+        current = self.current(today)
+        if (start.isoformat(), end.isoformat()) == (current["start"], current["end"]):
+            return current
+        library_map = {lib.get("id"): lib for lib in self._data.get("library", [])}
+        rows = itertools.chain(
+            self._index.range(start, end),
+            expand_rules(self._data.get("rules", []), start, end),
+        )
+        return {"start": start.isoformat(), "end": end.isoformat(), "items": aggregate(rows, library_map)}
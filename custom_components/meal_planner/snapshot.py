@@ -0,0 +1,74 @@
+"""Copy-on-write read snapshots of a plan's data.
+
+Services mutate ``data`` in place on the event loop, so nothing may read it
+from another thread. After each commit ``_save_and_notify`` publishes a new
+``Snapshot``: an immutable, versioned view of the library, scheduled rows,
+rules and settings. Readers take the current snapshot in O(1) and can then
+build and encode large payloads in the executor while services keep going;
+the storage files are written from it the same way.
+A snapshot never changes after it is published; the next commit publishes a
+new one.
+
+Publishing is copy-on-write at row level. The new snapshot shares every row
+object with the previous one, except the rows named in the commit's
+``ChangeSet``, which are copied. Rows held by a snapshot are never mutated.
+"""
+from __future__ import annotations
+
+import copy
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from .changes import ChangeSet, LIBRARY, RULES, SCHEDULED
+
+_KINDS = (LIBRARY, SCHEDULED, RULES)
+
+
+class Snapshot:
+    """Immutable view of one version of a plan's data."""
+
+    __slots__ = ("version", "library", "scheduled", "rules", "settings", "_tables")
+
+    def __init__(self, version: int, tables: dict[str, dict[str, dict]], settings: dict) -> None:
+        self.version = version
+        self._tables = tables
+        # Rows keyed by id, in insertion order
+        self.library: Mapping[str, dict] = MappingProxyType(tables[LIBRARY])
+        self.scheduled: Mapping[str, dict] = MappingProxyType(tables[SCHEDULED])
+        self.rules: Mapping[str, dict] = MappingProxyType(tables[RULES])
+        self.settings: Mapping = MappingProxyType(settings)
+
+
+class SnapshotStore:
+    """Publishes a new ``Snapshot`` per commit; ``current`` is the latest one."""
+
+    def __init__(self, data: dict) -> None:
+        tables = {
+            kind: {row["id"]: copy.deepcopy(row) for row in data.get(kind, [])}
+            for kind in _KINDS
+        }
+        self.current = Snapshot(1, tables, copy.deepcopy(data.get("settings", {})))
+
+    def publish(self, data: dict, changes: Optional[ChangeSet] = None) -> Snapshot:
+        """Publish the state of ``data`` after a commit.
+
+        Only the rows in ``changes`` are copied, so every row mutation must be
+        recorded there, as the statistics and indexes already require.
+        Settings are small and copied on every publish.
+        """
+        previous = self.current
+        tables = {}
+        for kind in _KINDS:
+            changed = getattr(changes, kind) if changes else None
+            if not changed:
+                tables[kind] = previous._tables[kind]
+                continue
+            table = dict(previous._tables[kind])
+            for row_id, (before, after) in changed.items():
+                if after is None:
+                    table.pop(row_id, None)
+                else:
+                    table[row_id] = copy.deepcopy(after)
+            tables[kind] = table
+        self.current = Snapshot(previous.version + 1, tables, copy.deepcopy(data.get("settings", {})))
+        return self.current
@@ -0,0 +1,158 @@
+"""Meal history statistics, maintained incrementally per library entry.
+
+Each library entry gets a running aggregate of its scheduled rows:
+
+- ``count``      — total times scheduled
+- ``last_date``  — most recent scheduled date (ISO)
+- ``meal_times`` — count per meal_time
+- ``weekdays``   — count per weekday, Monday first
+- ``dates``      — count per date (the history itself, used to keep
+  ``last_date`` correct when the latest row is deleted)
+
+Inserts and deletes adjust the aggregate in O(1); retention purges leave it
+alone, so history outlives ``days_to_keep``. The aggregates are persisted to
+``stats.json`` next to the other storage files.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from .changes import ChangeSet
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def _new_entry() -> dict:
+    return {"count": 0, "last_date": "", "meal_times": {}, "weekdays": [0] * 7, "dates": {}}
+
+
+def _weekday(date_str: str) -> Optional[int]:
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").weekday()
+    except (ValueError, TypeError):
+        return None
+
+
+class MealStats:
+    """Per-library-entry aggregates over scheduled meal history."""
+
+    def __init__(self, entries: Optional[dict] = None) -> None:
+        self._entries: dict[str, dict] = entries or {}
+
+    @classmethod
+    def from_scheduled(cls, scheduled: Iterable[dict]) -> "MealStats":
+        """Build aggregates from scratch (first run, or missing stats.json)."""
+        stats = cls()
+        for row in scheduled:
+            stats.record(row)
+        return stats
+
+    def as_dict(self) -> dict:
+        """Storage representation (what gets written to stats.json).
+
+        A copy, so it can be written in the executor while services keep
+        updating the aggregates.
+        """
+        return {
+            library_id: {
+                **entry,
+                "meal_times": dict(entry["meal_times"]),
+                "weekdays": list(entry["weekdays"]),
+                "dates": dict(entry["dates"]),
+            }
+            for library_id, entry in self._entries.items()
+        }
+
+    def get(self, library_id: str) -> Optional[dict]:
+        return self._entries.get(library_id)
+
+    def __iter__(self):
+        return iter(self._entries.items())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, row: dict) -> None:
+        """Count one scheduled row."""
+        library_id = row.get("library_id")
+        date_str = (row.get("date") or "").strip()
+        weekday = _weekday(date_str)
+        if not library_id or weekday is None:
+            return
+        entry = self._entries.get(library_id)
+        if entry is None:
+            entry = self._entries[library_id] = _new_entry()
+        meal_time = row.get("meal_time") or "Dinner"
+
+        entry["count"] += 1
+        entry["meal_times"][meal_time] = entry["meal_times"].get(meal_time, 0) + 1
+        entry["weekdays"][weekday] += 1
+        entry["dates"][date_str] = entry["dates"].get(date_str, 0) + 1
+        if date_str > entry["last_date"]:
+            entry["last_date"] = date_str
+
+    def unrecord(self, row: dict) -> None:
+        """Undo ``record`` for a row the user deleted (not for purged rows)."""
+        library_id = row.get("library_id")
+        date_str = (row.get("date") or "").strip()
+        weekday = _weekday(date_str)
+        entry = self._entries.get(library_id)
+        if entry is None or weekday is None or not entry["dates"].get(date_str):
+            return
+        meal_time = row.get("meal_time") or "Dinner"
+
+        entry["count"] -= 1
+        if entry["count"] <= 0:
+            del self._entries[library_id]
+            return
+        if entry["meal_times"].get(meal_time, 0) > 1:
+            entry["meal_times"][meal_time] -= 1
+        else:
+            entry["meal_times"].pop(meal_time, None)
+        entry["weekdays"][weekday] = max(0, entry["weekdays"][weekday] - 1)
+        entry["dates"][date_str] -= 1
+        if not entry["dates"][date_str]:
+            del entry["dates"][date_str]
+            if date_str == entry["last_date"]:
+                # Only the deleted latest date needs a rescan of this entry's history
+                entry["last_date"] = max(entry["dates"], default="")
+
+    def forget(self, library_id: str) -> None:
+        """Drop all history for a deleted library entry."""
+        self._entries.pop(library_id, None)
+
+    def apply(self, changes: ChangeSet) -> bool:
+        """Apply a change set. Returns True if any aggregate changed."""
+        changed = False
+        for row_id, (before, after) in changes.scheduled.items():
+            if row_id in changes.purged:
+                continue
+            if before is not None and after is not None and (
+                before.get("library_id") == after.get("library_id")
+                and before.get("date") == after.get("date")
+                and before.get("meal_time") == after.get("meal_time")
+            ):
+                continue
+            if before is not None:
+                self.unrecord(before)
+            if after is not None:
+                self.record(after)
+            changed = True
+        for library_id, (before, after) in changes.library.items():
+            if after is None and library_id in self._entries:
+                self.forget(library_id)
+                changed = True
+        return changed
+
+    def summary(self, library_id: str, name: str = "") -> dict:
+        """Public view of one entry (without the raw date history)."""
+        entry = self._entries.get(library_id) or _new_entry()
+        return {
+            "library_id": library_id,
+            "name": name,
+            "count": entry["count"],
+            "last_date": entry["last_date"],
+            "meal_times": dict(entry["meal_times"]),
+            "weekdays": dict(zip(WEEKDAY_NAMES, entry["weekdays"])),
+        }
@@ -0,0 +1,78 @@
+"""Writing the plan's JSON files: format and save debouncing.
+
+Files are written either indented (readable, the default) or compact, which
+is smaller and faster to write for large plans. ``loader.load_records`` reads
+both, so the format can be switched at any time; files are rewritten in the
+new format the next time they change.
+
+By default every change is written before its service call returns. With a
+save delay, ``SaveScheduler`` collects the files a change touched and writes
+each of them once when the window has passed, so a burst of edits costs one
+write per file instead of one per edit. Pending files are written on unload
+and when Home Assistant stops; a crash inside the window loses those edits.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import STORAGE_FORMAT_COMPACT
+
+
+def dump_json(path: Path, content, storage_format: str) -> None:
+    """Write ``content`` to ``path`` in ``storage_format``. Does blocking I/O."""
+    with open(path, "w", encoding="utf-8") as f:
+        if storage_format == STORAGE_FORMAT_COMPACT:
+            json.dump(content, f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(content, f, indent=2, ensure_ascii=False)
+
+
+class SaveScheduler:
+    """Coalesces file saves that fall within ``delay_ms`` of the first one."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        delay_ms: int,
+        write: Callable[[set[str]], Awaitable[None]],
+    ) -> None:
+        self.hass = hass
+        self.delay = max(0, delay_ms) / 1000
+        self._write = write
+        self._pending: set[str] = set()
+        self._cancel: Optional[Callable[[], None]] = None
+
+    @property
+    def pending(self) -> frozenset[str]:
+        return frozenset(self._pending)
+
+    async def async_save(self, names: Iterable[str]) -> None:
+        """Write the files called ``names`` now, or when the window has passed."""
+        names = set(names)
+        if not names:
+            return
+        if not self.delay:
+            await self._write(names)
+            return
+        self._pending |= names
+        if self._cancel is None:
+            self._cancel = async_call_later(self.hass, self.delay, self._async_timer)
+
+    @callback
+    def _async_timer(self, _now) -> None:
+        self._cancel = None
+        self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Write every pending file now."""
+        if self._cancel is not None:
+            self._cancel()
+            self._cancel = None
+        names, self._pending = self._pending, set()
+        if names:
+            await self._write(names)
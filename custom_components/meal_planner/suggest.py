@@ -0,0 +1,129 @@
+"""Meal suggestions for empty slots in the rolling week.
+
+Every library entry is scored from its precomputed statistics (see
+``stats.py``) — no scan of the scheduled history is needed:
+
+- recency   — days since it was last scheduled, saturating at ``RECENCY_DAYS``
+- frequency — how often it has been scheduled (log-scaled against the favourite)
+- potential — entries flagged as potential meals get a bonus
+- fit       — share of its history scheduled at the slot's meal_time
+
+Ranking is a heap-based top-k per meal_time, so a request costs
+O(library × log k) regardless of how many slots are being filled. Taken
+slots are read from the date index, so only the rows in the rolling week
+are looked at.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import itertools
+from datetime import date, datetime, timedelta
+
+from .index import DateIndex
+from .recurrence import expand_rules
+from .stats import MealStats
+
+RECENCY_DAYS = 28
+WEIGHT_RECENCY = 0.45
+WEIGHT_FREQUENCY = 0.25
+WEIGHT_POTENTIAL = 0.15
+WEIGHT_FIT = 0.15
+# Slot fit for meals with no history yet
+NEUTRAL_FIT = 0.5
+
+DEFAULT_SUGGEST_MEAL_TIMES = ("Dinner",)
+DEFAULT_SUGGEST_LIMIT = 3
+MAX_SUGGEST_LIMIT = 10
+
+
+def upcoming_days(settings: dict, today: date) -> list[date]:
+    """Today through the end of the rolling week shown by the week sensor."""
+    days_after = min(int(settings.get("days_after_today", 3)), 6)
+    return [today + timedelta(days=i) for i in range(days_after + 1)]
+
+
+def _parse(date_str: str):
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        return None
+
+
+def _scorer(stats: MealStats, today: date, meal_time: str):
+    max_count = max((entry["count"] for _, entry in stats), default=0)
+    freq_scale = math.log1p(max_count) or 1.0
+
+    def score(lib: dict) -> float:
+        entry = stats.get(lib.get("id"))
+        if entry is None:
+            recency, frequency, fit = 1.0, 0.0, NEUTRAL_FIT
+        else:
+            last = _parse(entry["last_date"])
+            days_since = (today - last).days if last else RECENCY_DAYS
+            recency = min(max(days_since, 0), RECENCY_DAYS) / RECENCY_DAYS
+            frequency = math.log1p(entry["count"]) / freq_scale
+            fit = entry["meal_times"].get(meal_time, 0) / entry["count"]
+        potential = 1.0 if lib.get("potential", False) else 0.0
+        return (
+            WEIGHT_RECENCY * recency
+            + WEIGHT_FREQUENCY * frequency
+            + WEIGHT_POTENTIAL * potential
+            + WEIGHT_FIT * fit
+        )
+
+    return score
+
+
+def suggest(
+    data: dict,
+    stats: MealStats,
+    index: DateIndex,
+    today: date,
+    meal_times=DEFAULT_SUGGEST_MEAL_TIMES,
+    limit: int = DEFAULT_SUGGEST_LIMIT,
+) -> list[dict]:
+    """Suggestions for each empty (date, meal_time) slot, best first.
+
+    The first suggestion of each slot is distinct across slots and never a
+    meal already scheduled in the window, so it can be written as-is.
+    """
+    days = upcoming_days(data.get("settings", {}), today)
+    taken = set()
+    used = set()
+    occurrences = expand_rules(data.get("rules", []), days[0], days[-1])
+    for m in itertools.chain(index.range(days[0], days[-1]), occurrences):
+        taken.add((m["date"], m.get("meal_time", "Dinner")))
+        used.add(m.get("library_id"))
+
+    slots = [
+        (d.isoformat(), mt)
+        for d in days
+        for mt in meal_times
+        if (d.isoformat(), mt) not in taken
+    ]
+    if not slots:
+        return []
+
+    library = [lib for lib in data.get("library", []) if lib.get("name")]
+    ranked = {}
+    for mt in set(mt for _, mt in slots):
+        score = _scorer(stats, today, mt)
+        # Enough depth that every slot still has ``limit`` unused candidates
+        depth = limit + len(used) + len(slots)
+        ranked[mt] = heapq.nlargest(depth, ((score(lib), lib) for lib in library), key=lambda t: t[0])
+
+    result = []
+    for date_str, mt in slots:
+        picks = [(s, lib) for s, lib in ranked[mt] if lib["id"] not in used][:limit]
+        if picks:
+            used.add(picks[0][1]["id"])
+        result.append({
+            "date": date_str,
+            "meal_time": mt,
+            "suggestions": [
+                {"library_id": lib["id"], "name": lib.get("name", ""), "score": round(s, 3)}
+                for s, lib in picks
+            ],
+        })
+    return result
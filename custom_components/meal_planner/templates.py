@@ -0,0 +1,74 @@
+"""Week templates and the conflict modes for copying meals between dates.
+
+A template is a named week of meals, stored in ``templates.json``::
+
+    {
+        "id": "…",
+        "name": "School week",
+        "meals": [
+            {"day": 0, "meal_time": "Dinner", "library_id": "…"},
+        ],
+    }
+
+``day`` counts from the first day of the week the template is applied to
+(0–6), so one template fits any week. Templates point at library entries
+like scheduled rows and rules do, which keeps those entries from being
+evicted while a template uses them.
+
+Copying a date range and applying a template both come down to a list of
+``(date, meal_time, library_id)`` placements. When a target slot (date and
+meal time) already holds a scheduled meal, ``conflict`` decides:
+``skip`` leaves the slot alone, ``overwrite`` replaces what is there and
+``append`` adds the meal next to it.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+SKIP = "skip"
+OVERWRITE = "overwrite"
+APPEND = "append"
+CONFLICT_MODES = (SKIP, OVERWRITE, APPEND)
+
+TEMPLATE_DAYS = 7
+
+
+def find_template(data: dict, name: str) -> Optional[dict]:
+    """The template called ``name`` (case-insensitive), or None."""
+    name = name.strip().lower()
+    for template in data.get("templates", []):
+        if template.get("name", "").lower() == name:
+            return template
+    return None
+
+
+def library_ids(template: dict) -> list[str]:
+    """Library ids of the template's meals (one per meal, repeats included)."""
+    return [meal.get("library_id") for meal in template.get("meals", [])]
+
+
+def capture_week(rows: Iterable[dict], start: date) -> list[dict]:
+    """Template meals for the scheduled ``rows`` of the week starting at ``start``."""
+    meals = []
+    for row in rows:
+        try:
+            day = (date.fromisoformat(row.get("date", "")) - start).days
+        except ValueError:
+            continue
+        if 0 <= day < TEMPLATE_DAYS and row.get("library_id"):
+            meals.append({
+                "day": day,
+                "meal_time": row.get("meal_time", "Dinner"),
+                "library_id": row["library_id"],
+            })
+    meals.sort(key=lambda m: (m["day"], m["meal_time"]))
+    return meals
+
+
+def template_placements(template: dict, start: date) -> list[tuple[str, str, str]]:
+    """``(date, meal_time, library_id)`` for each meal of ``template`` applied at ``start``."""
+    return [
+        ((start + timedelta(days=meal.get("day", 0))).isoformat(), meal.get("meal_time", "Dinner"), meal.get("library_id", ""))
+        for meal in template.get("meals", [])
+    ]
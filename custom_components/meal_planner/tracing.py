@@ -0,0 +1,112 @@
+"""Per-operation tracing spans.
+
+Every service call and websocket command runs inside a ``Trace`` that splits
+its wall time into stages: ``parse`` (turning the request into service
+data, including Home Assistant's own service call handling), ``validate``,
+``query`` (read-only websocket commands), ``mutate`` (changing rows and the
+structures derived from them), ``persist`` (file writes), ``sensors`` (sensor
+recalculation and state writes) and ``notify`` (events and the websocket
+reply).
+
+Timing is lap-based: switching stage charges the time since the last switch
+to the stage being left, so the stages always add up to the total. The
+current trace lives in a context variable, so an operation nested in another
+one (a websocket command calling its service) adds to the outer trace instead
+of starting its own. Outside an operation every call here is a no-op.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+PARSE = "parse"
+VALIDATE = "validate"
+QUERY = "query"
+MUTATE = "mutate"
+PERSIST = "persist"
+SENSORS = "sensors"
+NOTIFY = "notify"
+
+STAGES = (PARSE, VALIDATE, QUERY, MUTATE, PERSIST, SENSORS, NOTIFY)
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("meal_planner_trace", default=None)
+
+
+class Trace:
+    """Wall time of one operation, split by stage."""
+
+    __slots__ = ("category", "name", "stages", "_stage", "_lap", "_start")
+
+    def __init__(self, category: str, name: str) -> None:
+        self.category = category
+        self.name = name
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self._stage = PARSE
+        self._start = self._lap = time.perf_counter()
+
+    def switch(self, stage: str) -> str:
+        """Charge the time since the last switch to the current stage; enter ``stage``."""
+        now = time.perf_counter()
+        self.stages[self._stage] += now - self._lap
+        self._lap = now
+        previous, self._stage = self._stage, stage
+        return previous
+
+    def finish(self) -> float:
+        """Close the current stage; returns the total in milliseconds."""
+        self.switch(self._stage)
+        return (self._lap - self._start) * 1000
+
+    def breakdown(self) -> str:
+        return ", ".join(f"{stage} {seconds * 1000:.1f}" for stage, seconds in self.stages.items() if seconds)
+
+
+def enter_stage(stage: str) -> None:
+    """Move the current operation (if any) on to ``stage``."""
+    trace = _current.get()
+    if trace is not None:
+        trace.switch(stage)
+
+
+def traced(stage: str):
+    """Charge calls of the decorated helper (e.g. a validator) to ``stage``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            previous = trace.switch(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.switch(previous)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def traced_operation(category: str, name: str, slow_ms: float, logger: logging.Logger) -> Iterator[bool]:
+    """Trace one operation; yields True for the outermost one.
+
+    When the operation took at least ``slow_ms`` (and ``slow_ms`` is not 0),
+    it is logged as a warning with its stage breakdown.
+    """
+    if _current.get() is not None:
+        yield False
+        return
+    trace = Trace(category, name)
+    token = _current.set(trace)
+    try:
+        yield True
+    finally:
+        _current.reset(token)
+        total = trace.finish()
+        if slow_ms and total >= slow_ms:
+            logger.warning(
+                "Slow %s %s: %.1f ms (%s)", category, name, total, trace.breakdown()
+            )
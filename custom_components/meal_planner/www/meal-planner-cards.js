@@ -0,0 +1,109 @@
+// meal-planner-cards.js
+// Lightweight loader for the Meal Planner Lovelace cards.
+// Registered once as an extra frontend module; it defines the card elements
+// up front but only imports a card's implementation the first time it is used.
+
+const MEAL_PLANNER_CARDS = [
+  {
+    type: 'meal-planner-weekly-horizontal',
+    module: () => import('./meal-planner-weekly-horizontal.js'),
+    exportName: 'MealPlannerWeeklyHorizontal',
+    name: 'Meal Planner: Weekly Horizontal',
+    description: 'Weekly meal plan in a horizontal calendar grid layout',
+    size: 4
+  },
+  {
+    type: 'meal-planner-weekly-vertical',
+    module: () => import('./meal-planner-weekly-vertical.js'),
+    exportName: 'MealPlannerWeeklyVertical',
+    name: 'Meal Planner: Weekly Vertical',
+    description: 'Weekly meal plan in a vertical day-by-day layout',
+    size: 5
+  },
+  {
+    type: 'meal-planner-potential-meals',
+    module: () => import('./meal-planner-potential-meals.js'),
+    exportName: 'MealPlannerPotentialMeals',
+    name: 'Meal Planner: Potential Meals',
+    description: 'List of meals marked as potential',
+    size: 3
+  }
+];
+
+function loadCardImplementation(def) {
+  // Shared promise: every instance of a card type waits on the same import
+  if (!def.loading) {
+    def.loading = def.module().then(mod => {
+      const implTag = `${def.type}-impl`;
+      if (!customElements.get(implTag)) {
+        // A fresh subclass, because one constructor can only back one tag name
+        customElements.define(implTag, class extends mod[def.exportName] {});
+      }
+      return { cardClass: mod[def.exportName], implTag };
+    });
+  }
+  return def.loading;
+}
+
+function makeLazyCard(def) {
+  return class extends HTMLElement {
+    setConfig(config) {
+      this._config = config;
+      if (this._inner) {
+        this._inner.setConfig(config);
+        return;
+      }
+      loadCardImplementation(def).then(({ implTag }) => {
+        if (!this._inner) {
+          this._inner = document.createElement(implTag);
+          this.appendChild(this._inner);
+        }
+        this._inner.setConfig(this._config);
+        if (this._hass) this._inner.hass = this._hass;
+      }).catch(err => {
+        console.error(`[Meal Planner] Failed to load ${def.type}:`, err);
+      });
+    }
+
+    set hass(hass) {
+      this._hass = hass;
+      if (this._inner) this._inner.hass = hass;
+    }
+
+    get hass() {
+      return this._hass;
+    }
+
+    getCardSize() {
+      return this._inner ? this._inner.getCardSize() : def.size;
+    }
+
+    static async getConfigElement() {
+      const { cardClass } = await loadCardImplementation(def);
+      return cardClass.getConfigElement();
+    }
+
+    static async getStubConfig(...args) {
+      const { cardClass } = await loadCardImplementation(def);
+      return cardClass.getStubConfig(...args);
+    }
+  };
+}
+
+window.customCards = window.customCards || [];
+
+MEAL_PLANNER_CARDS.forEach(def => {
+  // A card script added manually as a dashboard resource wins; leave it alone
+  if (!customElements.get(def.type)) {
+    customElements.define(def.type, makeLazyCard(def));
+  }
+  if (!window.customCards.find(c => c.type === def.type)) {
+    window.customCards.push({
+      type: def.type,
+      name: def.name,
+      description: def.description,
+      preview: false,
+      documentationURL: 'https://github.com/Knigh7s/Basic-Meal-Planner'
+    });
+  }
+});
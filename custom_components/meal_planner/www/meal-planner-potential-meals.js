@@ -1,7 +1,8 @@
 // meal-planner-potential-meals.js
 // Custom Lovelace card for potential/unscheduled meals
+// Imported on first use by meal-planner-cards.js; can also be added directly as a dashboard resource.
 
-class MealPlannerPotentialMeals extends HTMLElement {
+export class MealPlannerPotentialMeals extends HTMLElement {
   setConfig(config) {
     // Default to sensor.meal_planner_potential if not specified
     this.config = {
@@ -26,64 +27,115 @@ class MealPlannerPotentialMeals extends HTMLElement {
       this.header = this.querySelector('.name');
       this.badge = this.querySelector('.count-badge');
     }
+
+    // Config changes re-render from scratch
+    this._list = null;
+    this._entityKnown = false;
+    if (this._hass) this.hass = this._hass;
   }
 
   set hass(hass) {
     this._hass = hass;
 
+    // hass is replaced on every state change anywhere in the system;
+    // only re-render when our own entity actually changed
     const entity = hass.states[this.config.entity];
-    if (!entity) {
-      this.content.innerHTML = `<div class="error">Entity ${this.config.entity} not found</div>`;
+    if (this._entityKnown && (entity === this._entity || (
+      entity && this._entity &&
+      entity.last_updated === this._entity.last_updated &&
+      entity.attributes === this._entity.attributes
+    ))) {
       return;
     }
+    this._entity = entity;
+    this._entityKnown = true;
+    this.scheduleRender();
+  }
+
+  // Coalesce bursts of updates into a single render per animation frame
+  scheduleRender() {
+    if (this._renderPending) return;
+    this._renderPending = true;
+    requestAnimationFrame(() => {
+      this._renderPending = false;
+      this.render();
+    });
+  }
 
-    this.updateCard(entity);
+  render() {
+    if (!this._entity) {
+      this._list = null;
+      this.content.innerHTML = `<div class="error">Entity ${this.escapeHtml(this.config.entity)} not found</div>`;
+      return;
+    }
+    this.updateCard(this._entity);
   }
 
   updateCard(entity) {
     const items = entity.attributes.items || [];
     const count = parseInt(entity.state) || 0;
 
-    this.header.textContent = this.config.title;
+    this.patch(this.header, 'textContent', this.config.title);
 
     // Count badge
     if (this.config.show_count) {
-      this.badge.textContent = count;
+      this.patch(this.badge, 'textContent', String(count));
       this.badge.style.display = 'flex';
     } else {
       this.badge.style.display = 'none';
     }
 
-    if (items.length === 0) {
-      this.content.innerHTML = `
-        <div class="empty-state">
-          <div class="empty-icon">💡</div>
-          <div class="empty-text">No potential meals yet</div>
-          <div class="empty-hint">Add meals without dates to track ideas</div>
-        </div>
-      `;
-      return;
+    // Built once; renders patch list items in place
+    if (!this._list) {
+      this._list = this.buildList();
     }
+    const { emptyState, ul, more } = this._list;
+
+    emptyState.hidden = items.length > 0;
+    ul.hidden = items.length === 0;
 
     // Limit items
     const displayItems = items.slice(0, this.config.max_items);
-    const hasMore = items.length > this.config.max_items;
-
-    let html = '<ul class="meal-list">';
+    while (ul.children.length > displayItems.length) {
+      ul.lastElementChild.remove();
+    }
     displayItems.forEach((meal, index) => {
-      html += `<li class="meal-item">`;
-      html += `<span class="meal-number">${index + 1}</span>`;
-      html += `<span class="meal-name">${this.escapeHtml(meal)}</span>`;
-      html += `</li>`;
+      let li = ul.children[index];
+      if (!li) {
+        li = document.createElement('li');
+        li.className = 'meal-item';
+        li.innerHTML = `<span class="meal-number">${index + 1}</span><span class="meal-name"></span>`;
+        ul.appendChild(li);
+      }
+      this.patch(li.lastElementChild, 'textContent', meal);
     });
-    html += '</ul>';
 
-    if (hasMore) {
-      const remaining = items.length - this.config.max_items;
-      html += `<div class="more-items">+${remaining} more...</div>`;
+    const remaining = items.length - this.config.max_items;
+    more.hidden = remaining <= 0;
+    if (remaining > 0) {
+      this.patch(more, 'textContent', `+${remaining} more...`);
     }
+  }
 
-    this.content.innerHTML = html;
+  buildList() {
+    this.content.innerHTML = `
+      <div class="empty-state">
+        <div class="empty-icon">💡</div>
+        <div class="empty-text">No potential meals yet</div>
+        <div class="empty-hint">Add meals without dates to track ideas</div>
+      </div>
+      <ul class="meal-list"></ul>
+      <div class="more-items"></div>
+    `;
+    return {
+      emptyState: this.content.querySelector('.empty-state'),
+      ul: this.content.querySelector('.meal-list'),
+      more: this.content.querySelector('.more-items')
+    };
+  }
+
+  patch(el, prop, value) {
+    if (el[prop] !== value) el[prop] = value;
   }
 
   escapeHtml(text) {
@@ -111,6 +163,10 @@ class MealPlannerPotentialMeals extends HTMLElement {
 
   static get styles() {
     return `
+      .meal-planner-potential-card [hidden] {
+        display: none !important;
+      }
+
       .meal-planner-potential-card .card-header {
         display: flex;
         align-items: center;
@@ -1,7 +1,8 @@
 // meal-planner-weekly-horizontal.js
 // Custom Lovelace card for weekly meal planning (horizontal calendar grid)
+// Imported on first use by meal-planner-cards.js; can also be added directly as a dashboard resource.
 
-class MealPlannerWeeklyHorizontal extends HTMLElement {
+export class MealPlannerWeeklyHorizontal extends HTMLElement {
   setConfig(config) {
     // Default to sensor.meal_planner_week if not specified
     this.config = {
@@ -25,18 +26,48 @@ class MealPlannerWeeklyHorizontal extends HTMLElement {
       this.content = this.querySelector('.card-content');
       this.header = this.querySelector('.name');
     }
+
+    // Config changes re-render from scratch
+    this._grid = null;
+    this._entityKnown = false;
+    if (this._hass) this.hass = this._hass;
   }
 
   set hass(hass) {
     this._hass = hass;
 
+    // hass is replaced on every state change anywhere in the system;
+    // only re-render when our own entity actually changed
     const entity = hass.states[this.config.entity];
-    if (!entity) {
-      this.content.innerHTML = `<div class="error">Entity ${this.config.entity} not found</div>`;
+    if (this._entityKnown && (entity === this._entity || (
+      entity && this._entity &&
+      entity.last_updated === this._entity.last_updated &&
+      entity.attributes === this._entity.attributes
+    ))) {
       return;
     }
+    this._entity = entity;
+    this._entityKnown = true;
+    this.scheduleRender();
+  }
+
+  // Coalesce bursts of updates into a single render per animation frame
+  scheduleRender() {
+    if (this._renderPending) return;
+    this._renderPending = true;
+    requestAnimationFrame(() => {
+      this._renderPending = false;
+      this.render();
+    });
+  }
 
-    this.updateCard(entity);
+  render() {
+    if (!this._entity) {
+      this._grid = null;
+      this.content.innerHTML = `<div class="error">Entity ${this.escapeHtml(this.config.entity)} not found</div>`;
+      return;
+    }
+    this.updateCard(this._entity);
   }
 
   updateCard(entity) {
@@ -44,65 +75,94 @@ class MealPlannerWeeklyHorizontal extends HTMLElement {
     const totalDays = entity.attributes.total_days || 7;
     const todayIndex = entity.attributes.today_index ?? 0;
 
-    this.header.textContent = this.config.title;
-
-    // Build day order from day0, day1, day2, etc.
-    const dayOrder = [];
-    for (let i = 0; i < totalDays; i++) {
-      dayOrder.push(`day${i}`);
-    }
+    this.patch(this.header, 'textContent', this.config.title);
 
     const mealTimes = ['breakfast', 'lunch', 'dinner'];
     if (this.config.show_snacks) {
       mealTimes.push('snack');
     }
 
-    // Build table
-    let html = '<table class="meal-grid"><thead><tr><th class="corner-cell"></th>';
+    // The table is built once per layout; renders only patch text and classes
+    const layoutKey = `${totalDays}|${mealTimes.join(',')}`;
+    if (!this._grid || this._grid.layoutKey !== layoutKey) {
+      this._grid = this.buildGrid(totalDays, mealTimes, layoutKey);
+    }
+    const { headers, cells } = this._grid;
 
-    // Header row (days)
-    dayOrder.forEach((day, index) => {
+    for (let index = 0; index < totalDays; index++) {
+      const day = `day${index}`;
       const dayData = days[day] || {};
       const label = dayData.label || day.toUpperCase();
       const isToday = index === todayIndex;
 
       // Get day name and date number
       const dayParts = label.split(' ');
-      const dayName = dayParts[0];
       const dateNum = dayParts.length > 1 ? dayParts[1] : '';
-
-      html += `<th class="day-header ${isToday ? 'today' : ''}">`;
-      html += `<div class="day-name">${dayName}</div>`;
-      if (dateNum) {
-        html += `<div class="date-num">${dateNum}</div>`;
-      }
-      html += `</th>`;
-    });
-    html += '</tr></thead><tbody>';
-
-    // Meal time rows
-    mealTimes.forEach(mealTime => {
-      html += `<tr><th class="meal-time">${this.capitalize(mealTime)}</th>`;
-
-      dayOrder.forEach((day, index) => {
-        const meal = days[day]?.[mealTime] || '';
+      const header = headers[index];
+      this.patch(header.th, 'className', `day-header ${isToday ? 'today' : ''}`);
+      this.patch(header.dayName, 'textContent', dayParts[0]);
+      this.patch(header.dateNum, 'textContent', dateNum);
+      this.patch(header.dateNum, 'hidden', !dateNum);
+
+      mealTimes.forEach((mealTime, row) => {
+        const cell = cells[row][index];
+        const meal = dayData[mealTime] || '';
         const isEmpty = !meal || meal.trim() === '';
-        const isToday = index === todayIndex;
 
-        if (isEmpty && !this.config.show_empty) {
-          html += `<td class="empty ${isToday ? 'today' : ''}"></td>`;
-        } else if (isEmpty) {
-          html += `<td class="empty ${isToday ? 'today' : ''}">—</td>`;
+        if (isEmpty) {
+          this.patch(cell, 'className', `empty ${isToday ? 'today' : ''}`);
+          this.patch(cell, 'textContent', this.config.show_empty ? '—' : '');
         } else {
-          html += `<td class="meal ${isToday ? 'today' : ''}">${this.escapeHtml(meal)}</td>`;
+          this.patch(cell, 'className', `meal ${isToday ? 'today' : ''}`);
+          this.patch(cell, 'textContent', meal);
         }
       });
+    }
+  }
+
+  buildGrid(totalDays, mealTimes, layoutKey) {
+    const table = document.createElement('table');
+    table.className = 'meal-grid';
+
+    // Header row (days)
+    const headRow = table.createTHead().insertRow();
+    const corner = document.createElement('th');
+    corner.className = 'corner-cell';
+    headRow.appendChild(corner);
+
+    const headers = [];
+    for (let i = 0; i < totalDays; i++) {
+      const th = document.createElement('th');
+      const dayName = document.createElement('div');
+      dayName.className = 'day-name';
+      const dateNum = document.createElement('div');
+      dateNum.className = 'date-num';
+      th.append(dayName, dateNum);
+      headRow.appendChild(th);
+      headers.push({ th, dayName, dateNum });
+    }
 
-      html += '</tr>';
+    // Meal time rows
+    const tbody = table.createTBody();
+    const cells = mealTimes.map(mealTime => {
+      const tr = tbody.insertRow();
+      const th = document.createElement('th');
+      th.className = 'meal-time';
+      th.textContent = this.capitalize(mealTime);
+      tr.appendChild(th);
+      const rowCells = [];
+      for (let i = 0; i < totalDays; i++) {
+        rowCells.push(tr.insertCell());
+      }
+      return rowCells;
     });
 
-    html += '</tbody></table>';
-    this.content.innerHTML = html;
+    this.content.replaceChildren(table);
+    return { layoutKey, headers, cells };
+  }
+
+  patch(el, prop, value) {
+    if (el[prop] !== value) el[prop] = value;
   }
 
   capitalize(str) {
@@ -134,6 +194,10 @@ class MealPlannerWeeklyHorizontal extends HTMLElement {
 
   static get styles() {
     return `
+      .meal-planner-horizontal-card [hidden] {
+        display: none !important;
+      }
+
       .meal-planner-horizontal-card .card-content {
         padding: 0;
         overflow-x: auto;
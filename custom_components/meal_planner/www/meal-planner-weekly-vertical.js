@@ -1,7 +1,8 @@
 // meal-planner-weekly-vertical.js
 // Custom Lovelace card for weekly meal planning (vertical day-by-day layout)
+// Imported on first use by meal-planner-cards.js; can also be added directly as a dashboard resource.
 
-class MealPlannerWeeklyVertical extends HTMLElement {
+export class MealPlannerWeeklyVertical extends HTMLElement {
   setConfig(config) {
     // Default to sensor.meal_planner_week if not specified
     this.config = {
@@ -25,18 +26,48 @@ class MealPlannerWeeklyVertical extends HTMLElement {
       this.content = this.querySelector('.card-content');
       this.header = this.querySelector('.name');
     }
+
+    // Config changes re-render from scratch
+    this._rows = null;
+    this._entityKnown = false;
+    if (this._hass) this.hass = this._hass;
   }
 
   set hass(hass) {
     this._hass = hass;
 
+    // hass is replaced on every state change anywhere in the system;
+    // only re-render when our own entity actually changed
     const entity = hass.states[this.config.entity];
-    if (!entity) {
-      this.content.innerHTML = `<div class="error">Entity ${this.config.entity} not found</div>`;
+    if (this._entityKnown && (entity === this._entity || (
+      entity && this._entity &&
+      entity.last_updated === this._entity.last_updated &&
+      entity.attributes === this._entity.attributes
+    ))) {
       return;
     }
+    this._entity = entity;
+    this._entityKnown = true;
+    this.scheduleRender();
+  }
 
-    this.updateCard(entity);
+  // Coalesce bursts of updates into a single render per animation frame
+  scheduleRender() {
+    if (this._renderPending) return;
+    this._renderPending = true;
+    requestAnimationFrame(() => {
+      this._renderPending = false;
+      this.render();
+    });
+  }
+
+  render() {
+    if (!this._entity) {
+      this._rows = null;
+      this.content.innerHTML = `<div class="error">Entity ${this.escapeHtml(this.config.entity)} not found</div>`;
+      return;
+    }
+    this.updateCard(this._entity);
   }
 
   updateCard(entity) {
@@ -44,84 +75,99 @@ class MealPlannerWeeklyVertical extends HTMLElement {
     const totalDays = entity.attributes.total_days || 7;
     const todayIndex = entity.attributes.today_index || 3;
 
-    this.header.textContent = this.config.title;
-
-    // Build day order from day0, day1, day2, etc.
-    const dayOrder = [];
-    for (let i = 0; i < totalDays; i++) {
-      dayOrder.push(`day${i}`);
-    }
+    this.patch(this.header, 'textContent', this.config.title);
 
     const mealTimes = ['breakfast', 'lunch', 'dinner'];
     if (this.config.show_snacks) {
       mealTimes.push('snack');
     }
 
-    let html = '<div class="day-list">';
+    // Day rows are built once; renders patch labels and only the changed days' meals
+    if (!this._rows || this._rows.length !== totalDays) {
+      this._rows = this.buildRows(totalDays);
+    }
 
-    dayOrder.forEach((day, index) => {
+    this._rows.forEach((row, index) => {
+      const day = `day${index}`;
       const dayData = days[day] || {};
       const label = dayData.label || day.toUpperCase();
-      const dateStr = dayData.date || '';
       const isToday = index === todayIndex;  // today is at the specified index
 
       // Get day name and date number
       const dayParts = label.split(' ');
-      const dayName = dayParts[0]; // e.g., "Mon"
       const dateNum = dayParts.length > 1 ? dayParts[1] : '';  // e.g., "26"
+      this.patch(row.el, 'className', `day-row ${isToday ? 'today' : ''}`);
+      this.patch(row.dayName, 'textContent', dayParts[0]);  // e.g., "Mon"
+      this.patch(row.dateNum, 'textContent', dateNum);
+      this.patch(row.dateNum, 'hidden', !dateNum);
+
+      const meals = mealTimes.map(mealTime => dayData[mealTime] || '');
+      const signature = JSON.stringify([this.config.compact, mealTimes, meals]);
+      if (row.signature !== signature) {
+        row.meals.innerHTML = this.renderMeals(mealTimes, meals);
+        row.signature = signature;
+      }
+    });
+  }
 
-      html += `<div class="day-row ${isToday ? 'today' : ''}">`;
+  buildRows(totalDays) {
+    const list = document.createElement('div');
+    list.className = 'day-list';
+    const rows = [];
+    for (let i = 0; i < totalDays; i++) {
+      const el = document.createElement('div');
+      el.innerHTML = `
+        <div class="date-col"><div class="day-name"></div><div class="date-num"></div></div>
+        <div class="meals-col"></div>
+      `;
+      list.appendChild(el);
+      rows.push({
+        el,
+        dayName: el.querySelector('.day-name'),
+        dateNum: el.querySelector('.date-num'),
+        meals: el.querySelector('.meals-col'),
+        signature: null
+      });
+    }
+    this.content.replaceChildren(list);
+    return rows;
+  }
 
-      // Left side - Date
-      html += `<div class="date-col">`;
-      html += `<div class="day-name">${dayName}</div>`;
-      if (dateNum) {
-        html += `<div class="date-num">${dateNum}</div>`;
-      }
-      html += `</div>`;
-
-      // Right side - Meals
-      html += `<div class="meals-col">`;
-
-      if (!this.config.compact) {
-        let hasMeals = false;
-        mealTimes.forEach(mealTime => {
-          const meal = dayData[mealTime] || '';
-          if (meal && meal.trim()) {
-            hasMeals = true;
-            html += `<div class="meal-item">`;
-            html += `<div class="meal-details">`;
-            html += `<span class="meal-name">${this.escapeHtml(meal)}</span>`;
-            html += `<span class="meal-time">${this.capitalize(mealTime)}</span>`;
-            html += `</div>`;
-            html += `</div>`;
-          }
-        });
-
-        if (!hasMeals) {
-          html += `<div class="no-meals">No meals planned</div>`;
+  renderMeals(mealTimes, meals) {
+    let html = '';
+
+    if (!this.config.compact) {
+      let hasMeals = false;
+      mealTimes.forEach((mealTime, i) => {
+        const meal = meals[i];
+        if (meal && meal.trim()) {
+          hasMeals = true;
+          html += `<div class="meal-item">`;
+          html += `<div class="meal-details">`;
+          html += `<span class="meal-name">${this.escapeHtml(meal)}</span>`;
+          html += `<span class="meal-time">${this.capitalize(mealTime)}</span>`;
+          html += `</div>`;
+          html += `</div>`;
         }
+      });
+
+      if (!hasMeals) {
+        html += `<div class="no-meals">No meals planned</div>`;
+      }
+    } else {
+      const mealNames = meals.filter(m => m.trim());
+      if (mealNames.length > 0) {
+        html += `<div class="meals-compact">${mealNames.map(m => this.escapeHtml(m)).join(' · ')}</div>`;
       } else {
-        const mealNames = mealTimes.map(mt => dayData[mt] || '').filter(m => m.trim());
-        if (mealNames.length > 0) {
-          html += `<div class="meals-compact">${mealNames.map(m => this.escapeHtml(m)).join(' · ')}</div>`;
-        } else {
-          html += `<div class="no-meals">No meals planned</div>`;
-        }
+        html += `<div class="no-meals">No meals planned</div>`;
       }
+    }
 
-      html += `</div>`;
-      html += `</div>`;
-    });
-
-    html += '</div>';
-    this.content.innerHTML = html;
+    return html;
   }
 
-  escapeHtml(text) {
-    const div = document.createElement('div');
-    div.textContent = text;
-    return div.innerHTML;
+  patch(el, prop, value) {
+    if (el[prop] !== value) el[prop] = value;
   }
 
   capitalize(str) {
@@ -147,6 +193,10 @@ class MealPlannerWeeklyVertical extends HTMLElement {
 
   static get styles() {
     return `
+      .meal-planner-vertical-card [hidden] {
+        display: none !important;
+      }
+
       .meal-planner-vertical-card .day-list {
         display: flex;
         flex-direction: column;